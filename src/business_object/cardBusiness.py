@@ -123,42 +123,61 @@ class CardBusiness:
 
         return normalized
 
-    def generate_text_to_embed2(self):
-        """Generate and update the text_to_embed attribute of a card using a template."""
-        if not self.id:
-            raise ValueError("Impossible to generate text_to_embed without a card ID.")
+    @classmethod
+    def build_text_to_embed(cls, card: dict) -> str:
+        """
+        Build the description of a card that is sent to the embedding model.
 
+        Parameters
+        ----------
+        card : dict
+            The card columns; only name, type, mana_cost, power, toughness,
+            loyalty, defense, text and keywords are used.
+
+        Returns
+        -------
+        str
+            The text to embed.
+        """
         # Build the description using the template
-        parts = [f"{self.name} is a {self.type}" if self.type else self.name]
+        name, card_type = card.get("name"), card.get("type")
+        parts = [f"{name} is a {card_type}" if card_type else name]
 
         # Add mana cost (normalized)
-        if self.mana_cost:
-            normalized_mana = self.normalize_text(self.mana_cost)
+        if card.get("mana_cost"):
+            normalized_mana = cls.normalize_text(card["mana_cost"])
             parts.append(f"with mana cost {normalized_mana}")
 
         # Add power/toughness or other stats
         stats = []
-        if self.power and self.toughness:
-            stats.append(f"power/toughness {self.power}/{self.toughness}")
-        if self.loyalty:
-            stats.append(f"loyalty {self.loyalty}")
-        if self.defense:
-            stats.append(f"defense {self.defense}")
+        if card.get("power") and card.get("toughness"):
+            stats.append(f"power/toughness {card['power']}/{card['toughness']}")
+        if card.get("loyalty"):
+            stats.append(f"loyalty {card['loyalty']}")
+        if card.get("defense"):
+            stats.append(f"defense {card['defense']}")
         if stats:
             parts.append(f"and {', '.join(stats)}")
 
         text_description = " ".join(parts) + "."
 
         # Add abilities/rules text (normalized)
-        if self.text:
-            normalized_text = self.normalize_text(self.text)
+        if card.get("text"):
+            normalized_text = cls.normalize_text(card["text"])
             text_description += f" It has the following abilities: {normalized_text}."
 
         # Add keywords
-        if self.keywords:
-            text_description += f" Keywords include: {self.keywords}."
+        if card.get("keywords"):
+            text_description += f" Keywords include: {card['keywords']}."
+
+        return text_description
+
+    def generate_text_to_embed2(self):
+        """Generate and update the text_to_embed attribute of a card using a template."""
+        if not self.id:
+            raise ValueError("Impossible to generate text_to_embed without a card ID.")
 
-        self.text_to_embed = text_description
+        self.text_to_embed = self.build_text_to_embed(vars(self))
 
         with self.dao:
             self.dao.edit_text_to_embed(self.text_to_embed, self.id)
@@ -1,14 +1,29 @@
 from dao.deckDao import DeckDao
 from dao.userDao import UserDao
 from dao.cardDao import CardDao
+from services.nameIndex import NameIndex
+from services.decklist import (
+    DECKLIST_FORMATS,
+    MAIN_SECTIONS,
+    DecklistError,
+    format_decklist,
+    iter_decklist,
+)
 from datetime import datetime
 
 
 class DeckBusiness:
-    def __init__(self, deck_dao: DeckDao, user_dao: UserDao, card_dao: CardDao):
+    def __init__(
+        self,
+        deck_dao: DeckDao,
+        user_dao: UserDao,
+        card_dao: CardDao,
+        name_index: NameIndex = None,
+    ):
         self.deck = deck_dao
         self.user = user_dao
         self.card = card_dao
+        self.names = name_index if name_index is not None else NameIndex()
 
     def add_card_to_deck(self, user_id, card_id, deck_id):
         """
@@ -28,20 +43,15 @@ class DeckBusiness:
         dict :
             Dictionary containing the deck information :
             {'user_id': int, 'deck_id': int, 'card_id': int, 'added_at': datetime}.
-        """
-        if not self.user.exist(user_id):
-            raise ValueError("This user_id does not exist")
-        if not self.card.exist(card_id):
-            raise ValueError("This card_id does not exist")
-        if not self.deck.exist(deck_id):
-            raise ValueError("This deck_id does not exist")
-
-        user_decks = self.deck.get_all_decks_from_user(user_id)
-        deck_belongs_to_user = any(deck['deck_id'] == deck_id for deck in user_decks)
-        if not deck_belongs_to_user:
-            raise ValueError("This deck does not belong to the user")
 
-        self.deck.add_card_to_deck(card_id, deck_id)
+        Raises
+        ------
+        ValueError
+            If the user, card or deck does not exist, or the deck does not
+            belong to the user. These checks run in the same statement as the
+            change (see `DeckDao`).
+        """
+        self.deck.add_card_to_deck(card_id, deck_id, user_id=user_id)
 
         return {
             'user_id': user_id,
@@ -68,20 +78,15 @@ class DeckBusiness:
         dict :
             Dictionary containing the deck information :
             {'user_id': int, 'deck_id': int, 'card_id': int, 'removed_at': datetime}.
-        """
-        if not self.user.exist(user_id):
-            raise ValueError("This user_id does not exist")
-        if not self.card.exist(card_id):
-            raise ValueError("This card_id does not exist")
-        if not self.deck.exist(deck_id):
-            raise ValueError("This deck_id does not exist")
-
-        user_decks = self.deck.get_all_decks_from_user(user_id)
-        deck_belongs_to_user = any(deck['deck_id'] == deck_id for deck in user_decks)
-        if not deck_belongs_to_user:
-            raise ValueError("This deck does not belong to the user")
 
-        deleted_row = self.deck.remove_card_from_deck(card_id, deck_id)
+        Raises
+        ------
+        ValueError
+            If the user, card or deck does not exist, or the deck does not
+            belong to the user. These checks run in the same statement as the
+            change (see `DeckDao`).
+        """
+        deleted_row = self.deck.remove_card_from_deck(card_id, deck_id, user_id=user_id)
         if not deleted_row:
             raise ValueError("Card not found in the deck")
 
@@ -139,18 +144,14 @@ class DeckBusiness:
         dict :
             Dictionary confirming deletion :
             {'deck_id': int, 'user_id': int, 'deleted_at': datetime}.
-        """
-        if not self.user.exist(user_id):
-            raise ValueError("This user_id does not exist")
-        if not self.deck.exist(deck_id):
-            raise ValueError("This deck_id does not exist")
 
-        user_decks = self.deck.get_all_decks_from_user(user_id)
-        deck_belongs_to_user = any(deck['deck_id'] == deck_id for deck in user_decks)
-        if not deck_belongs_to_user:
-            raise ValueError("This deck does not belong to the user")
-
-        self.deck.delete(deck_id)
+        Raises
+        ------
+        ValueError
+            If the user or deck does not exist, or the deck does not belong to
+            the user.
+        """
+        self.deck.delete(deck_id, user_id=user_id)
 
         return {
             'deck_id': deck_id,
@@ -192,15 +193,198 @@ class DeckBusiness:
         -------
         list :
             List of dictionaries containing deck and card information.
+
+        Raises
+        ------
+        ValueError
+            If the user or deck does not exist, or the deck does not belong to
+            the user.
         """
-        if not self.user.exist(user_id):
-            raise ValueError("This user_id does not exist")
-        if not self.deck.exist(deck_id):
-            raise ValueError("This deck_id does not exist")
+        return self.deck.get_by_id(deck_id, user_id=user_id)
+
+    def apply_card_changes(self, user_id, deck_id, changes):
+        """
+        Add and remove several cards of a user's deck at once.
+
+        Parameters
+        ----------
+        user_id : int
+            The user id.
+        deck_id : int
+            The deck id.
+        changes : list[dict]
+            `{'card_id': int, 'quantity_delta': int}` operations, applied in
+            one transaction.
+
+        Returns
+        -------
+        dict :
+            Dictionary containing the new state of the deck :
+            {'user_id': int, 'deck_id': int, 'cards': list, 'updated_at': datetime}.
+
+        Raises
+        ------
+        ValueError
+            If the user, the deck or a card does not exist, or the deck does
+            not belong to the user. No change is applied then.
+        """
+        cards = self.deck.apply_card_changes(deck_id, changes, user_id=user_id)
 
-        user_decks = self.deck.get_all_decks_from_user(user_id)
-        deck_belongs_to_user = any(deck['deck_id'] == deck_id for deck in user_decks)
-        if not deck_belongs_to_user:
-            raise ValueError("This deck does not belong to the user")
+        return {
+            'user_id': user_id,
+            'deck_id': deck_id,
+            'cards': cards,
+            'updated_at': datetime.now()
+        }
+
+    def get_deck_statistics(self, user_id, deck_id):
+        """
+        Get the mana curve, color and type breakdown of a user's deck.
 
-        return self.deck.get_by_id(deck_id)
+        Parameters
+        ----------
+        user_id : int
+            The user id.
+        deck_id : int
+            The deck id.
+
+        Returns
+        -------
+        dict :
+            The statistics of the deck, see `DeckDao.get_statistics`.
+
+        Raises
+        ------
+        ValueError
+            If the user or deck does not exist, or the deck does not belong to
+            the user.
+        """
+        statistics = self.deck.get_statistics(deck_id, user_id=user_id)
+        return {'deck_id': deck_id, **statistics}
+
+    def get_deck_profile(self, user_id, deck_id):
+        """
+        Get what a recommendation search needs to know about a user's deck.
+
+        Parameters
+        ----------
+        user_id : int
+            The user id.
+        deck_id : int
+            The deck id.
+
+        Returns
+        -------
+        dict :
+            {'centroid': list or None, 'card_ids': list, 'color_identity': list},
+            the quantity-weighted mean embedding of the cards (None when none
+            is embedded), the cards already in the deck and its color identity.
+
+        Raises
+        ------
+        ValueError
+            If the user or deck does not exist, or the deck does not belong to
+            the user.
+        """
+        profile = self.deck.get_centroid(deck_id, user_id=user_id)
+        centroid = profile['centroid']
+        return {
+            'centroid': None if centroid is None else centroid.tolist(),
+            'card_ids': profile['card_ids'],
+            'color_identity': profile['color_identity'],
+        }
+
+    def import_decklist(self, user_id, deck_id, decklist, include_sideboard=False):
+        """
+        Add the cards of a decklist to a user's deck.
+
+        Lines are parsed as they are read, copies of the same name summed,
+        and every name resolved at once with the in-memory name index. The
+        cards are then added with one batched upsert (see
+        `DeckDao.apply_card_changes`).
+
+        Parameters
+        ----------
+        user_id : int
+            The user id.
+        deck_id : int
+            The deck id.
+        decklist : str
+            Plain text ("4 Lightning Bolt" lines), MTGA export or MTGO `.dek`.
+        include_sideboard : bool, optional
+            Also add the sideboard cards. Maybeboard cards are never added.
+
+        Returns
+        -------
+        dict :
+            Dictionary containing the import summary :
+            {'user_id': int, 'deck_id': int, 'imported': int, 'skipped': int,
+            'unresolved': list, 'cards': list, 'imported_at': datetime}.
+
+        Raises
+        ------
+        DecklistError
+            If the decklist holds no card or cannot be parsed.
+        ValueError
+            If the deck cannot be edited by the user. No card is added then.
+        """
+        sections = MAIN_SECTIONS + (("sideboard",) if include_sideboard else ())
+        quantities, skipped = {}, 0
+        for quantity, name, section in iter_decklist(decklist):
+            if section in sections:
+                quantities[name] = quantities.get(name, 0) + quantity
+            else:
+                skipped += quantity
+        if not quantities:
+            raise DecklistError("The decklist contains no card")
+
+        if not self.names.loaded:
+            self.names.load()
+        else:
+            self.names.refresh_in_background()
+        card_ids = self.names.lookup(quantities)
+
+        changes = [
+            {'card_id': card_ids[name], 'quantity_delta': quantity}
+            for name, quantity in quantities.items()
+            if card_ids[name] is not None
+        ]
+        cards = self.deck.apply_card_changes(deck_id, changes, user_id=user_id)
+
+        return {
+            'user_id': user_id,
+            'deck_id': deck_id,
+            'imported': sum(change['quantity_delta'] for change in changes),
+            'skipped': skipped,
+            'unresolved': [name for name, card_id in card_ids.items() if card_id is None],
+            'cards': cards,
+            'imported_at': datetime.now()
+        }
+
+    def export_decklist(self, user_id, deck_id, fmt="text"):
+        """
+        Write a user's deck as a decklist.
+
+        Parameters
+        ----------
+        user_id : int
+            The user id.
+        deck_id : int
+            The deck id.
+        fmt : str, optional
+            "text", "mtga" or "mtgo" (`.dek` file). Default is "text".
+
+        Returns
+        -------
+        str :
+            The decklist.
+
+        Raises
+        ------
+        ValueError
+            If the format is unknown, the user or deck does not exist, or the
+            deck does not belong to the user.
+        """
+        if fmt not in DECKLIST_FORMATS:
+            raise ValueError(f"Unknown decklist format: {fmt}")
+        return format_decklist(self.deck.get_by_id(deck_id, user_id=user_id), fmt)
@@ -1,28 +1,70 @@
+import threading
 from abc import ABC, abstractmethod
-import sys
-from utils.dbConnection import dbConnection
+from utils.dbConnection import get_pool
 from psycopg2.extras import RealDictCursor
 
 
 class AbstractDao(ABC):
     def __init__(self):
-        self.conn = None
-        self.cursor = None
+        # One DAO instance serves the concurrent requests of FastAPI's
+        # threadpool: each thread borrows its own connection and cursor
+        self.__dict__.setdefault("_local", threading.local())
+
+    @property
+    def _state(self):
+        local = self.__dict__.setdefault("_local", threading.local())
+        if not hasattr(local, "borrowed"):
+            local.conn = None
+            local.cursor = None
+            # Connections borrowed by enclosing `with self:` blocks
+            local.borrowed = []
+        return local
+
+    @property
+    def conn(self):
+        return self._state.conn
+
+    @conn.setter
+    def conn(self, value):
+        self._state.conn = value
+
+    @property
+    def cursor(self):
+        return self._state.cursor
+
+    @cursor.setter
+    def cursor(self, value):
+        self._state.cursor = value
+
+    @property
+    def _borrowed(self):
+        return self._state.borrowed
 
     def __enter__(self):
-        self.db = dbConnection()
+        pool = get_pool()
+        conn = pool.getconn()
         try:
-            self.conn = self.db.__enter__()
-            self.cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
         except Exception:
-            self.db.__exit__(*sys.exc_info())
+            pool.putconn(conn, discard=True)
             raise
+        self._borrowed.append((pool, self.conn, self.cursor))
+        self.conn = conn
+        self.cursor = cursor
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.cursor:
-            self.cursor.close()
-        self.db.__exit__(exc_type, exc_val, exc_tb)
+        pool, previous_conn, previous_cursor = self._borrowed.pop()
+        try:
+            if self.cursor:
+                self.cursor.close()
+        finally:
+            pool.putconn(self.conn)
+            # Hand the enclosing block its own connection back, or forget the
+            # returned one (None) so that it is never used after another
+            # borrower got it
+            self.conn = previous_conn
+            self.cursor = previous_cursor
 
     @abstractmethod
     def exist(self, id):
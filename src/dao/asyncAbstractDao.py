@@ -0,0 +1,36 @@
+from abc import ABC
+from contextlib import asynccontextmanager
+from psycopg.rows import dict_row
+from utils.asyncDbConnection import get_async_pool
+
+
+class AsyncAbstractDao(ABC):
+    """
+    Base class of the asyncio DAOs.
+
+    Async DAOs are shared by concurrent requests, so they keep no connection
+    on the instance: every query borrows one through `cursor()`.
+    """
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Borrow a connection from the async pool, for several statements that
+        manage their own transactions (e.g. a pipeline).
+        """
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def cursor(self):
+        """
+        Borrow a connection from the async pool and yield a dict cursor.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises.
+        """
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                yield cursor
@@ -0,0 +1,371 @@
+import psycopg
+from dao.asyncAbstractDao import AsyncAbstractDao
+from dao.cardDao import CardDao
+from services.cardCache import CardCache, get_card_cache
+from services.cardSampler import CardSampler, get_card_sampler
+from services.filterIndex import FilterIndex, get_filter_index
+
+
+class AsyncCardDao(AsyncAbstractDao):
+    """asyncio counterpart of `CardDao` for the read-only card endpoints."""
+
+    columns_valid = CardDao.columns_valid
+
+    def __init__(
+        self,
+        cache: CardCache = None,
+        sampler: CardSampler = None,
+        filter_index: FilterIndex = None,
+    ):
+        """
+        Initialize the DAO.
+
+        Parameters
+        ----------
+        cache : CardCache, optional
+            Cache used by `get_by_id`, shared with `CardDao` by default.
+        sampler : CardSampler, optional
+            Sampler used by `get_random_cards`, shared with `CardDao` by default.
+        filter_index : FilterIndex, optional
+            Bitsets resolving the filters of `filter`, shared with `CardDao`
+            by default.
+        """
+        self.cache = cache if cache is not None else get_card_cache()
+        self.sampler = sampler if sampler is not None else get_card_sampler()
+        self.filter_index = (
+            filter_index if filter_index is not None else get_filter_index()
+        )
+
+    async def shape(self):
+        """
+        Retrieve the shape of the cards dataset in the database.
+
+        Returns
+        -------
+        tuple
+            `(row_count, column_count)`, see `CardDao.shape`.
+
+        Raises
+        ------
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute("SELECT count(*) FROM cards;")
+                row = await cursor.fetchone()
+                return row.get("count"), len(self.columns_valid)
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    @staticmethod
+    def _check_id(id):
+        if not isinstance(id, int):
+            raise TypeError("Card ID must be an integer")
+        if id < 0:
+            raise ValueError("Card ID must be a positive integer")
+
+    async def exist(self, id):
+        """
+        Check if a card with the given ID exists in the database.
+
+        Parameters
+        ----------
+        id : int
+            The ID of the card to check.
+
+        Returns
+        -------
+        bool
+            True if a card with the specified ID exists, False otherwise.
+
+        Raises
+        ------
+        TypeError
+            If `id` is not an integer.
+        ValueError
+            If `id` is a negative integer.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        self._check_id(id)
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT 1 FROM cards WHERE id = %s LIMIT 1;", (id,)
+                )
+                return await cursor.fetchone() is not None
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def get_by_id(self, id, profile: str = "full"):
+        """
+        Fetch a card by its ID, from `self.cache` or in a single query.
+
+        Parameters
+        ----------
+        id : int
+            The ID of the card to fetch.
+        profile : str, optional
+            Projection profile of the returned card, see `CardDao.PROFILES`.
+            Default is "full".
+
+        Returns
+        -------
+        dict or None
+            The card, or None if no card has this ID.
+
+        Raises
+        ------
+        TypeError
+            If `id` is not an integer.
+        ValueError
+            If `id` is a negative integer or the profile is unknown.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        self._check_id(id)
+        CardDao.select_list(profile)
+        card = self.cache.get(id)
+        if card is not None:
+            return CardDao.project(card, profile)
+        version = self.cache.version
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT * FROM cards WHERE id = %s LIMIT 1;", (id,)
+                )
+                row = await cursor.fetchone()
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+        self.cache.put(id, row, version)
+        return CardDao.project(row, profile)
+
+    async def get_similar(self, card_id: int, limit: int = 10, profile: str = "summary"):
+        """
+        Return the precomputed nearest cards of a card, see `CardDao.get_similar`.
+
+        Returns
+        -------
+        list[dict] or None
+            The cards with their `distance`, nearest first, or None if no
+            neighbors were computed for this card.
+
+        Raises
+        ------
+        ValueError
+            If `limit` is not positive or the profile is unknown.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        sql_query, params = CardDao._similar_query(card_id, limit, profile)
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(sql_query, params)
+                return await cursor.fetchall() or None
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def filter(
+        self,
+        order_by: str,
+        asc: bool = True,
+        limit: int = 10,
+        offset: int = 0,
+        profile: str = "full",
+        after: str = None,
+        **kwargs,
+    ):
+        """
+        Retrieve cards using dynamic filters, see `CardDao.filter`.
+
+        Returns
+        -------
+        list[dict]
+            The cards matching the filters.
+
+        Raises
+        ------
+        ValueError
+            If a filter key or `order_by` is not a valid column, or if the
+            profile or the page token is invalid.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        sql_query, params = CardDao._filter_query(
+            order_by, asc, limit, offset, profile, after, self.filter_index, **kwargs
+        )
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(sql_query, params)
+                return await cursor.fetchall()
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def filter_page(
+        self,
+        order_by: str,
+        asc: bool = True,
+        limit: int = 10,
+        offset: int = 0,
+        profile: str = "full",
+        after: str = None,
+        **kwargs,
+    ):
+        """
+        Retrieve a keyset-paginated page of `filter`, see `CardDao.filter_page`.
+
+        Returns
+        -------
+        tuple[list[dict], str or None]
+            The cards and the token of the next page, None on the last page.
+        """
+        rows = await self.filter(
+            order_by, asc, limit, offset, profile=profile, after=after, **kwargs
+        )
+        return rows, CardDao.next_page_token(rows, order_by, asc, limit)
+
+    async def search_by_name(
+        self,
+        name: str,
+        limit: int = 20,
+        offset: int = 0,
+        profile: str = "summary",
+        after: str = None,
+        mode: str = "contains",
+    ):
+        """
+        Search for cards by name, see `CardDao.search_by_name`.
+
+        Returns
+        -------
+        list[dict]
+            List of cards matching the search criteria.
+
+        Raises
+        ------
+        ValueError
+            If name is empty, limit/offset are invalid, or the mode, the
+            profile or the page token is invalid.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        sql_query, params = CardDao._search_by_name_query(
+            name, limit, offset, profile, after, mode
+        )
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(sql_query, params)
+                return await cursor.fetchall()
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def search_by_name_page(
+        self,
+        name: str,
+        limit: int = 20,
+        offset: int = 0,
+        profile: str = "summary",
+        after: str = None,
+        mode: str = "contains",
+    ):
+        """
+        Retrieve a page of `search_by_name` and the next token, see
+        `CardDao.search_by_name_page`.
+
+        Returns
+        -------
+        tuple[list[dict], str or None]
+            The cards and the token of the next page, None on the last page.
+        """
+        rows = await self.search_by_name(
+            name, limit=limit, offset=offset, profile=profile, after=after, mode=mode
+        )
+        if mode == "similar":
+            return rows, None
+        return rows, CardDao.next_page_token(rows, "name", True, limit)
+
+    async def get_random_cards(self, count: int = 1, colors=None, types=None):
+        """
+        Retrieve distinct cards drawn uniformly at random, see
+        `CardDao.get_random_cards`.
+
+        Returns
+        -------
+        list[dict]
+            Up to `count` cards.
+
+        Raises
+        ------
+        ValueError
+            If `count` is not positive.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        if count <= 0:
+            raise ValueError("count must be positive")
+        key = self.sampler.key(colors, types)
+        try:
+            ids = self.sampler.get(key)
+            if ids is None:
+                version = self.cache.version
+                query, params = CardDao._random_candidates_query(colors, types)
+                async with self.cursor() as cursor:
+                    await cursor.execute(query, params)
+                    rows = await cursor.fetchall()
+                ids = self.sampler.put(key, (row["id"] for row in rows), version)
+            chosen = self.sampler.sample(ids, count)
+            if not chosen:
+                return []
+            async with self.cursor() as cursor:
+                await cursor.execute(CardDao.RANDOM_CARDS_QUERY, (chosen,))
+                return CardDao._in_sample_order(await cursor.fetchall(), chosen)
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def get_random_card(self):
+        """
+        Retrieve a random card from the database.
+
+        Returns
+        -------
+        dict or None
+            A randomly selected card, None if the table is empty.
+
+        Raises
+        ------
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        cards = await self.get_random_cards(1)
+        return cards[0] if cards else None
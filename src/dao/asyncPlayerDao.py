@@ -0,0 +1,472 @@
+import asyncio
+import numpy
+import psycopg
+import psycopg.errors
+import psycopg2
+from psycopg.rows import dict_row
+from dao.asyncAbstractDao import AsyncAbstractDao
+from dao.playerDao import PlayerDao
+from services.embeddingService import EmbeddingService
+from services.embeddingBatcher import EmbeddingBatcher
+from services.vectorSearchEngine import VectorSearchEngine
+from services.searchPlanner import SearchPlanner
+from services.filterIndex import FilterIndex, get_filter_index
+from services.cardCache import get_card_cache
+
+
+class AsyncPlayerDao(AsyncAbstractDao):
+    """asyncio counterpart of `PlayerDao` used by the search endpoints."""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService = None,
+        batcher: EmbeddingBatcher = None,
+        backend: str = None,
+        engine: VectorSearchEngine = None,
+        quantization: str = None,
+        rerank_factor: int = None,
+        planner: SearchPlanner = None,
+        filter_index: FilterIndex = None,
+    ):
+        """
+        Initialize AsyncPlayerDao with an optional embedding service.
+
+        Parameters
+        ----------
+        embedding_service : EmbeddingService, optional
+            Service for generating embeddings. If None, creates a new instance.
+        batcher : EmbeddingBatcher, optional
+            Micro-batcher used to embed text queries. If None, each query is
+            embedded on its own.
+        backend : str, optional
+            "pgvector" or "memory", see `PlayerDao`. Default is
+            `SEARCH_BACKEND` or "pgvector".
+        engine : VectorSearchEngine, optional
+            Engine used by the "memory" backend. If None, creates a new one.
+        quantization : str, optional
+            "float16" or "int8" two-stage search, see `PlayerDao`.
+        rerank_factor : int, optional
+            Candidates re-ranked per requested result, see `PlayerDao`.
+        planner : SearchPlanner, optional
+            Chooses how filtered "pgvector" searches run, see `PlayerDao`.
+        filter_index : FilterIndex, optional
+            Bitsets resolving the search filters, shared by default.
+        """
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.batcher = batcher
+        (
+            self.backend,
+            self.engine,
+            self.quantization,
+            self.rerank_factor,
+        ) = PlayerDao._search_backend(backend, engine, quantization, rerank_factor)
+        self.planner = planner or SearchPlanner()
+        self.filter_index = (
+            filter_index if filter_index is not None else get_filter_index()
+        )
+
+    async def embed_query(self, query):
+        """
+        Turn a search query into an embedding vector.
+
+        Text queries go through the micro-batcher when there is one, otherwise
+        the blocking embedding call runs in a worker thread. The vector is
+        sent as a float array and cast to `vector` in SQL.
+
+        Parameters
+        ----------
+        query : str or list
+            Either a text query (str) to be embedded, or an embedding vector.
+
+        Returns
+        -------
+        list[float]
+            The query embedding.
+
+        Raises
+        ------
+        ValueError
+            If the query is neither a string nor a vector.
+        """
+        if isinstance(query, str):
+            if self.batcher is not None:
+                query = await self.batcher.vectorize(query)
+            else:
+                query = await asyncio.to_thread(
+                    self.embedding_service.vectorize, query
+                )
+        elif not isinstance(query, (list, tuple, numpy.ndarray)):
+            raise ValueError("Query must be either a string or an embedding vector")
+        return numpy.asarray(query, dtype=float).tolist()
+
+    async def natural_language_search(
+        self,
+        query,
+        filters=None,
+        limit=5,
+        ef_search=None,
+        probes=None,
+        statement_timeout=None,
+    ):
+        """
+        Search for Magic cards using vector similarity search.
+
+        Same parameters and results as `PlayerDao.natural_language_search`.
+
+        Raises
+        ------
+        ValueError
+            If limit is not positive, query is invalid or a search knob is
+            out of range.
+        TimeoutError
+            If the database cancelled the search after `statement_timeout`.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        settings = PlayerDao._search_settings(ef_search, probes, statement_timeout)
+
+        query_embedding = await self.embed_query(query)
+        if self.backend == "memory":
+            return await self._memory_search(query_embedding, filters, limit)
+
+        try:
+            async with self.cursor() as cursor:
+                counts = await self._search_counts(cursor, filters)
+                strategy, settings = PlayerDao._search_plan(
+                    self.planner,
+                    counts,
+                    limit * self.rerank_factor if self.quantization else limit,
+                    ef_search,
+                    probes,
+                    statement_timeout,
+                )
+                for setting_sql, setting_params in settings:
+                    await cursor.execute(setting_sql, setting_params)
+                await cursor.execute(*PlayerDao._search_query(
+                    query_embedding,
+                    filters,
+                    limit,
+                    self.quantization,
+                    self.rerank_factor,
+                    strategy,
+                    self.filter_index,
+                ))
+                results = await cursor.fetchall()
+                if strategy == "ann" and filters and len(results) < limit:
+                    # The index ran out of candidates passing the filters
+                    await cursor.execute(*PlayerDao._search_query(
+                        query_embedding,
+                        filters,
+                        limit,
+                        strategy="exact",
+                        filter_index=self.filter_index,
+                    ))
+                    results = await cursor.fetchall()
+                return results
+        except psycopg.errors.QueryCanceled as e:
+            raise TimeoutError(f"Search cancelled: {e}") from e
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def _search_counts(self, cursor, filters):
+        """
+        Return the `(matched, total)` counts planning a filtered search.
+
+        They come from the planner cache or the filter index when possible,
+        otherwise from `SearchPlanner.count_query` run on `cursor`.
+        """
+        counts = self.planner.counts(filters) or self.filter_index.count(
+            PlayerDao._filter_conditions(filters)
+        )
+        if counts is None:
+            version = get_card_cache().version
+            await cursor.execute(
+                *self.planner.count_query(PlayerDao._filter_conditions(filters))
+            )
+            row = await cursor.fetchone()
+            counts = self.planner.put(
+                self.planner.key(filters), row["matched"], row["total"], version
+            )
+        return counts
+
+    async def batch_search(self, queries):
+        """
+        Run several vector searches with one embedding call and one connection.
+
+        Text queries are embedded together (`EmbeddingService.vectorize_many`
+        sends the uncached ones in one request). The searches then run on a
+        single pooled connection in pipeline mode, each in its own
+        transaction so that its index knobs do not leak to the next one.
+
+        Parameters
+        ----------
+        queries : list of dict
+            One dict per search with the arguments of `natural_language_search`:
+            `query` (text or vector) and optionally `filters`, `limit`
+            (default 5), `ef_search` and `probes`.
+
+        Returns
+        -------
+        list[list]
+            The results of each search, in the order of `queries`.
+
+        Raises
+        ------
+        ValueError
+            If a query, limit or search knob is invalid.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        queries = [dict(query) for query in queries]
+        for query in queries:
+            query.setdefault("limit", 5)
+            if query["limit"] <= 0:
+                raise ValueError("Limit must be positive")
+            PlayerDao._search_settings(query.get("ef_search"), query.get("probes"))
+        if not queries:
+            return []
+        embeddings = await self.embed_queries([query["query"] for query in queries])
+        if self.backend == "memory":
+            return await self._memory_batch_search(embeddings, queries)
+
+        try:
+            async with self.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    plans = []
+                    for query in queries:
+                        counts = await self._search_counts(cursor, query.get("filters"))
+                        plans.append(PlayerDao._search_plan(
+                            self.planner,
+                            counts,
+                            query["limit"] * self.rerank_factor
+                            if self.quantization
+                            else query["limit"],
+                            query.get("ef_search"),
+                            query.get("probes"),
+                            None,
+                        ))
+                # Counting may have opened a transaction; each search needs its own
+                await conn.commit()
+
+                searches = []
+                async with conn.pipeline():
+                    for embedding, query, (strategy, settings) in zip(
+                        embeddings, queries, plans
+                    ):
+                        search = conn.cursor(row_factory=dict_row)
+                        async with conn.transaction():
+                            for setting_sql, setting_params in settings:
+                                await conn.execute(setting_sql, setting_params)
+                            await search.execute(*PlayerDao._search_query(
+                                embedding,
+                                query.get("filters"),
+                                query["limit"],
+                                self.quantization,
+                                self.rerank_factor,
+                                strategy,
+                                self.filter_index,
+                            ))
+                        searches.append(search)
+
+                results = []
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    for embedding, query, (strategy, _), search in zip(
+                        embeddings, queries, plans, searches
+                    ):
+                        rows = await search.fetchall()
+                        await search.close()
+                        filters = query.get("filters")
+                        if strategy == "ann" and filters and len(rows) < query["limit"]:
+                            # The index ran out of candidates passing the filters
+                            await cursor.execute(*PlayerDao._search_query(
+                                embedding,
+                                filters,
+                                query["limit"],
+                                strategy="exact",
+                                filter_index=self.filter_index,
+                            ))
+                            rows = await cursor.fetchall()
+                        results.append(rows)
+                return results
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def embed_queries(self, queries):
+        """
+        Turn several search queries into embedding vectors.
+
+        Text queries are embedded in one `vectorize_many` call, run in a
+        worker thread; vectors are passed through.
+
+        Returns
+        -------
+        list[list[float]]
+            One embedding per query, in order.
+
+        Raises
+        ------
+        ValueError
+            If a query is neither a string nor a vector.
+        """
+        texts = [query for query in queries if isinstance(query, str)]
+        for query in queries:
+            if not isinstance(query, (str, list, tuple, numpy.ndarray)):
+                raise ValueError("Query must be either a string or an embedding vector")
+        embedded = iter(
+            await asyncio.to_thread(self.embedding_service.vectorize_many, texts)
+            if texts
+            else []
+        )
+        return [
+            numpy.asarray(
+                next(embedded) if isinstance(query, str) else query, dtype=float
+            ).tolist()
+            for query in queries
+        ]
+
+    async def _memory_batch_search(self, embeddings, queries):
+        try:
+            hits = await asyncio.to_thread(
+                lambda: [
+                    self.engine.search(
+                        embedding,
+                        PlayerDao._filter_conditions(query.get("filters")),
+                        query["limit"],
+                    )
+                    for embedding, query in zip(embeddings, queries)
+                ]
+            )
+            all_hits = [hit for query_hits in hits for hit in query_hits]
+            if not all_hits:
+                return [[] for _ in queries]
+            # One read hydrates the rows of every search
+            async with self.cursor() as cursor:
+                await cursor.execute(*PlayerDao._hydrate_query(all_hits))
+                rows = await cursor.fetchall()
+            return [PlayerDao._merge_hits(rows, query_hits) for query_hits in hits]
+        except (psycopg.OperationalError, psycopg2.OperationalError) as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def lexical_search(self, text, filters=None, limit=5, statement_timeout=None):
+        """
+        Search for Magic cards by name and rules text.
+
+        Same parameters and results as `PlayerDao.lexical_search`.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Lexical search needs a non-empty text query")
+        settings = PlayerDao._search_settings(statement_timeout=statement_timeout)
+
+        try:
+            async with self.cursor() as cursor:
+                for setting_sql, setting_params in settings:
+                    await cursor.execute(setting_sql, setting_params)
+                await cursor.execute(
+                    *PlayerDao._lexical_query(text, filters, limit, self.filter_index)
+                )
+                return await cursor.fetchall()
+        except psycopg.errors.QueryCanceled as e:
+            raise TimeoutError(f"Search cancelled: {e}") from e
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def hybrid_search(
+        self,
+        text,
+        filters=None,
+        limit=5,
+        vector_weight=1.0,
+        lexical_weight=1.0,
+        timeout=None,
+        ef_search=None,
+        probes=None,
+    ):
+        """
+        Search for Magic cards with both the vector and the lexical search.
+
+        Both searches run concurrently and are fused like in
+        `PlayerDao.hybrid_search`; a search still running after `timeout`
+        milliseconds is cancelled and left out.
+        """
+        timeout = PlayerDao._hybrid_timeout(
+            text, limit, vector_weight, lexical_weight, timeout
+        )
+        # Reject invalid knobs now rather than as a failed vector search
+        PlayerDao._search_settings(ef_search, probes)
+        candidates = limit * PlayerDao.HYBRID_CANDIDATE_FACTOR
+
+        legs = {}
+        if vector_weight > 0:
+            legs["vector"] = self.natural_language_search(
+                text, filters, candidates, ef_search, probes, statement_timeout=timeout
+            )
+        if lexical_weight > 0:
+            legs["lexical"] = self.lexical_search(
+                text, filters, candidates, statement_timeout=timeout
+            )
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(leg, timeout / 1000) for leg in legs.values()),
+            return_exceptions=True,
+        )
+
+        results, errors = {}, []
+        for name, outcome in zip(legs, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors.append(TimeoutError(f"{name} search timed out after {timeout} ms"))
+            elif isinstance(outcome, Exception):
+                errors.append(outcome)
+            else:
+                results[name] = outcome
+        return PlayerDao._hybrid_results(
+            results, errors, limit, vector_weight, lexical_weight
+        )
+
+    async def _memory_search(self, query_embedding, filters, limit):
+        try:
+            # Loading the engine and resolving filter masks may block
+            hits = await asyncio.to_thread(
+                self.engine.search,
+                query_embedding,
+                PlayerDao._filter_conditions(filters),
+                limit,
+            )
+            if not hits:
+                return []
+            async with self.cursor() as cursor:
+                await cursor.execute(*PlayerDao._hydrate_query(hits))
+                return PlayerDao._merge_hits(await cursor.fetchall(), hits)
+        except (psycopg.OperationalError, psycopg2.OperationalError) as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    async def get_card_embedding(self, card_id):
+        """Get the embedding vector of a card as a list of floats."""
+        try:
+            async with self.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT embedding::real[] AS embedding FROM cards WHERE id = %s",
+                    (card_id,),
+                )
+                result = await cursor.fetchone()
+                return result["embedding"] if result else None
+        except psycopg.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
@@ -1,5 +1,12 @@
+import numpy
 from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_values
+from pgvector.psycopg2 import register_vector
 from dao.abstractDao import AbstractDao
+from utils.pageToken import encode_page_token, decode_page_token
+from services.cardCache import CardCache, get_card_cache
+from services.filterIndex import ARRAY_FIELDS, FilterIndex, get_filter_index
+from services.cardSampler import CardSampler, get_card_sampler
 
 
 class CardDao(AbstractDao):
@@ -47,6 +54,143 @@ class CardDao(AbstractDao):
         "raw",
     }
 
+    # Columns returned by each projection profile, None meaning every column.
+    # "summary" is what card lists render, "detail" leaves out the heavy
+    # `raw` JSONB, `embedding` and `text_to_embed` columns.
+    SUMMARY_COLUMNS = (
+        "id",
+        "name",
+        "ascii_name",
+        "type",
+        "mana_cost",
+        "mana_value",
+        "colors",
+        "color_identity",
+        "power",
+        "toughness",
+        "loyalty",
+        "defense",
+        "edhrec_rank",
+        "image_url",
+    )
+    PROFILES = {
+        "summary": SUMMARY_COLUMNS,
+        "detail": SUMMARY_COLUMNS
+        + tuple(
+            sorted(
+                columns_valid
+                - set(SUMMARY_COLUMNS)
+                - {"raw", "embedding", "text_to_embed"}
+            )
+        ),
+        "full": None,
+    }
+
+    # Matching modes of `search_by_name`, see `_search_by_name_query`
+    NAME_SEARCH_MODES = ("contains", "prefix", "similar")
+
+    @classmethod
+    def select_list(cls, profile: str = "full", include=()) -> str:
+        """
+        Return the SELECT list of a projection profile.
+
+        Parameters
+        ----------
+        profile : str, optional
+            One of `PROFILES`: "summary", "detail" or "full". Default is "full".
+        include : tuple of str, optional
+            Columns added to the profile when missing, e.g. the sort column.
+
+        Returns
+        -------
+        str
+            The comma-separated columns, or "*" for the full profile.
+
+        Raises
+        ------
+        ValueError
+            If the profile is unknown.
+        """
+        if profile not in cls.PROFILES:
+            raise ValueError(
+                f"Invalid profile: {profile}, expected one of {list(cls.PROFILES)}"
+            )
+        columns = cls.PROFILES[profile]
+        if columns is None:
+            return "*"
+        return ", ".join(columns + tuple(c for c in include if c not in columns))
+
+    @classmethod
+    def project(cls, card, profile: str = "full"):
+        """
+        Restrict a full card row to the columns of a projection profile.
+
+        Parameters
+        ----------
+        card : dict or None
+            A card with every column, e.g. as returned by `get_by_id`.
+        profile : str, optional
+            One of `PROFILES`. Default is "full".
+
+        Returns
+        -------
+        dict or None
+            The projected card, None if `card` is None.
+        """
+        cls.select_list(profile)
+        columns = cls.PROFILES[profile]
+        if card is None or columns is None:
+            return card
+        return {column: card.get(column) for column in columns}
+
+    def __init__(
+        self,
+        cache: CardCache = None,
+        sampler: CardSampler = None,
+        filter_index: FilterIndex = None,
+    ):
+        """
+        Initialize the DAO.
+
+        Parameters
+        ----------
+        cache : CardCache, optional
+            Cache used by `get_by_id`. Default is the cache shared by the process.
+        sampler : CardSampler, optional
+            Sampler used by `get_random_cards`. Default is the sampler shared
+            by the process.
+        filter_index : FilterIndex, optional
+            Bitsets resolving the filters of `filter`. Default is the index
+            shared by the process.
+        """
+        super().__init__()
+        self.cache = cache if cache is not None else get_card_cache()
+        self.sampler = sampler if sampler is not None else get_card_sampler()
+        self.filter_index = (
+            filter_index if filter_index is not None else get_filter_index()
+        )
+
+    RANDOM_CARD_COLUMNS = (
+        "id",
+        "name",
+        "ascii_name",
+        "type",
+        "mana_cost",
+        "mana_value",
+        "text",
+        "colors",
+        "color_identity",
+        "image_url",
+        "layout",
+        "power",
+        "toughness",
+        "loyalty",
+        "keywords",
+    )
+    RANDOM_CARDS_QUERY = (
+        f"SELECT {', '.join(RANDOM_CARD_COLUMNS)} FROM cards WHERE id = ANY(%s)"
+    )
+
     def shape(self):
         """
         Retrieve the shape of the cards dataset in the database.
@@ -121,11 +265,16 @@ class CardDao(AbstractDao):
             print(f"Error connecting to the database: {e}")
             exit()
 
-    def get_by_id(self, id):
+    def get_by_id(self, id, profile: str = "full"):
         """Fetch a card by its ID and return it as a dictionary.
 
+        Cards are served from `self.cache` when possible; a miss costs a
+        single query.
+
         Args:
-            card_id (int): The ID of the card to fetch.
+            id (int): The ID of the card to fetch.
+            profile (str): Projection profile of the returned card, see
+            `PROFILES`. Full rows are cached whatever the profile.
 
         Returns:
             dict: A dictionary representing the card, where keys are column
@@ -133,23 +282,98 @@ class CardDao(AbstractDao):
                   Returns `None` if no card is found with the given ID.
 
         Raises:
-            ValueError: If the provided `card_id` is not a positive integer.
+            TypeError: If `id` is not an integer.
+            ValueError: If `id` is a negative integer or the profile is
+            unknown.
             psycopg2.Error: If a database error occurs during the query
             execution.
         """
-        if self.exist(id):
-            try:
-                with self:
-                    sql_query = """
-                    SELECT * FROM cards WHERE id = %s LIMIT 1;
-                    """
-                    param = (id,)
-                    self.cursor.execute(sql_query, param)
-                    row = self.cursor.fetchone()
-                    return row
-            except Exception as e:
-                print(f"Error connecting to the database: {e}")
-                exit()
+        if not isinstance(id, int):
+            raise TypeError("Card ID must be an integer")
+        if id < 0:
+            raise ValueError("Card ID must be a positive integer")
+        self.select_list(profile)
+        card = self.cache.get(id)
+        if card is not None:
+            return self.project(card, profile)
+        # Read before the query so a concurrent write discards this row
+        version = self.cache.version
+        try:
+            with self:
+                sql_query = """
+                SELECT * FROM cards WHERE id = %s LIMIT 1;
+                """
+                param = (id,)
+                self.cursor.execute(sql_query, param)
+                row = self.cursor.fetchone()
+        except Exception as e:
+            print(f"Error connecting to the database: {e}")
+            exit()
+        self.cache.put(id, row, version)
+        return self.project(row, profile)
+
+    def get_similar(self, card_id: int, limit: int = 10, profile: str = "summary"):
+        """
+        Return the cards nearest to a card, from the `card_neighbors` table.
+
+        The neighbors are precomputed by `utils.cardNeighbors`, so this is
+        one primary key read joined with the neighbor rows.
+
+        Parameters
+        ----------
+        card_id : int
+            The card ID.
+        limit : int, optional
+            Maximum number of cards returned. Default is 10.
+        profile : str, optional
+            Projection profile of the returned cards, see `PROFILES`.
+            Default is "summary".
+
+        Returns
+        -------
+        list[dict] or None
+            The cards with their `distance`, nearest first, or None if no
+            neighbors were computed for this card.
+
+        Raises
+        ------
+        ValueError
+            If `limit` is not positive or the profile is unknown.
+        """
+        sql_query, params = self._similar_query(card_id, limit, profile)
+        try:
+            with self:
+                self.cursor.execute(sql_query, params)
+                return self.cursor.fetchall() or None
+        except Exception as e:
+            print(f"Error fetching similar cards: {e}")
+            raise
+
+    @classmethod
+    def _similar_query(cls, card_id: int, limit: int = 10, profile: str = "summary"):
+        """
+        Build the SQL query and parameters used by `get_similar`.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query and its parameters.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        select_list = cls.select_list(profile, include=("id",))
+        if select_list == "*":
+            select_list = "cards.*"
+        sql_query = f"""
+            SELECT {select_list}, n.distance
+            FROM card_neighbors AS cn
+            CROSS JOIN LATERAL unnest(cn.neighbor_ids[1:%s], cn.distances[1:%s])
+                WITH ORDINALITY AS n(neighbor_id, distance, rank)
+            JOIN cards ON cards.id = n.neighbor_id
+            WHERE cn.card_id = %s
+            ORDER BY n.rank
+        """
+        return sql_query, [limit, limit, card_id]
 
     def create(self, **kwargs):
         """
@@ -211,6 +435,8 @@ class CardDao(AbstractDao):
                 self.cursor.execute(sql_query, params)
                 self.conn.commit()
                 new_card = self.cursor.fetchone()
+                if new_card is not None:
+                    self.cache.invalidate(new_card["id"])
                 return new_card
         except Exception as e:
             print(f"Error connecting to the database: {e}")
@@ -271,6 +497,7 @@ class CardDao(AbstractDao):
                     self.cursor.execute(sql_query, params)
                     self.conn.commit()
                     updated_card = self.cursor.fetchone()
+                    self.cache.invalidate(id)
                     return updated_card
             except Exception as e:
                 print(f"Error connecting to the database: {e}")
@@ -316,6 +543,7 @@ class CardDao(AbstractDao):
                     self.cursor.execute(sql_query, param)
                     row = self.cursor.fetchone()
                     self.conn.commit()
+                    self.cache.invalidate(id)
                     return row
             except Exception as e:
                 print(f"Error connecting to the database: {e}")
@@ -354,6 +582,7 @@ class CardDao(AbstractDao):
                 query = sql.SQL("UPDATE cards SET text_to_embed = %s WHERE id = %s")
                 self.cursor.execute(query, (embed_me, card_id))
                 self.conn.commit()
+                self.cache.invalidate(card_id)
 
                 # Check if the update was successful
                 if self.cursor.rowcount == 0:
@@ -396,6 +625,7 @@ class CardDao(AbstractDao):
                 query = sql.SQL("UPDATE cards SET embedding = %s WHERE id = %s")
                 self.cursor.execute(query, (vector_me, card_id))
                 self.conn.commit()
+                self.cache.invalidate(card_id)
                 if self.cursor.rowcount == 0:
                     raise ValueError(f"No card found with ID {card_id}")
                 return self.cursor.rowcount
@@ -403,12 +633,122 @@ class CardDao(AbstractDao):
             print(f"Error updating embedding: {e}")
             raise
 
+    EMBEDDING_SOURCE_COLUMNS = (
+        "id",
+        "name",
+        "type",
+        "mana_cost",
+        "power",
+        "toughness",
+        "loyalty",
+        "defense",
+        "text",
+        "keywords",
+    )
+
+    def iter_embedding_sources(
+        self,
+        start_after: int = 0,
+        end_at: int = None,
+        only_missing: bool = False,
+        itersize: int = 2000,
+    ):
+        """
+        Stream the columns needed to build `text_to_embed`, ordered by id.
+
+        Rows are read through a server-side cursor, so the whole table is
+        never loaded in memory.
+
+        Parameters
+        ----------
+        start_after : int, optional
+            Only cards with an id greater than this are returned. Default is 0.
+        end_at : int, optional
+            Last card id returned. Default is no upper bound.
+        only_missing : bool, optional
+            Only return cards without an embedding. Default is False.
+        itersize : int, optional
+            Number of rows fetched from the server at a time. Default is 2000.
+
+        Yields
+        ------
+        dict
+            The `EMBEDDING_SOURCE_COLUMNS` of a card.
+        """
+        query = (
+            f"SELECT {', '.join(self.EMBEDDING_SOURCE_COLUMNS)} FROM cards "
+            "WHERE id > %s"
+        )
+        params = [start_after]
+        if end_at is not None:
+            query += " AND id <= %s"
+            params.append(end_at)
+        if only_missing:
+            query += " AND embedding IS NULL"
+        query += " ORDER BY id"
+
+        with self:
+            conn = self.conn
+            with conn.cursor(
+                name="embedding_sources", cursor_factory=RealDictCursor
+            ) as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+                yield from cursor
+
+    def bulk_update_embeddings(self, rows) -> int:
+        """
+        Write `text_to_embed` and `embedding` for many cards in one statement.
+
+        Parameters
+        ----------
+        rows : list of tuple
+            `(card_id, text_to_embed, embedding)` triples.
+
+        Returns
+        -------
+        int
+            The number of rows updated.
+
+        Raises
+        ------
+        psycopg2.Error
+            If a database error occurs; the whole batch is rolled back.
+        """
+        if not rows:
+            return 0
+        try:
+            with self:
+                register_vector(self.conn)
+                execute_values(
+                    self.cursor,
+                    "UPDATE cards AS c "
+                    "SET text_to_embed = v.text_to_embed, embedding = v.embedding "
+                    "FROM (VALUES %s) AS v(id, text_to_embed, embedding) "
+                    "WHERE c.id = v.id",
+                    [
+                        (card_id, text, numpy.asarray(embedding, dtype=numpy.float32))
+                        for card_id, text, embedding in rows
+                    ],
+                    template="(%s, %s, %s::vector)",
+                    page_size=len(rows),
+                )
+                updated = self.cursor.rowcount
+                self.conn.commit()
+                self.cache.invalidate(*(card_id for card_id, _, _ in rows))
+                return updated
+        except Exception as e:
+            print(f"Error updating embeddings: {e}")
+            raise
+
     def filter(
         self,
         order_by: str,
         asc: bool = True,
         limit: int = 10,
         offset: int = 0,
+        profile: str = "full",
+        after: str = None,
         **kwargs,
     ):
         """
@@ -417,7 +757,7 @@ class CardDao(AbstractDao):
         This method builds a SQL SELECT query on the `cards` table with:
         - Dynamic filters passed via **kwargs
         - Optional sorting (ORDER BY)
-        - Pagination (LIMIT / OFFSET)
+        - Pagination (keyset with `after`, or LIMIT / OFFSET)
 
         Parameters:
         -----------
@@ -429,6 +769,11 @@ class CardDao(AbstractDao):
             Maximum number of results to return.
         offset : int, optional, default=0
             Offset for pagination.
+        profile : str, optional, default="full"
+            Projection profile of the returned cards, see `PROFILES`.
+        after : str, optional
+            Token of the previous page, see `next_page_token`. Pages read
+            with a token cost the same whatever their depth, unlike `offset`.
         **kwargs : dict
             Dynamic column filters, where each key is a column name and the value is the filter:
             - Single value → filters as `col = value`
@@ -453,56 +798,12 @@ class CardDao(AbstractDao):
         list[dict]
             List of dictionaries representing the cards retrieved from the `cards` table.
         """
-        if not set(k.split("__")[0] for k in kwargs.keys()).issubset(
-            self.columns_valid
-        ):
-            invalid = {k.split("__")[0] for k in kwargs.keys()} - self.columns_valid
-            raise ValueError(f"Invalid keys: {invalid}")
-        if order_by not in self.columns_valid:
-            raise ValueError(f"Invalid order_by: {order_by}")
-        array_columns = {"colors", "color_identity"}
+        base_query, params = self._filter_query(
+            order_by, asc, limit, offset, profile, after, self.filter_index, **kwargs
+        )
 
         try:
             with self:
-                base_query = "SELECT * FROM cards"
-                where_clauses = []
-                params = []
-
-                for raw_col, vals in kwargs.items():
-                    parts = raw_col.split("__")
-                    col = parts[0]
-                    op_suffix = parts[1] if len(parts) > 1 else None
-                    if op_suffix == "lte":
-                        operator = "<="
-                    elif op_suffix == "gte":
-                        operator = ">="
-                    else:
-                        operator = "="
-                    if vals is None:
-                        where_clauses.append("FALSE")
-                    elif isinstance(vals, (list, tuple)):
-                        if col in array_columns:
-                            where_clauses.append(f"{col} && %s")
-                            params.append(list(vals))
-                        else:
-                            placeholders = ", ".join(["%s"] * len(vals))
-                            where_clauses.append(f"{col} IN ({placeholders})")
-                            params.extend(vals)
-                    else:
-                        if col in array_columns:
-                            where_clauses.append(f"{col} && %s")
-                            params.append([vals])
-                        else:
-                            where_clauses.append(f"{col} {operator} %s")
-                            params.append(vals)
-                if where_clauses:
-                    base_query += " WHERE " + " AND ".join(where_clauses)
-
-                direction = "ASC" if asc else "DESC"
-                base_query += f" ORDER BY {order_by} {direction}"
-
-                base_query += " LIMIT %s OFFSET %s"
-                params.extend([limit, offset])
                 self.cursor.execute(base_query, params)
                 return self.cursor.fetchall()
         except Exception as e:
@@ -511,7 +812,202 @@ class CardDao(AbstractDao):
 
             sys.exit(1)
 
-    def search_by_name(self, name: str, limit: int = 20, offset: int = 0):
+    def filter_page(
+        self,
+        order_by: str,
+        asc: bool = True,
+        limit: int = 10,
+        offset: int = 0,
+        profile: str = "full",
+        after: str = None,
+        **kwargs,
+    ):
+        """
+        Retrieve a keyset-paginated page of `filter` and the next page token.
+
+        Returns
+        -------
+        tuple[list[dict], str or None]
+            The cards and the token to pass as `after` for the next page,
+            None on the last page.
+        """
+        rows = self.filter(
+            order_by, asc, limit, offset, profile=profile, after=after, **kwargs
+        )
+        return rows, self.next_page_token(rows, order_by, asc, limit)
+
+    @classmethod
+    def _filter_query(
+        cls,
+        order_by: str,
+        asc: bool = True,
+        limit: int = 10,
+        offset: int = 0,
+        profile: str = "full",
+        after: str = None,
+        filter_index=None,
+        **kwargs,
+    ):
+        """
+        Build the SQL query and parameters used by `filter`.
+
+        Shared with `AsyncCardDao` so both DAOs run the same statement.
+        With a `FilterIndex`, the filters it can answer are resolved to the
+        matching IDs first, see `FilterIndex.narrow`.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query and its parameters.
+
+        Raises
+        ------
+        ValueError
+            If a filter key or `order_by` is not a valid column, or if the
+            profile or the page token is invalid.
+        """
+        select_list = cls.select_list(profile, include=(order_by, "id"))
+        if order_by not in cls.columns_valid:
+            raise ValueError(f"Invalid order_by: {order_by}")
+        conditions = cls._filter_conditions(**kwargs)
+        if filter_index is not None:
+            conditions = filter_index.narrow(conditions)
+
+        base_query = f"SELECT {select_list} FROM cards"
+        where_clauses = [condition for condition, _ in conditions]
+        params = [param for _, condition_params in conditions for param in condition_params]
+        if after is not None:
+            condition, keyset_params = cls._keyset_condition(order_by, asc, after)
+            where_clauses.append(condition)
+            params.extend(keyset_params)
+        if where_clauses:
+            base_query += " WHERE " + " AND ".join(where_clauses)
+
+        direction = "ASC" if asc else "DESC"
+        base_query += f" ORDER BY {order_by} {direction}"
+        if order_by != "id":
+            # Ties are broken by id so that pages never overlap
+            base_query += f", id {direction}"
+
+        base_query += " LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        return base_query, params
+
+    @classmethod
+    def _filter_conditions(cls, **kwargs):
+        """
+        Translate the column filters of `filter` into SQL conditions.
+
+        Returns
+        -------
+        list[tuple[str, list]]
+            One `(condition, params)` pair per filter.
+
+        Raises
+        ------
+        ValueError
+            If a filter key is not a valid column.
+        """
+        if not set(k.split("__")[0] for k in kwargs.keys()).issubset(
+            cls.columns_valid
+        ):
+            invalid = {k.split("__")[0] for k in kwargs.keys()} - cls.columns_valid
+            raise ValueError(f"Invalid keys: {invalid}")
+        array_columns = set(ARRAY_FIELDS)
+
+        conditions = []
+        for raw_col, vals in kwargs.items():
+            parts = raw_col.split("__")
+            col = parts[0]
+            op_suffix = parts[1] if len(parts) > 1 else None
+            if op_suffix == "lte":
+                operator = "<="
+            elif op_suffix == "gte":
+                operator = ">="
+            else:
+                operator = "="
+            if vals is None:
+                conditions.append(("FALSE", []))
+            elif isinstance(vals, (list, tuple)):
+                if col in array_columns:
+                    conditions.append((f"{col} && %s", [list(vals)]))
+                else:
+                    placeholders = ", ".join(["%s"] * len(vals))
+                    conditions.append((f"{col} IN ({placeholders})", list(vals)))
+            else:
+                if col in array_columns:
+                    conditions.append((f"{col} && %s", [[vals]]))
+                else:
+                    conditions.append((f"{col} {operator} %s", [vals]))
+        return conditions
+
+    @staticmethod
+    def _keyset_condition(order_by: str, asc: bool, after: str):
+        """
+        Build the condition selecting the rows after a page token.
+
+        Rows are sorted by `(order_by, id)`, NULLs last when ascending and
+        first when descending as PostgreSQL does, so the condition can seek
+        straight to the next page instead of skipping the previous ones.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL condition and its parameters.
+
+        Raises
+        ------
+        ValueError
+            If the token is invalid or was issued for another sort order.
+        """
+        value, last_id = decode_page_token(after, order_by, asc)
+        operator = ">" if asc else "<"
+        if order_by == "id":
+            return f"id {operator} %s", [last_id]
+        if value is None:
+            if asc:
+                return f"({order_by} IS NULL AND id > %s)", [last_id]
+            return f"({order_by} IS NOT NULL OR id < %s)", [last_id]
+        condition = f"({order_by}, id) {operator} (%s, %s)"
+        if asc:
+            condition = f"({condition} OR {order_by} IS NULL)"
+        return condition, [value, last_id]
+
+    @staticmethod
+    def next_page_token(rows, order_by: str, asc: bool, limit: int):
+        """
+        Return the token of the page following `rows`.
+
+        Parameters
+        ----------
+        rows : list[dict]
+            The current page, which must include `order_by` and `id`.
+        order_by : str
+            Column the page is sorted by.
+        asc : bool
+            Sorting direction.
+        limit : int
+            Page size requested.
+
+        Returns
+        -------
+        str or None
+            The continuation token, None when this is the last page.
+        """
+        if not rows or len(rows) < limit:
+            return None
+        last = rows[-1]
+        return encode_page_token(order_by, asc, last[order_by], last["id"])
+
+    def search_by_name(
+        self,
+        name: str,
+        limit: int = 20,
+        offset: int = 0,
+        profile: str = "summary",
+        after: str = None,
+        mode: str = "contains",
+    ):
         """
         Search for cards by partial or exact name match (case-insensitive).
 
@@ -523,6 +1019,14 @@ class CardDao(AbstractDao):
             Maximum number of results to return (default: 20).
         offset : int, optional
             Number of results to skip for pagination (default: 0).
+        profile : str, optional
+            Projection profile of the returned cards (default: "summary").
+        after : str, optional
+            Token of the previous page, see `next_page_token` (default: None).
+        mode : str, optional
+            "contains" (default) matches the text anywhere in the name,
+            "prefix" only at its start (typeahead) and "similar" ranks the
+            names by trigram word similarity, tolerating typos.
 
         Returns
         -------
@@ -532,34 +1036,217 @@ class CardDao(AbstractDao):
         Raises
         ------
         ValueError
-            If name is empty or limit/offset are invalid.
+            If name is empty, limit/offset are invalid, or the mode, the
+            profile or the page token is invalid.
+        """
+        sql_query, params = self._search_by_name_query(
+            name, limit, offset, profile, after, mode
+        )
+
+        try:
+            with self:
+                self.cursor.execute(sql_query, params)
+                return self.cursor.fetchall()
+
+        except Exception as e:
+            print(f"Error searching cards by name: {e}")
+            raise
+
+    def search_by_name_page(
+        self,
+        name: str,
+        limit: int = 20,
+        offset: int = 0,
+        profile: str = "summary",
+        after: str = None,
+        mode: str = "contains",
+    ):
+        """
+        Retrieve a keyset-paginated page of `search_by_name` and the next token.
+
+        Returns
+        -------
+        tuple[list[dict], str or None]
+            The cards and the token to pass as `after` for the next page,
+            None on the last page. Results of the "similar" mode are ranked,
+            not sorted by name, so they are paginated with `offset` only and
+            the token is always None.
+        """
+        rows = self.search_by_name(
+            name, limit=limit, offset=offset, profile=profile, after=after, mode=mode
+        )
+        if mode == "similar":
+            return rows, None
+        return rows, self.next_page_token(rows, "name", True, limit)
+
+    @staticmethod
+    def _like_escape(text: str) -> str:
+        """Escape the LIKE wildcards of user input."""
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @classmethod
+    def _search_by_name_query(
+        cls,
+        name: str,
+        limit: int = 20,
+        offset: int = 0,
+        profile: str = "summary",
+        after: str = None,
+        mode: str = "contains",
+    ):
+        """
+        Validate the arguments of `search_by_name` and build its SQL query.
+
+        Each mode is served by an index created with the `cards` table:
+        "contains" and "similar" by the `gin_trgm_ops` indexes on `name` and
+        `ascii_name`, "prefix" by the `lower(...) text_pattern_ops` ones.
+
+        Returns
+        -------
+        tuple[str, tuple]
+            The SQL query and its parameters.
+
+        Raises
+        ------
+        ValueError
+            If name is empty, limit/offset are invalid, or the mode, the
+            profile or the page token is invalid.
         """
+        select_list = cls.select_list(profile, include=("name", "id"))
         if not name or not name.strip():
             raise ValueError("Search name cannot be empty")
         if limit <= 0:
             raise ValueError("Limit must be positive")
         if offset < 0:
             raise ValueError("Offset must be non-negative")
+        if mode not in cls.NAME_SEARCH_MODES:
+            raise ValueError(
+                f"Invalid mode: {mode}, expected one of {list(cls.NAME_SEARCH_MODES)}"
+            )
+
+        order_by = "name, id"
+        if mode == "contains":
+            # Use ILIKE for case-insensitive partial matching
+            search_pattern = f"%{cls._like_escape(name)}%"
+            params = [search_pattern, search_pattern]
+            where = "name ILIKE %s OR ascii_name ILIKE %s"
+        elif mode == "prefix":
+            search_pattern = f"{cls._like_escape(name.lower())}%"
+            params = [search_pattern, search_pattern]
+            where = "lower(name) LIKE %s OR lower(ascii_name) LIKE %s"
+        else:
+            if after is not None:
+                raise ValueError("Results of the similar mode are paginated by offset")
+            text = name.strip()
+            # `<%` is true when word_similarity exceeds
+            # pg_trgm.word_similarity_threshold (0.6 by default)
+            params = [text, text]
+            where = "%s <%% name OR %s <%% ascii_name"
+            order_by = (
+                "GREATEST(word_similarity(%s, name), word_similarity(%s, ascii_name)) "
+                "DESC, name, id"
+            )
+
+        if after is not None:
+            condition, keyset_params = cls._keyset_condition("name", True, after)
+            where = f"({where}) AND {condition}"
+            params.extend(keyset_params)
+        if mode == "similar":
+            params.extend([text, text])
+        sql_query = f"""
+            SELECT {select_list}
+            FROM cards
+            WHERE {where}
+            ORDER BY {order_by}
+            LIMIT %s OFFSET %s;
+        """
+        return sql_query, (*params, limit, offset)
+
+    @staticmethod
+    def _random_candidates_query(colors=None, types=None):
+        """
+        Build the query listing the IDs `get_random_cards` samples from.
+
+        Parameters
+        ----------
+        colors : list of str, optional
+            Keep the cards having at least one of these colors.
+        types : list of str, optional
+            Keep the cards having at least one of these types (e.g. "Creature").
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query and its parameters.
+        """
+        conditions, params = [], []
+        if colors:
+            conditions.append("colors && %s")
+            params.append(list(colors))
+        if types:
+            conditions.append("types && %s")
+            params.append(list(types))
+        query = "SELECT id FROM cards"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return query + " ORDER BY id", params
+
+    @staticmethod
+    def _in_sample_order(rows, ids):
+        """Order the fetched cards like the sampled IDs, skipping deleted ones."""
+        by_id = {row["id"]: row for row in rows}
+        return [by_id[card_id] for card_id in ids if card_id in by_id]
+
+    def get_random_cards(self, count: int = 1, colors=None, types=None):
+        """
+        Retrieve distinct cards drawn uniformly at random.
+
+        The candidate IDs are read once per filter combination and kept by
+        `self.sampler`, so a draw costs one `id = ANY(...)` lookup instead of
+        sorting the whole table.
 
+        Parameters
+        ----------
+        count : int, optional
+            Number of cards wanted. Default is 1.
+        colors : list of str, optional
+            Only draw cards having at least one of these colors.
+        types : list of str, optional
+            Only draw cards having at least one of these types.
+
+        Returns
+        -------
+        list[dict]
+            Up to `count` cards with the `RANDOM_CARD_COLUMNS`.
+
+        Raises
+        ------
+        ValueError
+            If `count` is not positive.
+        Exception
+            If a database error occurs.
+        """
+        if count <= 0:
+            raise ValueError("count must be positive")
+        key = self.sampler.key(colors, types)
         try:
+            ids = self.sampler.get(key)
+            if ids is None:
+                version = self.cache.version
+                query, params = self._random_candidates_query(colors, types)
+                with self:
+                    self.cursor.execute(query, params)
+                    rows = self.cursor.fetchall()
+                ids = self.sampler.put(key, (row["id"] for row in rows), version)
+            chosen = self.sampler.sample(ids, count)
+            if not chosen:
+                return []
             with self:
-                # Use ILIKE for case-insensitive partial matching
-                sql_query = """
-                    SELECT id, name, ascii_name, type, mana_cost, mana_value,
-                           text, colors, color_identity, image_url
-                    FROM cards
-                    WHERE name ILIKE %s OR ascii_name ILIKE %s
-                    ORDER BY name
-                    LIMIT %s OFFSET %s;
-                """
-                search_pattern = f"%{name}%"
-                params = (search_pattern, search_pattern, limit, offset)
-
-                self.cursor.execute(sql_query, params)
-                return self.cursor.fetchall()
+                self.cursor.execute(self.RANDOM_CARDS_QUERY, (chosen,))
+                return self._in_sample_order(self.cursor.fetchall(), chosen)
 
         except Exception as e:
-            print(f"Error searching cards by name: {e}")
+            print(f"Error retrieving random cards: {e}")
             raise
 
     def get_random_card(self):
@@ -569,7 +1256,7 @@ class CardDao(AbstractDao):
         Returns
         -------
         dict
-            A randomly selected card with all its attributes.
+            A randomly selected card, see `get_random_cards`.
             Returns None if no cards exist in the database.
 
         Raises
@@ -577,22 +1264,8 @@ class CardDao(AbstractDao):
         Exception
             If a database error occurs.
         """
-        try:
-            with self:
-                sql_query = """
-                    SELECT id, name, ascii_name, type, mana_cost, mana_value,
-                           text, colors, color_identity, image_url, layout,
-                           power, toughness, loyalty, keywords
-                    FROM cards
-                    ORDER BY RANDOM()
-                    LIMIT 1;
-                """
-                self.cursor.execute(sql_query)
-                return self.cursor.fetchone()
-
-        except Exception as e:
-            print(f"Error retrieving random card: {e}")
-            raise
+        cards = self.get_random_cards(1)
+        return cards[0] if cards else None
 
 
 if __name__ == "__main__":
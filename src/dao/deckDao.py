@@ -1,9 +1,140 @@
 from dao.abstractDao import AbstractDao
-from dao.cardDao import CardDao
+from psycopg2.extras import execute_values
+from services.deckCache import DeckCache, get_deck_cache
+import numpy as np
 import psycopg2
 
+# Existence and ownership flags of one request, computed in the same
+# statement as the read or write they guard. A NULL user_id (or card_id)
+# skips the matching checks.
+ACCESS_CTE = """
+    WITH access AS (
+        SELECT
+            (%(user_id)s::int IS NULL
+             OR EXISTS (SELECT 1 FROM users WHERE user_id = %(user_id)s)) AS user_exists,
+            (%(card_id)s::int IS NULL
+             OR EXISTS (SELECT 1 FROM cards WHERE id = %(card_id)s)) AS card_exists,
+            EXISTS (SELECT 1 FROM decks WHERE deck_id = %(deck_id)s) AS deck_exists,
+            (%(user_id)s::int IS NULL
+             OR EXISTS (SELECT 1 FROM user_deck_link
+                        WHERE user_id = %(user_id)s AND deck_id = %(deck_id)s)) AS owned
+    )
+"""
+ACCESS_FLAGS = ("user_exists", "card_exists", "deck_exists", "owned")
+DECK_CARDS_QUERY = """
+    SELECT c.id, c.name, c.image_url, dc.quantity, d.name AS deck_name, d.type AS deck_type
+    FROM deck_cards dc
+    JOIN decks d ON d.deck_id = dc.deck_id
+    JOIN cards c ON c.id = dc.card_id
+    WHERE dc.deck_id = %s
+    ORDER BY c.name
+"""
+
+
+def _distribution(column, empty=None):
+    """Build the subquery counting the copies of each value of an array column."""
+    values = f"COALESCE(NULLIF({column}, '{{}}'), ARRAY['{empty}'])" if empty else column
+    return f"""(
+        SELECT COALESCE(jsonb_object_agg(value, copies), '{{}}')
+        FROM (
+            SELECT value, sum(quantity) AS copies
+            FROM deck, unnest({values}) AS value
+            GROUP BY value
+        ) AS counts
+    )"""
+
+
+# Every statistic of a deck in one statement: the cards are read once
+# (MATERIALIZED) and each aggregate is a subquery over them
+STATISTICS_QUERY = ACCESS_CTE + f"""
+    , deck AS MATERIALIZED (
+        SELECT dc.quantity, c.mana_value, c.colors, c.color_identity, c.types, c.subtypes,
+               COALESCE('Land' = ANY(c.types), FALSE) AS is_land
+        FROM deck_cards dc
+        JOIN cards c ON c.id = dc.card_id
+        WHERE dc.deck_id = %(deck_id)s
+          AND (SELECT user_exists AND deck_exists AND owned FROM access)
+    )
+    SELECT a.*,
+        ARRAY(SELECT user_id FROM user_deck_link WHERE deck_id = %(deck_id)s) AS owners,
+        (SELECT COALESCE(sum(quantity), 0) FROM deck) AS card_count,
+        (SELECT count(*) FROM deck) AS distinct_cards,
+        (SELECT COALESCE(sum(quantity), 0) FROM deck WHERE is_land) AS land_count,
+        (SELECT round(sum(quantity * mana_value) / NULLIF(sum(quantity), 0), 2)
+         FROM deck WHERE NOT is_land AND mana_value IS NOT NULL) AS average_mana_value,
+        (SELECT COALESCE(jsonb_object_agg(bucket, copies), '{{}}')
+         FROM (
+             SELECT floor(mana_value)::int AS bucket, sum(quantity) AS copies
+             FROM deck
+             WHERE NOT is_land AND mana_value IS NOT NULL
+             GROUP BY bucket
+         ) AS curve) AS mana_curve,
+        {_distribution("colors", "C")} AS colors,
+        {_distribution("color_identity", "C")} AS color_identity,
+        {_distribution("types")} AS types,
+        {_distribution("subtypes")} AS subtypes
+    FROM access a
+"""
+STATISTICS = (
+    "card_count", "distinct_cards", "land_count", "average_mana_value",
+    "mana_curve", "colors", "color_identity", "types", "subtypes",
+)
+
 
 class DeckDao(AbstractDao):
+    def __init__(self, cache: DeckCache = None):
+        """
+        Initialize the DAO.
+
+        Parameters
+        ----------
+        cache : DeckCache, optional
+            Cache of the deck statistics, cleared by the methods editing a
+            deck. Default is the cache shared by the process.
+        """
+        super().__init__()
+        self.cache = cache if cache is not None else get_deck_cache()
+
+    @staticmethod
+    def _access_params(deck_id, user_id=None, card_id=None):
+        """
+        Validate the IDs of a request and build the parameters of `ACCESS_CTE`.
+
+        Raises
+        ------
+        TypeError
+            If an ID is not an integer.
+        ValueError
+            If an ID is not strictly positive.
+        """
+        params = {"deck_id": deck_id, "user_id": user_id, "card_id": card_id}
+        for name, value in params.items():
+            if value is None and name != "deck_id":
+                continue
+            if not isinstance(value, int):
+                raise TypeError(f"The {name} must be an integer")
+            if value <= 0:
+                raise ValueError(f"The {name} must be positive")
+        return params
+
+    @staticmethod
+    def _access_error(access):
+        """
+        Return the error message of failed access flags, None if they all pass.
+
+        Checks are reported in the order of the former separate calls: user,
+        card, deck, then ownership.
+        """
+        if not access["user_exists"]:
+            return "This user_id does not exist"
+        if not access["card_exists"]:
+            return "This card_id does not exist"
+        if not access["deck_exists"]:
+            return "This deck_id does not exist"
+        if not access["owned"]:
+            return "This deck does not belong to the user"
+        return None
+
     # CREATE
 
     def create(self, user_id, name, deck_type):
@@ -91,51 +222,67 @@ class DeckDao(AbstractDao):
 
     # READ
 
-    def get_by_id(self, id):
+    def get_by_id(self, id, user_id=None):
         """
         Retrieves all information of a deck by its ID, including its cards.
 
+        The deck, and its ownership when `user_id` is given, are checked by
+        the same query.
+
         Parameters
         ----------
         id : int
             ID of the deck
+        user_id : int, optional
+            The user who must own the deck.
 
+        Returns
+        -------
+        list[dict]
+            One row per card of the deck, empty for an empty deck.
+
+        Raises
+        ------
+        ValueError
+            If the user or the deck does not exist, or the user does not own
+            the deck.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
         """
+        params = self._access_params(id, user_id)
         try:
             with self:
                 self.cursor.execute(
-                    "SELECT c.id, c.name, c.image_url, dc.quantity, d.name as deck_name, d.type as deck_type "
-                    "FROM decks d                                                                              "
-                    "LEFT JOIN deck_cards dc ON d.deck_id = dc.deck_id                                        "
-                    "LEFT JOIN cards c ON dc.card_id = c.id                                                   "
-                    "WHERE d.deck_id = %s;                                                                    ",
-                    (id,),
+                    ACCESS_CTE
+                    + """
+                    SELECT a.*, c.id, c.name, c.image_url, dc.quantity,
+                           d.name AS deck_name, d.type AS deck_type
+                    FROM access a
+                    LEFT JOIN decks d
+                        ON d.deck_id = %(deck_id)s AND a.user_exists AND a.owned
+                    LEFT JOIN deck_cards dc ON d.deck_id = dc.deck_id
+                    LEFT JOIN cards c ON dc.card_id = c.id
+                    """,
+                    params,
                 )
                 results = self.cursor.fetchall()
-
-                # If deck is empty, return empty list but ensure deck exists
-                if not results:
-                    self.cursor.execute(
-                        "SELECT deck_id FROM decks WHERE deck_id = %s",
-                        (id,),
-                    )
-                    deck_exists = self.cursor.fetchone()
-                    if not deck_exists:
-                        raise ValueError(f"Deck with ID {id} does not exist")
-                    return []
-
-                # Filter out None values for empty decks
-                filtered_results = []
-                for result in results:
-                    if result["id"] is not None:  # Card exists
-                        filtered_results.append(result)
-
-                return filtered_results
         except psycopg2.OperationalError as e:
             raise ConnectionError(f"Database connection failed: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
+        error = self._access_error(results[0])
+        if error:
+            raise ValueError(error)
+        # Filter out the row of an empty deck
+        return [
+            {key: value for key, value in row.items() if key not in ACCESS_FLAGS}
+            for row in results
+            if row["id"] is not None
+        ]
+
     def get_all_decks_from_user(self, user_id: int):
         """
         Retrieves all the decks of a specific user.
@@ -164,6 +311,160 @@ class DeckDao(AbstractDao):
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
+    def get_statistics(self, deck_id, user_id=None):
+        """
+        Compute the statistics of a deck.
+
+        Every statistic comes from one aggregate query over the cards of the
+        deck, which also checks access. Results are cached per deck until the
+        deck is edited through this DAO (see `DeckCache`); a cached result is
+        only returned to an owner of the deck.
+
+        Parameters
+        ----------
+        deck_id : int
+            The deck.
+        user_id : int, optional
+            The user who must own the deck.
+
+        Returns
+        -------
+        dict
+            `card_count` and `distinct_cards`; `land_count`; the
+            `average_mana_value` and `mana_curve` (copies per mana value) of
+            the nonland cards; and the copies per value of `colors`,
+            `color_identity` ("C" for colorless), `types` and `subtypes`.
+
+        Raises
+        ------
+        ValueError
+            If the user or the deck does not exist, or the user does not own
+            the deck.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        params = self._access_params(deck_id, user_id)
+        cached = self.cache.get(deck_id, "statistics")
+        if cached is not None and (user_id is None or user_id in cached["owners"]):
+            return dict(cached["statistics"])
+
+        version = self.cache.current_version()
+        try:
+            with self:
+                self.cursor.execute(STATISTICS_QUERY, params)
+                row = self.cursor.fetchone()
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+        error = self._access_error(row)
+        if error:
+            raise ValueError(error)
+        statistics = {name: row[name] for name in STATISTICS}
+        for name in ("card_count", "distinct_cards", "land_count"):
+            statistics[name] = int(statistics[name])
+        if statistics["average_mana_value"] is not None:
+            statistics["average_mana_value"] = float(statistics["average_mana_value"])
+        self.cache.put(
+            deck_id,
+            "statistics",
+            {"statistics": statistics, "owners": set(row["owners"] or ())},
+            version,
+        )
+        return dict(statistics)
+
+    def get_centroid(self, deck_id, user_id=None):
+        """
+        Compute the embedding centroid of a deck, for recommendations.
+
+        The embeddings of the cards are read with one query and averaged in
+        NumPy, each card weighted by its quantity. The result is cached per
+        deck like `get_statistics`.
+
+        Parameters
+        ----------
+        deck_id : int
+            The deck.
+        user_id : int, optional
+            The user who must own the deck.
+
+        Returns
+        -------
+        dict
+            `centroid` (a float32 array, None if no card of the deck has an
+            embedding), the `card_ids` of the deck and its `color_identity`
+            (the union of the identities of its cards).
+
+        Raises
+        ------
+        ValueError
+            If the user or the deck does not exist, or the user does not own
+            the deck.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        params = self._access_params(deck_id, user_id)
+        cached = self.cache.get(deck_id, "centroid")
+        if cached is not None and (user_id is None or user_id in cached["owners"]):
+            return dict(cached["profile"])
+
+        version = self.cache.current_version()
+        try:
+            with self:
+                self.cursor.execute(
+                    ACCESS_CTE
+                    + """
+                    SELECT a.*,
+                        ARRAY(SELECT user_id FROM user_deck_link
+                              WHERE deck_id = %(deck_id)s) AS owners,
+                        dc.card_id, dc.quantity, c.color_identity,
+                        c.embedding::real[] AS embedding
+                    FROM access a
+                    LEFT JOIN deck_cards dc
+                        ON dc.deck_id = %(deck_id)s
+                        AND a.user_exists AND a.deck_exists AND a.owned
+                    LEFT JOIN cards c ON c.id = dc.card_id
+                    """,
+                    params,
+                )
+                rows = self.cursor.fetchall()
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+        error = self._access_error(rows[0])
+        if error:
+            raise ValueError(error)
+        cards = [row for row in rows if row["card_id"] is not None]
+        embedded = [row for row in cards if row["embedding"] is not None]
+        centroid = None
+        if embedded:
+            centroid = np.average(
+                np.asarray([row["embedding"] for row in embedded], dtype=np.float32),
+                axis=0,
+                weights=[row["quantity"] or 1 for row in embedded],
+            ).astype(np.float32)
+        profile = {
+            "centroid": centroid,
+            "card_ids": [row["card_id"] for row in cards],
+            "color_identity": sorted(
+                {color for row in cards for color in row["color_identity"] or ()}
+            ),
+        }
+        self.cache.put(
+            deck_id,
+            "centroid",
+            {"profile": profile, "owners": set(rows[0]["owners"] or ())},
+            version,
+        )
+        return dict(profile)
+
     # UPDATE
 
     def update(self, id):
@@ -172,107 +473,290 @@ class DeckDao(AbstractDao):
         """
         pass
 
-    def add_card_to_deck(self, card_id, deck_id):
+    def add_card_to_deck(self, card_id, deck_id, user_id=None):
         """
         Adds a card to a deck. If the card already exists in the deck, its quantity
         is increased by 1.
 
+        The card, the deck and, when `user_id` is given, the user and the
+        ownership of the deck are checked by the upsert itself, so the whole
+        operation is one statement.
+
         Parameters
         ----------
         card_id : int
             The card id to add.
         deck_id : int
             The deck id to which the card will be added.
-        """
-        card = CardDao()
-        if not card.exist(card_id):
-            raise ValueError(f"Card {card_id} does not exist.")
-        if not self.exist(deck_id):
-            raise ValueError(f"Deck {deck_id} does not exist.")
+        user_id : int, optional
+            The user who must own the deck.
 
+        Returns
+        -------
+        dict
+            The `deck_id`, `card_id` and new `quantity`.
+
+        Raises
+        ------
+        ValueError
+            If the user, card or deck does not exist, or the user does not own
+            the deck.
+        """
+        params = self._access_params(deck_id, user_id, card_id)
         try:
             with self:
                 self.cursor.execute(
-                    "INSERT INTO deck_cards(deck_id, card_id, quantity) "
-                    "VALUES (%s, %s, 1)                                 "
-                    "ON CONFLICT (deck_id, card_id)                     "
-                    "DO UPDATE SET quantity = deck_cards.quantity + 1   "
-                    "RETURNING deck_id, card_id, quantity;              ",
-                    (deck_id, card_id),
+                    ACCESS_CTE
+                    + """
+                    , upserted AS (
+                        INSERT INTO deck_cards (deck_id, card_id, quantity)
+                        SELECT %(deck_id)s, %(card_id)s, 1
+                        FROM access
+                        WHERE user_exists AND card_exists AND deck_exists AND owned
+                        ON CONFLICT (deck_id, card_id)
+                        DO UPDATE SET quantity = deck_cards.quantity + 1
+                        RETURNING deck_id, card_id, quantity
+                    )
+                    SELECT a.*, u.deck_id, u.card_id, u.quantity
+                    FROM access a
+                    LEFT JOIN upserted u ON TRUE
+                    """,
+                    params,
                 )
-                result = self.cursor.fetchone()
+                row = self.cursor.fetchone()
                 self.conn.commit()
-                return result
         except psycopg2.OperationalError as e:
             raise ConnectionError(f"Database connection failed: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
-    def remove_card_from_deck(self, card_id, deck_id):
+        error = self._access_error(row)
+        if error:
+            raise ValueError(error)
+        self.cache.invalidate(deck_id)
+        return {"deck_id": row["deck_id"], "card_id": row["card_id"], "quantity": row["quantity"]}
+
+    def remove_card_from_deck(self, card_id, deck_id, user_id=None):
         """
         Removes a card from a deck.
 
+        Like `add_card_to_deck`, existence and ownership are checked by the
+        delete statement itself.
+
         Parameters
         ----------
         card_id : int
             The card id to remove.
         deck_id : int
             The deck id from which the card will be removed.
-        """
-        card = CardDao()
-        if not card.exist(card_id):
-            raise ValueError(f"Card {card_id} does not exist.")
-        if not self.exist(deck_id):
-            raise ValueError(f"Deck {deck_id} does not exist.")
+        user_id : int, optional
+            The user who must own the deck.
 
+        Returns
+        -------
+        dict or None
+            The deleted `deck_cards` row, None if the card was not in the deck.
+
+        Raises
+        ------
+        ValueError
+            If the user, card or deck does not exist, or the user does not own
+            the deck.
+        """
+        params = self._access_params(deck_id, user_id, card_id)
         try:
             with self:
                 self.cursor.execute(
-                    "DELETE FROM deck_cards                 "
-                    "WHERE deck_id = %s AND card_id = %s    "
-                    "RETURNING *                            ",
-                    (deck_id, card_id),
+                    ACCESS_CTE
+                    + """
+                    , deleted AS (
+                        DELETE FROM deck_cards
+                        WHERE deck_id = %(deck_id)s AND card_id = %(card_id)s
+                          AND (SELECT user_exists AND card_exists AND deck_exists AND owned
+                               FROM access)
+                        RETURNING deck_id, card_id, quantity
+                    )
+                    SELECT a.*, r.deck_id, r.card_id, r.quantity
+                    FROM access a
+                    LEFT JOIN deleted r ON TRUE
+                    """,
+                    params,
                 )
-                deleted_row = self.cursor.fetchone()
+                row = self.cursor.fetchone()
                 self.conn.commit()
-                return deleted_row
         except psycopg2.OperationalError as e:
             raise ConnectionError(f"Database connection failed: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
+        error = self._access_error(row)
+        if error:
+            raise ValueError(error)
+        if row["deck_id"] is None:
+            return None
+        self.cache.invalidate(deck_id)
+        return {"deck_id": row["deck_id"], "card_id": row["card_id"], "quantity": row["quantity"]}
+
+    @staticmethod
+    def _merge_changes(changes):
+        """
+        Sum the quantity deltas of each card, in order of first appearance.
+
+        Raises
+        ------
+        TypeError
+            If a card ID or delta is not an integer.
+        ValueError
+            If a card ID is not strictly positive.
+        """
+        deltas = {}
+        for change in changes:
+            card_id, delta = change["card_id"], change["quantity_delta"]
+            if not isinstance(card_id, int) or not isinstance(delta, int):
+                raise TypeError("card_id and quantity_delta must be integers")
+            if card_id <= 0:
+                raise ValueError("The card_id must be positive")
+            deltas[card_id] = deltas.get(card_id, 0) + delta
+        return {card_id: delta for card_id, delta in deltas.items() if delta}
+
+    def apply_card_changes(self, deck_id, changes, user_id=None, page_size: int = 500):
+        """
+        Apply quantity changes to several cards of a deck in one transaction.
+
+        Deltas of the same card are summed first. The access check, the check
+        that every card exists, one `execute_values` upsert of all the deltas
+        and the removal of the cards left with no copy share one connection
+        and are committed together: either every change is applied or none.
+
+        Parameters
+        ----------
+        deck_id : int
+            The deck to edit.
+        changes : list[dict]
+            `{"card_id": int, "quantity_delta": int}` operations; a negative
+            delta removes copies.
+        user_id : int, optional
+            The user who must own the deck.
+        page_size : int, optional
+            Rows per `INSERT` statement. Default is 500.
+
+        Returns
+        -------
+        list[dict]
+            The cards of the deck after the changes, as `get_by_id` returns
+            them.
+
+        Raises
+        ------
+        ValueError
+            If the user, the deck or a card does not exist, or the user does
+            not own the deck.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        params = self._access_params(deck_id, user_id)
+        deltas = self._merge_changes(changes)
+        error = None
+        try:
+            with self:
+                self.cursor.execute(ACCESS_CTE + "SELECT * FROM access", params)
+                error = self._access_error(self.cursor.fetchone())
+                if not error and deltas:
+                    self.cursor.execute(
+                        "SELECT array_agg(wanted.id) AS missing "
+                        "FROM unnest(%s::int[]) AS wanted(id) "
+                        "WHERE NOT EXISTS (SELECT 1 FROM cards c WHERE c.id = wanted.id)",
+                        (list(deltas),),
+                    )
+                    missing = self.cursor.fetchone()["missing"]
+                    if missing:
+                        error = f"Cards {sorted(missing)} do not exist"
+                if error:
+                    self.conn.rollback()
+                    rows = None
+                else:
+                    if deltas:
+                        execute_values(
+                            self.cursor,
+                            "INSERT INTO deck_cards (deck_id, card_id, quantity) VALUES %s "
+                            "ON CONFLICT (deck_id, card_id) "
+                            "DO UPDATE SET quantity = deck_cards.quantity + EXCLUDED.quantity",
+                            [(deck_id, card_id, delta) for card_id, delta in deltas.items()],
+                            page_size=page_size,
+                        )
+                        self.cursor.execute(
+                            "DELETE FROM deck_cards "
+                            "WHERE deck_id = %s AND card_id = ANY(%s) AND quantity <= 0",
+                            (deck_id, list(deltas)),
+                        )
+                    self.cursor.execute(DECK_CARDS_QUERY, (deck_id,))
+                    rows = self.cursor.fetchall()
+                    self.conn.commit()
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+        if error:
+            raise ValueError(error)
+        self.cache.invalidate(deck_id)
+        return rows
+
     # DELETE
 
-    def delete(self, id):
+    def delete(self, id, user_id=None):
         """
         Delete a deck by its ID, including all associated cards and user links.
+
+        When `user_id` is given, the user and the ownership of the deck are
+        checked in the same transaction, before anything is deleted.
+
+        Raises
+        ------
+        ValueError
+            If the user or the deck does not exist, or the user does not own
+            the deck.
         """
+        params = self._access_params(id, user_id)
+        error = None
         try:
             with self:
-                # Supprimer les cartes du deck
-                self.cursor.execute(
-                    "DELETE FROM deck_cards " "WHERE deck_id = %s     ",
-                    (id,),
-                )
+                self.cursor.execute(ACCESS_CTE + "SELECT * FROM access", params)
+                error = self._access_error(self.cursor.fetchone())
+                if error:
+                    self.conn.rollback()
+                    deleted_deck = None
+                else:
+                    # Supprimer les cartes du deck
+                    self.cursor.execute(
+                        "DELETE FROM deck_cards " "WHERE deck_id = %s     ",
+                        (id,),
+                    )
 
-                # Supprimer le lien user-deck
-                self.cursor.execute(
-                    "DELETE FROM user_deck_link " "WHERE deck_id = %s         ",
-                    (id,),
-                )
+                    # Supprimer le lien user-deck
+                    self.cursor.execute(
+                        "DELETE FROM user_deck_link " "WHERE deck_id = %s         ",
+                        (id,),
+                    )
 
-                # Supprimer le deck et récupérer les infos supprimées
-                self.cursor.execute(
-                    "DELETE FROM decks              "
-                    "WHERE deck_id = %s             "
-                    "RETURNING deck_id, name, type  ",
-                    (id,),
-                )
+                    # Supprimer le deck et récupérer les infos supprimées
+                    self.cursor.execute(
+                        "DELETE FROM decks              "
+                        "WHERE deck_id = %s             "
+                        "RETURNING deck_id, name, type  ",
+                        (id,),
+                    )
 
-                deleted_deck = self.cursor.fetchone()
-                self.conn.commit()
-                return deleted_deck
+                    deleted_deck = self.cursor.fetchone()
+                    self.conn.commit()
         except psycopg2.OperationalError as e:
             raise ConnectionError(f"Database connection failed: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
+
+        if error:
+            raise ValueError(error)
+        self.cache.invalidate(id)
+        return deleted_deck
@@ -84,6 +84,43 @@ class HistoryDao(AbstractDao):
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
+    def get_recent_prompts(self, limit=200):
+        """
+        Get the most recent distinct prompts of every user.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of prompts to return. Default is 200.
+
+        Returns
+        -------
+        prompts : list[str]
+            The prompts, most recently searched first.
+
+        Raises:
+        -------
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        try:
+            with self:
+                self.cursor.execute(
+                    "SELECT prompt                    "
+                    "FROM histories                   "
+                    "GROUP BY prompt                  "
+                    "ORDER BY MAX(history_id) DESC    "
+                    "LIMIT %s                         ",
+                    (limit,),
+                )
+                return [row["prompt"] for row in self.cursor.fetchall()]
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
     # UPDATE
     def update(self, id):
         """
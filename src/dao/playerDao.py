@@ -1,14 +1,34 @@
 import psycopg2
+import psycopg2.errors
 from psycopg2.extras import RealDictCursor
 from pgvector.psycopg2 import register_vector
 from dao.userDao import UserDao
 from utils.dbConnection import dbConnection
 from services.embeddingService import EmbeddingService
+from services.vectorSearchEngine import VectorSearchEngine, QUANTIZATIONS
+from services.rankFusion import reciprocal_rank_fusion, RRF_K
+from services.searchPlanner import SearchPlanner
+from services.filterIndex import FilterIndex, get_filter_index
+from services.cardCache import get_card_cache
+from concurrent.futures import ThreadPoolExecutor, wait
 import numpy
+import os
+
+SEARCH_BACKENDS = ("pgvector", "memory")
+SEARCH_MODES = ("vector", "lexical", "hybrid")
 
 
 class PlayerDao(UserDao):
-    def __init__(self, embedding_service: EmbeddingService = None):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService = None,
+        backend: str = None,
+        engine: VectorSearchEngine = None,
+        quantization: str = None,
+        rerank_factor: int = None,
+        planner: SearchPlanner = None,
+        filter_index: FilterIndex = None,
+    ):
         """
         Initialize PlayerDao with an optional embedding service.
 
@@ -16,11 +36,77 @@ class PlayerDao(UserDao):
         ----------
         embedding_service : EmbeddingService, optional
             Service for generating embeddings. If None, creates a new instance.
+        backend : str, optional
+            "pgvector" ranks cards in the database, "memory" ranks them with
+            an in-process `VectorSearchEngine` and only reads the top-k rows
+            from the database. Default is `SEARCH_BACKEND` or "pgvector".
+        engine : VectorSearchEngine, optional
+            Engine used by the "memory" backend. If None, creates a new one.
+        quantization : str, optional
+            Two-stage search: candidates are ranked on quantized vectors, then
+            re-ranked with the full-precision embeddings. "float16" works with
+            both backends (pgvector uses `halfvec`), "int8" only with "memory".
+            Default is `SEARCH_QUANTIZATION`, or exact search when unset.
+        rerank_factor : int, optional
+            Candidates re-ranked per requested result.
+            Default is `SEARCH_RERANK_FACTOR` or 4.
+        planner : SearchPlanner, optional
+            Chooses between an exact scan and the index for filtered
+            "pgvector" searches. If None, creates a new one.
+        filter_index : FilterIndex, optional
+            Bitsets resolving the search filters before the query.
+            Default is the index shared by the process.
+
+        Raises
+        ------
+        ValueError
+            If the backend or quantization is unknown or unsupported.
         """
         super().__init__()
         self.embedding_service = embedding_service or EmbeddingService()
+        (
+            self.backend,
+            self.engine,
+            self.quantization,
+            self.rerank_factor,
+        ) = self._search_backend(backend, engine, quantization, rerank_factor)
+        self.planner = planner or SearchPlanner()
+        self.filter_index = (
+            filter_index if filter_index is not None else get_filter_index()
+        )
+
+    @staticmethod
+    def _search_backend(backend=None, engine=None, quantization=None, rerank_factor=None):
+        backend = backend or os.getenv("SEARCH_BACKEND", "pgvector")
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError(
+                f"Unknown search backend {backend!r}, expected one of {SEARCH_BACKENDS}"
+            )
+        quantization = quantization or os.getenv("SEARCH_QUANTIZATION") or None
+        rerank_factor = int(rerank_factor or os.getenv("SEARCH_RERANK_FACTOR", "4"))
+        if quantization not in (None,) + QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}"
+            )
+        if backend == "pgvector" and quantization == "int8":
+            raise ValueError("pgvector has no int8 vectors, use float16 or backend='memory'")
+        if rerank_factor < 1:
+            raise ValueError("rerank_factor must be at least 1")
+        if backend == "memory" and engine is None:
+            engine = VectorSearchEngine(
+                quantization=quantization, rerank_factor=rerank_factor
+            )
+        return backend, engine, quantization, rerank_factor
 
-    def natural_language_search(self, query, filters=None, limit=5):
+    def natural_language_search(
+        self,
+        query,
+        filters=None,
+        limit=5,
+        ef_search=None,
+        probes=None,
+        statement_timeout=None,
+    ):
         """
         Search for Magic cards using vector similarity search.
 
@@ -33,6 +119,17 @@ class PlayerDao(UserDao):
             Default is None.
         limit : int, optional
             Maximum number of results to return. Default is 5.
+        ef_search : int, optional
+            HNSW candidate list size for this query (`hnsw.ef_search`).
+            Higher means better recall and slower search. Default is the
+            server setting (40).
+        probes : int, optional
+            Number of IVFFlat lists scanned for this query (`ivfflat.probes`).
+            Default is the server setting (1).
+            Both knobs are ignored by the exact "memory" backend.
+        statement_timeout : int, optional
+            Milliseconds after which the database cancels the search.
+            Default is the server setting.
 
         Returns
         -------
@@ -42,7 +139,8 @@ class PlayerDao(UserDao):
         Raises
         ------
         ValueError
-            If limit is not positive or query is invalid.
+            If limit is not positive, query is invalid or a search knob is
+            out of range.
         ConnectionError
             If the database connection fails.
         RuntimeError
@@ -50,6 +148,7 @@ class PlayerDao(UserDao):
         """
         if limit <= 0:
             raise ValueError("Limit must be positive")
+        settings = self._search_settings(ef_search, probes, statement_timeout)
 
         # Handle query: embed text on-the-fly if it's a string
         if isinstance(query, str):
@@ -61,74 +160,573 @@ class PlayerDao(UserDao):
 
         conn = None
         try:
+            if self.backend == "memory":
+                hits = self.engine.search(
+                    query_embedding, self._filter_conditions(filters), limit
+                )
+                if not hits:
+                    return []
+                with dbConnection() as conn:
+                    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                        cursor.execute(*self._hydrate_query(hits))
+                        return self._merge_hits(cursor.fetchall(), hits)
+
             with dbConnection() as conn:
                 register_vector(conn)
 
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    query_sql = """
-                        SELECT
-                            id,
-                            name,
-                            text,
-                            type,
-                            color_identity,
-                            mana_cost,
-                            mana_value,
-                            image_url,
-                            embedding <-> %s::vector as distance
-                        FROM cards
-                    """
-
-                    params = [query_embedding]
-
-                    # Build WHERE clause for filters
-                    conditions = []
-                    if filters:
-                        for key, value in filters.items():
-                            # Handle comparison operators (mana_value__gte, mana_value__lte)
-                            if "__" in key:
-                                field, operator = key.rsplit("__", 1)
-
-                                if operator == "gte":
-                                    conditions.append(f"{field} >= %s")
-                                    params.append(value)
-                                elif operator == "lte":
-                                    conditions.append(f"{field} <= %s")
-                                    params.append(value)
-                                elif operator == "gt":
-                                    conditions.append(f"{field} > %s")
-                                    params.append(value)
-                                elif operator == "lt":
-                                    conditions.append(f"{field} < %s")
-                                    params.append(value)
-                            # Handle color array filter
-                            elif key == "colors" and isinstance(value, list):
-                                # Use && operator for array overlap
-                                conditions.append("colors && %s")
-                                params.append(value)
-                            # Handle simple equality
-                            else:
-                                conditions.append(f"{key} = %s")
-                                params.append(value)
-
-                    if conditions:
-                        query_sql += " WHERE " + " AND ".join(conditions)
-
-                    query_sql += """
-                        ORDER BY distance
-                        LIMIT %s
-                    """
-                    params.append(limit)
-
-                    cursor.execute(query_sql, params)
+                    counts = self.planner.counts(filters) or self.filter_index.count(
+                        self._filter_conditions(filters)
+                    )
+                    if counts is None:
+                        version = get_card_cache().version
+                        cursor.execute(
+                            *self.planner.count_query(self._filter_conditions(filters))
+                        )
+                        row = cursor.fetchone()
+                        counts = self.planner.put(
+                            self.planner.key(filters), row["matched"], row["total"], version
+                        )
+                    strategy, settings = self._search_plan(
+                        self.planner,
+                        counts,
+                        limit * self.rerank_factor if self.quantization else limit,
+                        ef_search,
+                        probes,
+                        statement_timeout,
+                    )
+                    for setting_sql, setting_params in settings:
+                        cursor.execute(setting_sql, setting_params)
+                    cursor.execute(*self._search_query(
+                        query_embedding,
+                        filters,
+                        limit,
+                        self.quantization,
+                        self.rerank_factor,
+                        strategy,
+                        self.filter_index,
+                    ))
                     results = cursor.fetchall()
+                    if strategy == "ann" and filters and len(results) < limit:
+                        # The index ran out of candidates passing the filters
+                        cursor.execute(*self._search_query(
+                            query_embedding,
+                            filters,
+                            limit,
+                            strategy="exact",
+                            filter_index=self.filter_index,
+                        ))
+                        results = cursor.fetchall()
                     return results
 
+        except psycopg2.errors.QueryCanceled as e:
+            raise TimeoutError(f"Search cancelled: {e}") from e
+        except psycopg2.OperationalError as e:
+            raise ConnectionError(f"Database connection failed: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Unexpected database error: {e}") from e
+
+    def lexical_search(self, text, filters=None, limit=5, statement_timeout=None):
+        """
+        Search for Magic cards by name and rules text.
+
+        Parameters
+        ----------
+        text : str
+            Card name, keywords or words of the rules text.
+        filters : dict, optional
+            Same filters as `natural_language_search`.
+        limit : int, optional
+            Maximum number of results to return. Default is 5.
+        statement_timeout : int, optional
+            Milliseconds after which the database cancels the search.
+
+        Returns
+        -------
+        list
+            Card dictionaries with their `lexical_score`, best match first.
+
+        Raises
+        ------
+        ValueError
+            If limit is not positive or the text is empty.
+        TimeoutError
+            If the database cancelled the search after `statement_timeout`.
+        ConnectionError
+            If the database connection fails.
+        RuntimeError
+            If an unexpected database error occurs.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Lexical search needs a non-empty text query")
+        settings = self._search_settings(statement_timeout=statement_timeout)
+
+        conn = None
+        try:
+            with dbConnection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    for setting_sql, setting_params in settings:
+                        cursor.execute(setting_sql, setting_params)
+                    cursor.execute(
+                        *self._lexical_query(text, filters, limit, self.filter_index)
+                    )
+                    return cursor.fetchall()
+
+        except psycopg2.errors.QueryCanceled as e:
+            raise TimeoutError(f"Search cancelled: {e}") from e
         except psycopg2.OperationalError as e:
             raise ConnectionError(f"Database connection failed: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected database error: {e}") from e
 
+    def hybrid_search(
+        self,
+        text,
+        filters=None,
+        limit=5,
+        vector_weight=1.0,
+        lexical_weight=1.0,
+        timeout=None,
+        ef_search=None,
+        probes=None,
+    ):
+        """
+        Search for Magic cards with both the vector and the lexical search.
+
+        Both searches run concurrently on `limit * HYBRID_CANDIDATE_FACTOR`
+        candidates and their rankings are merged with weighted reciprocal
+        rank fusion. A search that fails or exceeds `timeout` is left out,
+        so the results degrade to the other one instead of failing.
+
+        Parameters
+        ----------
+        text : str
+            The search query.
+        filters : dict, optional
+            Same filters as `natural_language_search`.
+        limit : int, optional
+            Maximum number of results to return. Default is 5.
+        vector_weight, lexical_weight : float, optional
+            Weight of each ranking in the fusion, 0 skipping that search.
+            Default is 1 for both.
+        timeout : int, optional
+            Milliseconds each search may take, embedding included.
+            Default is `HYBRID_SEARCH_TIMEOUT_MS` or 2000.
+        ef_search, probes : int, optional
+            Index knobs of the vector search.
+
+        Returns
+        -------
+        list
+            Card dictionaries with their fused `score`, and the `distance` and
+            `lexical_score` of the searches that found them (None otherwise).
+
+        Raises
+        ------
+        ValueError
+            If an argument is invalid.
+        TimeoutError
+            If every search exceeded the timeout.
+        ConnectionError, RuntimeError
+            If every search failed, see `natural_language_search`.
+        """
+        timeout = self._hybrid_timeout(
+            text, limit, vector_weight, lexical_weight, timeout
+        )
+        # Reject invalid knobs now rather than as a failed vector search
+        self._search_settings(ef_search, probes)
+        candidates = limit * self.HYBRID_CANDIDATE_FACTOR
+
+        legs = {}
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            if vector_weight > 0:
+                legs["vector"] = executor.submit(
+                    self.natural_language_search,
+                    text,
+                    filters,
+                    candidates,
+                    ef_search,
+                    probes,
+                    timeout,
+                )
+            if lexical_weight > 0:
+                legs["lexical"] = executor.submit(
+                    self.lexical_search, text, filters, candidates, timeout
+                )
+            wait(legs.values(), timeout=timeout / 1000)
+        finally:
+            # Do not wait for a late search: its statement_timeout ends it
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results, errors = {}, []
+        for name, future in legs.items():
+            if not future.done():
+                errors.append(TimeoutError(f"{name} search timed out after {timeout} ms"))
+            elif future.exception() is not None:
+                errors.append(future.exception())
+            else:
+                results[name] = future.result()
+        return self._hybrid_results(
+            results, errors, limit, vector_weight, lexical_weight
+        )
+
+    @staticmethod
+    def _search_plan(planner, counts, candidates, ef_search, probes, statement_timeout):
+        """
+        Pick the strategy of a "pgvector" search and its settings.
+
+        Parameters
+        ----------
+        planner : SearchPlanner
+            The planner of the DAO.
+        counts : tuple
+            `(matched, total)`, see `SearchPlanner.counts`.
+        candidates : int
+            Rows the index must return.
+
+        Returns
+        -------
+        tuple
+            The strategy ("exact" or "ann") and the statements to run before
+            the search, see `_search_settings`.
+        """
+        strategy, ef_search = planner.plan(*counts, candidates, ef_search)
+        settings = PlayerDao._search_settings(ef_search, probes, statement_timeout)
+        if strategy == "ann" and counts[0] is not None:
+            settings += planner.scan_settings()
+        return strategy, settings
+
+    @staticmethod
+    def _search_settings(ef_search=None, probes=None, statement_timeout=None):
+        """
+        Build the statements applying the per-query index knobs and timeout.
+
+        The settings are transaction-local, so they do not leak to the next
+        user of the pooled connection.
+
+        Returns
+        -------
+        list[tuple[str, tuple]]
+            SQL statements and their parameters, to run before the search.
+
+        Raises
+        ------
+        ValueError
+            If `ef_search` is not in [1, 1000], or `probes` or
+            `statement_timeout` is not positive.
+        """
+        settings = []
+        if ef_search is not None:
+            if not isinstance(ef_search, int) or not 1 <= ef_search <= 1000:
+                raise ValueError("ef_search must be an integer between 1 and 1000")
+            settings.append(
+                ("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),))
+            )
+        if probes is not None:
+            if not isinstance(probes, int) or probes < 1:
+                raise ValueError("probes must be a positive integer")
+            settings.append(
+                ("SELECT set_config('ivfflat.probes', %s, true)", (str(probes),))
+            )
+        if statement_timeout is not None:
+            if not isinstance(statement_timeout, int) or statement_timeout < 1:
+                raise ValueError("statement_timeout must be a positive integer")
+            settings.append(
+                (
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    (str(statement_timeout),),
+                )
+            )
+        return settings
+
+    @staticmethod
+    def _filter_conditions(filters=None):
+        """
+        Translate search filters into SQL conditions.
+
+        Parameters
+        ----------
+        filters : dict, optional
+            Search filters, e.g. {'colors': ['U', 'B'], 'mana_value__gte': 3}.
+            Array fields take `__subset` (every value in the list, e.g. a
+            deck's color identity) and any field `__not_in` (a list of
+            values to exclude).
+
+        Returns
+        -------
+        list[tuple[str, list]]
+            One `(condition, params)` pair per filter.
+        """
+        conditions = []
+        for key, value in (filters or {}).items():
+            # Handle comparison operators (mana_value__gte, mana_value__lte)
+            if "__" in key:
+                field, operator = key.rsplit("__", 1)
+
+                if operator == "gte":
+                    conditions.append((f"{field} >= %s", [value]))
+                elif operator == "lte":
+                    conditions.append((f"{field} <= %s", [value]))
+                elif operator == "gt":
+                    conditions.append((f"{field} > %s", [value]))
+                elif operator == "lt":
+                    conditions.append((f"{field} < %s", [value]))
+                elif operator == "subset" and isinstance(value, list):
+                    # A missing array counts as empty, e.g. colorless cards
+                    conditions.append((f"COALESCE({field}, '{{}}') <@ %s::text[]", [value]))
+                elif operator == "not_in" and isinstance(value, list):
+                    conditions.append((f"NOT ({field} = ANY(%s))", [value]))
+            # Handle color array filter
+            elif key == "colors" and isinstance(value, list):
+                # Use && operator for array overlap
+                conditions.append(("colors && %s", [value]))
+            # Handle simple equality
+            else:
+                conditions.append((f"{key} = %s", [value]))
+        return conditions
+
+    @staticmethod
+    def _narrowed_conditions(filters=None, filter_index=None):
+        """Return the filter conditions, resolved by `filter_index` if given."""
+        conditions = PlayerDao._filter_conditions(filters)
+        if filter_index is not None:
+            conditions = filter_index.narrow(conditions)
+        return conditions
+
+    SEARCH_COLUMNS = (
+        "id",
+        "name",
+        "text",
+        "type",
+        "color_identity",
+        "mana_cost",
+        "mana_value",
+        "image_url",
+    )
+
+    @staticmethod
+    def _hydrate_query(hits):
+        """Build the query reading the rows of `(card_id, distance)` hits."""
+        return (
+            f"SELECT {', '.join(PlayerDao.SEARCH_COLUMNS)} FROM cards "
+            "WHERE id = ANY(%s)",
+            ([card_id for card_id, _ in hits],),
+        )
+
+    @staticmethod
+    def _merge_hits(rows, hits):
+        """Order hydrated rows like the hits and attach their distance."""
+        by_id = {row["id"]: row for row in rows}
+        return [
+            {**by_id[card_id], "distance": distance}
+            for card_id, distance in hits
+            if card_id in by_id
+        ]
+
+    @staticmethod
+    def _search_query(
+        query_embedding,
+        filters=None,
+        limit=5,
+        quantization=None,
+        rerank_factor=4,
+        strategy="ann",
+        filter_index=None,
+    ):
+        """
+        Build the SQL query and parameters used by `natural_language_search`.
+
+        Shared with `AsyncPlayerDao` so both DAOs run the same statement.
+        With "float16" quantization, `limit * rerank_factor` candidates are
+        ranked on `embedding::halfvec`, which the half-precision index built
+        by `utils.vectorIndex` serves, then re-ranked on `embedding`.
+        The "exact" strategy filters the cards first, in a materialized CTE
+        the vector index cannot serve, then ranks every one of them.
+        With a `FilterIndex`, the filters it can answer are resolved to the
+        matching IDs first, see `FilterIndex.narrow`.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query and its parameters.
+        """
+        columns = ", ".join(PlayerDao.SEARCH_COLUMNS)
+        conditions = []
+        filter_params = []
+        for condition, condition_params in PlayerDao._narrowed_conditions(
+            filters, filter_index
+        ):
+            conditions.append(condition)
+            filter_params.extend(condition_params)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        if strategy == "exact":
+            query_sql = f"""
+            WITH candidates AS MATERIALIZED (
+                SELECT {columns}, embedding FROM cards{where}
+            )
+            SELECT
+                {columns},
+                embedding <-> %s::vector as distance
+            FROM candidates
+            ORDER BY distance
+            LIMIT %s
+            """
+            return query_sql, [*filter_params, query_embedding, limit]
+
+        if quantization == "float16":
+            halfvec = f"halfvec({EmbeddingService.DIMENSION})"
+            query_sql = f"""
+            SELECT
+                {columns},
+                embedding <-> %s::vector as distance
+            FROM cards
+            WHERE id IN (
+                SELECT id FROM cards{where}
+                ORDER BY embedding::{halfvec} <-> %s::{halfvec}
+                LIMIT %s
+            )
+            ORDER BY distance
+            LIMIT %s
+            """
+            params = [
+                query_embedding,
+                *filter_params,
+                query_embedding,
+                limit * rerank_factor,
+                limit,
+            ]
+            return query_sql, params
+
+        query_sql = f"""
+            SELECT
+                {columns},
+                embedding <-> %s::vector as distance
+            FROM cards{where}
+            ORDER BY distance
+            LIMIT %s
+        """
+        return query_sql, [query_embedding, *filter_params, limit]
+
+    LEXICAL_DOCUMENT = (
+        "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(text, ''))"
+    )
+    # Candidates read by each search of a hybrid search, per requested result
+    HYBRID_CANDIDATE_FACTOR = 3
+
+    @staticmethod
+    def _lexical_query(text, filters=None, limit=5, filter_index=None):
+        """
+        Build the SQL query and parameters used by `lexical_search`.
+
+        A card matches when the text is similar to words of its name (trigram
+        `<%`, served by `cards_name_trgm_idx`) or when its name and rules text
+        contain the terms (full-text search, served by `cards_fts_idx`). Name
+        similarity plus the normalized text rank puts exact names first.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query and its parameters.
+        """
+        columns = ", ".join(PlayerDao.SEARCH_COLUMNS)
+        document = PlayerDao.LEXICAL_DOCUMENT
+        conditions = [
+            f"(%s <%% name OR {document} @@ websearch_to_tsquery('english', %s))"
+        ]
+        params = [text, text]
+        for condition, condition_params in PlayerDao._narrowed_conditions(
+            filters, filter_index
+        ):
+            conditions.append(condition)
+            params.extend(condition_params)
+        where = " AND ".join(conditions)
+
+        query_sql = f"""
+            SELECT
+                {columns},
+                word_similarity(%s, name)
+                    + ts_rank_cd({document}, websearch_to_tsquery('english', %s), 32)
+                    AS lexical_score
+            FROM cards
+            WHERE {where}
+            ORDER BY lexical_score DESC, id
+            LIMIT %s
+        """
+        return query_sql, [text, text, *params, limit]
+
+    @staticmethod
+    def _hybrid_timeout(text, limit, vector_weight, lexical_weight, timeout=None):
+        """
+        Validate the arguments of a hybrid search.
+
+        Returns
+        -------
+        int
+            The timeout of each search in milliseconds.
+
+        Raises
+        ------
+        ValueError
+            If an argument is invalid.
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Hybrid search needs a non-empty text query")
+        if vector_weight < 0 or lexical_weight < 0:
+            raise ValueError("Search weights must be non-negative")
+        if vector_weight == 0 and lexical_weight == 0:
+            raise ValueError("At least one search weight must be positive")
+        if timeout is None:
+            timeout = int(os.getenv("HYBRID_SEARCH_TIMEOUT_MS", "2000"))
+        if not isinstance(timeout, int) or timeout < 1:
+            raise ValueError("timeout must be a positive integer")
+        return timeout
+
+    @staticmethod
+    def _hybrid_results(results, errors, limit, vector_weight, lexical_weight):
+        """
+        Fuse the rankings of the searches that succeeded.
+
+        Parameters
+        ----------
+        results : dict
+            Rows of each successful search, keyed by "vector" or "lexical".
+        errors : list of Exception
+            Errors of the other searches.
+
+        Raises
+        ------
+        Exception
+            The first error, if no search succeeded.
+        """
+        if not results:
+            raise errors[0]
+        for error in errors:
+            print(f"Hybrid search degraded: {error}")
+        vector_rows = results.get("vector", [])
+        lexical_rows = results.get("lexical", [])
+
+        by_id = {row["id"]: {**row, "lexical_score": None} for row in vector_rows}
+        for row in lexical_rows:
+            if row["id"] in by_id:
+                by_id[row["id"]]["lexical_score"] = row["lexical_score"]
+            else:
+                by_id[row["id"]] = {**row, "distance": None}
+        fused = reciprocal_rank_fusion(
+            [
+                [row["id"] for row in vector_rows],
+                [row["id"] for row in lexical_rows],
+            ],
+            [vector_weight, lexical_weight],
+            RRF_K,
+        )
+        return [{**by_id[card_id], "score": score} for card_id, score in fused[:limit]]
+
     def get_card_embedding(self, card_id):
         """Get the embedding vector for a specific card."""
         conn = None
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CardCache:
+    """
+    Bounded in-process cache of card rows keyed by card ID.
+
+    Cards only change on ingest, so rows read by `get_by_id` are kept in an
+    LRU and dropped by the DAO methods writing to the `cards` table. Entries
+    also expire after `ttl` seconds, which bounds staleness when another
+    process (e.g. an ingest script) writes to the table.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of cards kept. Default is `CARD_CACHE_SIZE` or 4096.
+            0 disables the cache.
+        ttl : float, optional
+            Time to live of an entry in seconds, 0 meaning forever.
+            Default is `CARD_CACHE_TTL` or 3600.
+        """
+        self.max_size = int(max_size if max_size is not None
+                            else os.getenv("CARD_CACHE_SIZE", "4096"))
+        self.ttl = float(ttl if ttl is not None
+                         else os.getenv("CARD_CACHE_TTL", "3600"))
+        if self.max_size < 0 or self.ttl < 0:
+            raise ValueError("Cache size and ttl must be non-negative")
+
+        self._entries = OrderedDict()  # card_id -> (card, stored_at)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, see `put`
+        self.version = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def _expired(self, stored_at):
+        return self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def get(self, card_id):
+        """
+        Look a card up.
+
+        Parameters
+        ----------
+        card_id : int
+            The card ID.
+
+        Returns
+        -------
+        dict or None
+            A copy of the cached card, None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(card_id)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._entries.move_to_end(card_id)
+                    self._stats["hits"] += 1
+                    return dict(entry[0])
+                del self._entries[card_id]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, card_id, card, version=None):
+        """
+        Store a card.
+
+        Parameters
+        ----------
+        card_id : int
+            The card ID.
+        card : dict
+            The card row.
+        version : int, optional
+            `version` read before the card was fetched. If the cache was
+            invalidated in the meantime the row may be stale and is not stored.
+        """
+        if self.max_size == 0 or card is None:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[card_id] = (dict(card), time.time())
+            self._entries.move_to_end(card_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, *card_ids):
+        """Drop the given cards, e.g. after they were written."""
+        with self._lock:
+            self.version += 1
+            for card_id in card_ids:
+                if self._entries.pop(card_id, None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def invalidate_all(self):
+        """Drop every entry, e.g. after a bulk ingest."""
+        with self._lock:
+            self.version += 1
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns
+        -------
+        dict
+            `hits`, `misses`, `evictions`, `expirations`, `invalidations`, the
+            current `size`, `max_size` and the `hit_ratio`.
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+
+_card_cache = None
+_card_cache_lock = threading.Lock()
+
+
+def get_card_cache():
+    """Return the card cache shared by every card DAO of the process."""
+    global _card_cache
+    with _card_cache_lock:
+        if _card_cache is None:
+            _card_cache = CardCache()
+        return _card_cache
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from services.cardCache import get_card_cache
+
+
+class CardSampler:
+    """
+    Uniform random sampling of card IDs in constant time.
+
+    The IDs of the cards matching a set of filters are read once into a
+    NumPy array; a sample is then a random index into it instead of an
+    `ORDER BY RANDOM()` sort of the table. Arrays are dropped when cards are
+    written through `CardDao` in this process (see `CardCache.version`) and
+    after `max_age` seconds, which picks up ingests made by other processes.
+    """
+
+    def __init__(self, max_age: float = None, max_filters: int = 256, seed=None):
+        """
+        Initialize an empty sampler.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            Seconds an ID array is kept, 0 meaning until the next card write.
+            Default is `CARD_SAMPLER_MAX_AGE` or 3600.
+        max_filters : int, optional
+            Number of filter combinations kept. Default is 256.
+        seed : int, optional
+            Seed of the random generator, for reproducible samples.
+        """
+        self.max_age = float(
+            max_age if max_age is not None else os.getenv("CARD_SAMPLER_MAX_AGE", "3600")
+        )
+        if self.max_age < 0 or max_filters <= 0:
+            raise ValueError("max_age must be non-negative and max_filters positive")
+        self.max_filters = max_filters
+        self._arrays = OrderedDict()  # filters key -> (ids, version, stored_at)
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def key(colors=None, types=None):
+        """Return the cache key of a filter combination."""
+        return (tuple(sorted(colors or ())), tuple(sorted(types or ())))
+
+    def get(self, key):
+        """
+        Return the cached IDs of a filter combination.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The IDs, None if they must be (re)read from the database.
+        """
+        with self._lock:
+            entry = self._arrays.get(key)
+            if entry is None:
+                return None
+            ids, version, stored_at = entry
+            expired = self.max_age > 0 and time.monotonic() - stored_at > self.max_age
+            if expired or version != get_card_cache().version:
+                del self._arrays[key]
+                return None
+            self._arrays.move_to_end(key)
+            return ids
+
+    def put(self, key, ids, version):
+        """
+        Store the IDs of a filter combination.
+
+        Parameters
+        ----------
+        key : tuple
+            See `key`.
+        ids : iterable of int
+            The matching card IDs.
+        version : int
+            `CardCache.version` read before the IDs were fetched.
+
+        Returns
+        -------
+        numpy.ndarray
+            The IDs as an array.
+        """
+        ids = np.fromiter(ids, dtype=np.int64)
+        with self._lock:
+            self._arrays[key] = (ids, version, time.monotonic())
+            self._arrays.move_to_end(key)
+            while len(self._arrays) > self.max_filters:
+                self._arrays.popitem(last=False)
+        return ids
+
+    def sample(self, ids, count: int = 1):
+        """
+        Draw distinct IDs uniformly.
+
+        Parameters
+        ----------
+        ids : numpy.ndarray
+            The candidate IDs.
+        count : int, optional
+            Number of IDs wanted. Default is 1.
+
+        Returns
+        -------
+        list[int]
+            `min(count, len(ids))` distinct IDs, in random order.
+        """
+        if count <= 0:
+            raise ValueError("count must be positive")
+        count = min(count, len(ids))
+        if count == 0:
+            return []
+        with self._lock:
+            positions = self._rng.choice(len(ids), size=count, replace=False)
+        return [int(ids[position]) for position in positions]
+
+    def clear(self):
+        """Drop every cached ID array."""
+        with self._lock:
+            self._arrays.clear()
+
+
+_card_sampler = None
+_card_sampler_lock = threading.Lock()
+
+
+def get_card_sampler():
+    """Return the card sampler shared by every card DAO of the process."""
+    global _card_sampler
+    with _card_sampler_lock:
+        if _card_sampler is None:
+            _card_sampler = CardSampler()
+        return _card_sampler
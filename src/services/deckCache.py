@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from services.cardCache import get_card_cache
+
+
+class DeckCache:
+    """
+    Bounded in-process cache of values derived from the cards of a deck.
+
+    Entries are keyed by deck ID and kind (e.g. "statistics"), kept in an
+    LRU and dropped by the `DeckDao` methods writing to `deck_cards`. An
+    entry is also ignored once cards were written through `CardDao` in this
+    process (see `CardCache.version`) or after `ttl` seconds, which bounds
+    staleness when another process edits the deck.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of entries kept. Default is `DECK_CACHE_SIZE` or
+            1024. 0 disables the cache.
+        ttl : float, optional
+            Time to live of an entry in seconds, 0 meaning forever.
+            Default is `DECK_CACHE_TTL` or 600.
+        """
+        self.max_size = int(max_size if max_size is not None
+                            else os.getenv("DECK_CACHE_SIZE", "1024"))
+        self.ttl = float(ttl if ttl is not None
+                         else os.getenv("DECK_CACHE_TTL", "600"))
+        if self.max_size < 0 or self.ttl < 0:
+            raise ValueError("Cache size and ttl must be non-negative")
+
+        # (deck_id, kind) -> (value, card version, stored_at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, see `put`
+        self.version = 0
+
+    def get(self, deck_id, kind):
+        """
+        Look a value up.
+
+        Returns
+        -------
+        object or None
+            The cached value, None on a miss.
+        """
+        key = (deck_id, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, card_version, stored_at = entry
+            expired = self.ttl > 0 and time.time() - stored_at > self.ttl
+            if expired or card_version != get_card_cache().version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, deck_id, kind, value, version):
+        """
+        Store a value.
+
+        Parameters
+        ----------
+        version : tuple
+            `current_version()` read before the value was computed: the value
+            is dropped if the deck or the cards were written since.
+        """
+        if self.max_size == 0:
+            return
+        with self._lock:
+            if version != (self.version, get_card_cache().version):
+                return
+            self._entries[(deck_id, kind)] = (value, version[1], time.time())
+            self._entries.move_to_end((deck_id, kind))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def current_version(self):
+        """Return the version to pass to `put`."""
+        with self._lock:
+            return self.version, get_card_cache().version
+
+    def invalidate(self, *deck_ids):
+        """Drop every value of the given decks, e.g. after their cards changed."""
+        deck_ids = set(deck_ids)
+        with self._lock:
+            self.version += 1
+            for key in [key for key in self._entries if key[0] in deck_ids]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_deck_cache = None
+_deck_cache_lock = threading.Lock()
+
+
+def get_deck_cache():
+    """Return the deck cache shared by every deck DAO of the process."""
+    global _deck_cache
+    with _deck_cache_lock:
+        if _deck_cache is None:
+            _deck_cache = DeckCache()
+        return _deck_cache
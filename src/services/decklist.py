@@ -0,0 +1,214 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+DECKLIST_FORMATS = ("text", "mtga", "mtgo")
+# Sections of the deck itself; the others (sideboard, maybeboard) are optional
+MAIN_SECTIONS = ("main", "commander", "companion")
+
+_SECTION_HEADERS = {
+    "about": "about",
+    "deck": "main",
+    "main": "main",
+    "mainboard": "main",
+    "commander": "commander",
+    "companion": "companion",
+    "sideboard": "sideboard",
+    "maybeboard": "maybeboard",
+    "considering": "maybeboard",
+}
+# "4 Lightning Bolt", "4x Lightning Bolt", MTGA's "4 Lightning Bolt (M10) 146"
+# and MTGO's "SB: 2 Duress"; the quantity is optional
+_CARD_LINE = re.compile(
+    r"^(?P<sideboard>SB:\s*)?(?:(?P<quantity>\d+)x?\s+)?(?P<name>.+?)"
+    r"(?:\s+\([A-Za-z0-9]+\)(?:\s+\S+)?)?(?:\s+\*[A-Z]\*)?$"
+)
+# Group headers of exports sorted by card type, e.g. "Creatures (20)"
+_GROUP_HEADER = re.compile(r"^(?P<group>[A-Za-z][A-Za-z -]*?)\s*\(\d+\)$")
+
+
+class DecklistError(ValueError):
+    """A decklist that cannot be read, as opposed to a deck that cannot be edited."""
+
+
+def _section(line: str):
+    """Return the section a header line opens, None if it is not a header."""
+    header = line.strip().lstrip("/").strip().rstrip(":").strip()
+    group = _GROUP_HEADER.match(header)
+    if group:
+        header = group.group("group")
+    return _SECTION_HEADERS.get(header.lower())
+
+
+def iter_text_decklist(lines):
+    """
+    Parse a plain text or MTGA decklist one line at a time.
+
+    Section headers (`Deck`, `Commander`, `Sideboard`, `// Sideboard`...)
+    switch the section of the following cards; comments, group headers such
+    as `Creatures (20)` and MTGA's `About` section are skipped. Without any
+    header, a single block of cards after a blank line is the sideboard, as
+    in MTGO text exports; it is held back until the end of the list, where
+    it is known to be the last block.
+    Set codes and collector numbers of MTGA lines are ignored.
+
+    Parameters
+    ----------
+    lines : iterable of str
+        The lines of the decklist.
+
+    Yields
+    ------
+    tuple
+        `(quantity, name, section)` of each card line.
+
+    Raises
+    ------
+    DecklistError
+        If a line has a zero quantity.
+    """
+    section, headers = "main", False
+    # blocks: headerless blocks of cards seen so far, pending: cards of the
+    # block after the first one, which is the sideboard if it is the last
+    blocks, in_block, pending = 0, False, []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            in_block = False
+            continue
+        header = _section(line)
+        if header or _GROUP_HEADER.match(line.lstrip("/ ")):
+            section, headers = header or section, True
+            yield from pending
+            pending = []
+            continue
+        # MTGA's "About" section names the deck, it holds no card
+        if section == "about" or line.startswith(("#", "//")):
+            continue
+        match = _CARD_LINE.match(line)
+        if not match:
+            continue
+        quantity = int(match.group("quantity") or 1)
+        if quantity <= 0:
+            raise DecklistError(f"Line {number}: quantity must be positive")
+        card = (
+            quantity,
+            match.group("name"),
+            "sideboard" if match.group("sideboard") else section,
+        )
+        if headers:
+            yield card
+            continue
+        if not in_block:
+            blocks, in_block = blocks + 1, True
+            # A third block: the list is split in groups, not a sideboard
+            if blocks > 2:
+                yield from pending
+                pending = []
+        if blocks == 2:
+            pending.append(card)
+        else:
+            yield card
+    for quantity, name, card_section in pending:
+        yield quantity, name, "sideboard" if blocks == 2 else card_section
+
+
+def iter_dek_decklist(source):
+    """
+    Parse an MTGO `.dek` file incrementally.
+
+    Parameters
+    ----------
+    source : file-like
+        The XML document.
+
+    Yields
+    ------
+    tuple
+        `(quantity, name, section)` of each `Cards` element.
+
+    Raises
+    ------
+    DecklistError
+        If the document is not valid XML or a quantity is not a positive
+        integer.
+    """
+    try:
+        for _, element in ET.iterparse(source, events=("end",)):
+            if element.tag == "Cards":
+                name = element.get("Name")
+                if name:
+                    try:
+                        quantity = int(element.get("Quantity", "1"))
+                    except ValueError:
+                        raise DecklistError(f"Invalid quantity for {name}") from None
+                    if quantity <= 0:
+                        raise DecklistError(f"Quantity of {name} must be positive")
+                    sideboard = element.get("Sideboard", "false").lower() == "true"
+                    yield quantity, name, "sideboard" if sideboard else "main"
+            element.clear()
+    except ET.ParseError as e:
+        raise DecklistError(f"Invalid .dek file: {e}") from e
+
+
+def iter_decklist(text: str):
+    """
+    Parse a decklist in any supported format, detected from its content.
+
+    Returns
+    -------
+    iterator of tuple
+        `(quantity, name, section)` of each card line, see
+        `iter_text_decklist` and `iter_dek_decklist`.
+    """
+    if text.lstrip().startswith("<"):
+        return iter_dek_decklist(io.StringIO(text))
+    return iter_text_decklist(io.StringIO(text))
+
+
+def format_decklist(cards, fmt: str = "text") -> str:
+    """
+    Write a deck in a decklist format.
+
+    Parameters
+    ----------
+    cards : list[dict]
+        `name` and `quantity` of each card, as `DeckDao.get_by_id` returns
+        them.
+    fmt : str, optional
+        "text" (one "4 Lightning Bolt" line per card), "mtga" (the same
+        under a `Deck` header) or "mtgo" (a `.dek` file). Default is "text".
+
+    Returns
+    -------
+    str
+        The decklist.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown.
+    """
+    if fmt not in DECKLIST_FORMATS:
+        raise ValueError(f"Unknown decklist format: {fmt}")
+    if fmt == "mtgo":
+        # MTGO matches cards by name when CatID is unknown
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<Deck xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">',
+            "  <NetDeckID>0</NetDeckID>",
+            "  <PreconstructedDeckID>0</PreconstructedDeckID>",
+        ]
+        lines.extend(
+            f'  <Cards CatID="0" Quantity="{card["quantity"]}" Sideboard="false" '
+            f'Name={quoteattr(card["name"])} />'
+            for card in cards
+        )
+        lines.append("</Deck>")
+        return "\n".join(lines) + "\n"
+    lines = [f'{card["quantity"]} {card["name"]}' for card in cards]
+    if fmt == "mtga":
+        lines.insert(0, "Deck")
+    return "\n".join(lines) + "\n"
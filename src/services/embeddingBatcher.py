@@ -0,0 +1,120 @@
+import asyncio
+import os
+from services.embeddingService import EmbeddingService
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent embedding requests into batched API calls.
+
+    Texts awaited within `max_wait` seconds of each other are sent to the
+    embedding API in a single `fetch_many` call, run in a worker thread, and
+    each caller gets its own embedding back. Texts in the memory tier of the
+    cache skip the queue; the disk tier is looked up by the worker thread, so
+    that SQLite never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch_size: int = None,
+        max_wait: float = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Parameters
+        ----------
+        embedding_service : EmbeddingService
+            The service used to embed the batches.
+        max_batch_size : int, optional
+            A batch is sent as soon as it holds this many texts.
+            Default is the service's `max_batch_size`.
+        max_wait : float, optional
+            Seconds to wait for other requests before sending a batch.
+            Default is `EMBEDDING_BATCH_WAIT_MS` / 1000, or 0.005.
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size or embedding_service.max_batch_size
+        self.max_wait = (
+            max_wait
+            if max_wait is not None
+            else float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")) / 1000
+        )
+        self._pending = []  # (text, future)
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def vectorize(self, text: str) -> list:
+        """
+        Vectorize a text, possibly together with concurrent requests.
+
+        Parameters
+        ----------
+        text : str
+            The text to vectorize.
+
+        Returns
+        -------
+        list
+            The normalized embedding of the text.
+
+        Raises
+        ------
+        ValueError
+            If the embedding request of the batch fails.
+        """
+        cached = self.embedding_service.lookup(text, disk=False)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.batched_texts += len(batch)
+        # Deduplicate like the cache does, e.g. "Lightning  Bolt" and "lightning bolt"
+        keys = [self.embedding_service.query_key(text) for text, _ in batch]
+        texts = {}  # key -> first text with that key
+        for key, (text, _) in zip(keys, batch):
+            texts.setdefault(key, text)
+        try:
+            embeddings = await asyncio.to_thread(self._fetch, list(texts.values()))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_key = dict(zip(texts, embeddings))
+        for key, (_, future) in zip(keys, batch):
+            if not future.done():
+                future.set_result(list(by_key[key]))
+
+    def _fetch(self, texts):
+        """Embed texts in a worker thread, reading the disk cache first."""
+        embeddings = [self.embedding_service.lookup(text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            fetched = self.embedding_service.fetch_many([texts[i] for i in missing])
+            for i, embedding in zip(missing, fetched):
+                embeddings[i] = embedding
+        return embeddings
@@ -0,0 +1,217 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Cache of query embeddings keyed by normalized text.
+
+    The first tier is a bounded in-memory LRU. An optional SQLite file can be
+    used as a second tier so that embeddings survive restarts and are shared
+    between workers. Entries older than `ttl` seconds are ignored in both tiers.
+    The SQLite tier is best-effort: its errors (a file locked by another
+    worker, a full disk) are logged and the memory tier keeps answering.
+    """
+
+    def __init__(self, max_size=None, ttl=None, path=None):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Maximum number of embeddings kept in memory.
+            Default is `EMBEDDING_CACHE_SIZE` or 1024. 0 disables the memory tier.
+        ttl : float, optional
+            Time to live of an entry in seconds, 0 meaning forever.
+            Default is `EMBEDDING_CACHE_TTL` or 86400 (one day).
+        path : str, optional
+            Path of the SQLite file used as second tier.
+            Default is `EMBEDDING_CACHE_PATH`; no second tier if unset.
+        """
+        self.max_size = int(max_size if max_size is not None
+                            else os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+        self.ttl = float(ttl if ttl is not None
+                         else os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+        if self.max_size < 0 or self.ttl < 0:
+            raise ValueError("Cache size and ttl must be non-negative")
+        self.path = path if path is not None else os.getenv("EMBEDDING_CACHE_PATH")
+
+        self._entries = OrderedDict()  # key -> (embedding, stored_at)
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, embedding BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize a query so that trivially different spellings share an entry.
+
+        Applies Unicode NFKC, case folding and whitespace collapsing.
+        """
+        text = unicodedata.normalize("NFKC", text)
+        return re.sub(r"\s+", " ", text).strip().casefold()
+
+    def _expired(self, stored_at):
+        return self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def _disk_error(self, action, error):
+        """Log a failure of the SQLite tier and leave its transaction."""
+        print(f"Embedding cache: could not {action} {self.path}: {error}")
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key, embedding, stored_at):
+        if self.max_size == 0:
+            return
+        self._entries[key] = (embedding, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key, disk=True):
+        """
+        Look an embedding up, first in memory then on disk.
+
+        Parameters
+        ----------
+        key : str
+            A key built with `normalize`.
+        disk : bool, optional
+            Also look the SQLite tier up. With False, a miss is not counted:
+            the caller is expected to look the key up again with the disk,
+            e.g. from a worker thread rather than an event loop.
+            Default is True.
+
+        Returns
+        -------
+        list or None
+            A copy of the cached embedding, None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return list(entry[0])
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            if not disk:
+                return None
+
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT embedding, stored_at FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disk_error("read", e)
+                if row is not None and not self._expired(row[1]):
+                    embedding = np.frombuffer(row[0], dtype=np.float64).tolist()
+                    self._remember(key, embedding, row[1])
+                    self._stats["disk_hits"] += 1
+                    return list(embedding)
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, embedding):
+        """
+        Store an embedding in every tier.
+
+        Parameters
+        ----------
+        key : str
+            A key built with `normalize`.
+        embedding : list
+            The embedding to cache.
+        """
+        embedding = list(embedding)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, embedding, stored_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, embedding, stored_at) "
+                        "VALUES (?, ?, ?)",
+                        (key, np.asarray(embedding, dtype=np.float64).tobytes(), stored_at),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    # The memory entry is kept: the caller has its embedding
+                    self._disk_error("write", e)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                return True
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT stored_at FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disk_error("read", e)
+                    return False
+                return row is not None and not self._expired(row[0])
+            return False
+
+    def clear(self):
+        """Drop every entry of both tiers and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns
+        -------
+        dict
+            `hits`, `disk_hits`, `misses`, `evictions`, `expirations`, the
+            current `size` of the memory tier and the `hit_ratio`.
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hit_ratio = (
+                (self._stats["hits"] + self._stats["disk_hits"]) / lookups
+                if lookups
+                else 0.0
+            )
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_ratio": hit_ratio,
+            }
@@ -2,12 +2,23 @@ import requests
 from dotenv import load_dotenv
 import os
 import numpy as np
+from services.embeddingCache import EmbeddingCache
 
 
 class EmbeddingService:
     """Service for generating embeddings using the Ollama API."""
 
-    def __init__(self, endpoint_url=None, api_key=None):
+    MODEL = "bge-m3:latest"
+    # Size of the vectors returned by MODEL, and of the cards.embedding column
+    DIMENSION = 1024
+
+    def __init__(
+        self,
+        endpoint_url=None,
+        api_key=None,
+        cache: EmbeddingCache = None,
+        max_batch_size: int = None,
+    ):
         """
         Initialize the embedding service.
 
@@ -18,17 +29,38 @@ class EmbeddingService:
             If None, uses default from environment.
         api_key : str, optional
             API key for authentication. If None, loads from .env file.
+        cache : EmbeddingCache, optional
+            Cache of query embeddings. If None, every call hits the API.
+        max_batch_size : int, optional
+            Maximum number of texts sent in one request.
+            Default is `EMBEDDING_BATCH_SIZE` or 32.
         """
         load_dotenv()
         self.endpoint_url = endpoint_url or os.getenv(
             "EMBEDDING_ENDPOINT_URL", "https://llm.lab.sspcloud.fr/ollama/api/embed"
         )
         self.api_key = api_key or os.getenv("LLM_API_KEY")
+        self.cache = cache
+        self.max_batch_size = int(max_batch_size or os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+    def _cache_key(self, text: str, normalize: bool) -> str:
+        return f"{self.MODEL}|{int(normalize)}|{EmbeddingCache.normalize(text)}"
+
+    def query_key(self, text: str, normalize: bool = True) -> str:
+        """
+        Return the key under which equivalent texts share one embedding.
+
+        It is the cache key (normalized text) when there is a cache, the
+        text itself otherwise.
+        """
+        return self._cache_key(text, normalize) if self.cache is not None else text
 
     def vectorize(self, text: str, normalize: bool = True) -> list:
         """
         Vectorize the given text using the Ollama API.
 
+        When a cache is configured, repeated queries are answered from it.
+
         Parameters
         ----------
         text : str
@@ -46,13 +78,110 @@ class EmbeddingService:
         ValueError
             If the request fails or the response is invalid.
         """
+        return self.vectorize_many([text], normalize)[0]
+
+    def vectorize_many(self, texts, normalize: bool = True) -> list:
+        """
+        Vectorize several texts, sending them to the API as batches.
+
+        Cached texts are not sent again and duplicates are embedded once.
+
+        Parameters
+        ----------
+        texts : list of str
+            The texts to vectorize.
+        normalize : bool, optional
+            Whether to normalize the embeddings to unit length. Default is True.
+
+        Returns
+        -------
+        list
+            One embedding per text, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If a request fails or a response is invalid.
+        """
+        texts = list(texts)
+        embeddings = [None] * len(texts)
+        missing = {}  # cache key -> (text, positions)
+        for position, text in enumerate(texts):
+            key = self.query_key(text, normalize)
+            if key in missing:
+                missing[key][1].append(position)
+                continue
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                embeddings[position] = cached
+            else:
+                missing[key] = (text, [position])
+
+        if missing:
+            fetched = self.fetch_many([text for text, _ in missing.values()], normalize)
+            for (_, positions), embedding in zip(missing.values(), fetched):
+                for position in positions:
+                    embeddings[position] = list(embedding)
+        return embeddings
+
+    def lookup(self, text: str, normalize: bool = True, disk: bool = True):
+        """
+        Return the cached embedding of a text without calling the API.
+
+        Parameters
+        ----------
+        disk : bool, optional
+            Also look the SQLite tier of the cache up, see `EmbeddingCache.get`.
+            Default is True.
+
+        Returns
+        -------
+        list or None
+            The embedding, or None if it is not cached (or there is no cache).
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(text, normalize), disk=disk)
+
+    def fetch_many(self, texts, normalize: bool = True) -> list:
+        """
+        Embed texts with the API, without looking them up in the cache.
+
+        The texts are sent in batches of at most `max_batch_size` and the
+        results are stored in the cache when there is one.
+
+        Returns
+        -------
+        list
+            One embedding per text, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If a request fails or a response is invalid.
+        """
+        texts = list(texts)
+        embeddings = []
+        for start in range(0, len(texts), self.max_batch_size):
+            embeddings.extend(
+                self._request_embeddings(
+                    texts[start : start + self.max_batch_size], normalize
+                )
+            )
+        if self.cache is not None:
+            for text, embedding in zip(texts, embeddings):
+                self.cache.put(self._cache_key(text, normalize), embedding)
+        return embeddings
+
+    def _request_embeddings(self, texts: list, normalize: bool = True) -> list:
+        """Call the Ollama API once for a batch of texts."""
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
         payload = {
-            "model": "bge-m3:latest",
-            "input": [text],
+            "model": self.MODEL,
+            "input": texts,
         }
 
         try:
@@ -62,16 +191,20 @@ class EmbeddingService:
             result = response.json()
 
             if "embeddings" in result:
-                embedding = result["embeddings"][0]
+                embeddings = result["embeddings"]
+                if len(embeddings) != len(texts):
+                    raise ValueError(
+                        f"Expected {len(texts)} embeddings, got {len(embeddings)}."
+                    )
 
-                # Normalize the embedding if requested
-                if normalize:
-                    embedding_array = np.array(embedding)
-                    norm = np.linalg.norm(embedding_array)
-                    if norm > 0:
-                        embedding = (embedding_array / norm).tolist()
+                # Normalize the embeddings if requested
+                if normalize and embeddings:
+                    embedding_array = np.array(embeddings, dtype=float)
+                    norms = np.linalg.norm(embedding_array, axis=1, keepdims=True)
+                    norms[norms == 0] = 1
+                    embeddings = (embedding_array / norms).tolist()
 
-                return embedding
+                return embeddings
             else:
                 raise ValueError(
                     "Invalid response format: 'embedding' field not found."
@@ -79,3 +212,38 @@ class EmbeddingService:
 
         except requests.exceptions.RequestException as e:
             raise ValueError(f"Failed to vectorize text: {e}")
+
+    def warm_up(self, prompts) -> int:
+        """
+        Fill the cache with the embeddings of the given prompts.
+
+        Prompts already cached are skipped and failures are ignored, so this
+        can safely run at startup.
+
+        Parameters
+        ----------
+        prompts : iterable of str
+            The prompts to embed, e.g. the ones stored in the `histories` table.
+
+        Returns
+        -------
+        int
+            The number of prompts that had to be embedded.
+        """
+        if self.cache is None:
+            return 0
+        missing = {}
+        for prompt in prompts:
+            key = self._cache_key(prompt, True) if prompt else None
+            if key and key not in missing and key not in self.cache:
+                missing[key] = prompt
+        missing = list(missing.values())
+        embedded = 0
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = missing[start : start + self.max_batch_size]
+            try:
+                self.fetch_many(batch)
+                embedded += len(batch)
+            except ValueError as e:
+                print(f"Warm-up failed for {len(batch)} prompts: {e}")
+        return embedded
@@ -1,9 +1,14 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Query, HTTPException, Path, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-from dao.playerDao import PlayerDao
+from typing import List, Literal, Optional, Dict
 from dao.cardDao import CardDao
+from dao.asyncCardDao import AsyncCardDao
+from dao.asyncPlayerDao import AsyncPlayerDao
 from dao.userDao import UserDao
 from dao.adminDao import AdminDao
 import hashlib
@@ -16,6 +21,77 @@ from dao.favoriteDao import FavoriteDao
 from business_object.favoriteBusiness import FavoriteBusiness
 from dao.historyDao import HistoryDao
 from business_object.historyBusiness import HistoryBusiness
+from services.embeddingService import EmbeddingService
+from services.embeddingCache import EmbeddingCache
+from services.cardCache import get_card_cache
+from services.nameIndex import NameIndex
+from services.decklist import DecklistError
+from services.filterIndex import get_filter_index
+from services.embeddingBatcher import EmbeddingBatcher
+from utils.asyncDbConnection import close_async_pool
+
+# Projection profiles of `CardDao.PROFILES`
+CardProfile = Literal["summary", "detail", "full"]
+
+
+def warm_up_embedding_cache(limit: int) -> None:
+    """Embed the most recent history prompts so that replays hit the cache."""
+    try:
+        prompts = history_dao.get_recent_prompts(limit)
+        embedded = embedding_service.warm_up(prompts)
+        print(f"Embedding cache warmed up: {embedded} new prompts")
+    except Exception as e:
+        print(f"Embedding cache warm-up failed: {e}")
+
+
+def load_search_engine() -> None:
+    """Load the in-memory search corpus before the first query needs it."""
+    try:
+        player_dao.engine.load()
+        print(f"Search engine loaded: {len(player_dao.engine)} cards")
+    except Exception as e:
+        print(f"Search engine loading failed: {e}")
+
+
+def load_name_index() -> None:
+    """Build the autocompletion index before the first keystroke needs it."""
+    try:
+        name_index.load()
+        print(f"Name index loaded: {len(name_index)} cards")
+    except Exception as e:
+        print(f"Name index loading failed: {e}")
+
+
+def load_filter_index() -> None:
+    """Build the filter bitsets before the first filtered query needs them."""
+    try:
+        index = get_filter_index()
+        index.load()
+        print(
+            f"Filter index loaded: {len(index)} cards, "
+            f"{index.memory_usage() / 2**20:.1f} MB"
+        )
+    except Exception as e:
+        print(f"Filter index loading failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_limit = int(os.getenv("EMBEDDING_CACHE_WARMUP", "0"))
+    if warmup_limit > 0:
+        app.state.warmup_task = asyncio.create_task(
+            asyncio.to_thread(warm_up_embedding_cache, warmup_limit)
+        )
+    if player_dao.engine is not None:
+        app.state.engine_task = asyncio.create_task(
+            asyncio.to_thread(load_search_engine)
+        )
+    app.state.name_index_task = asyncio.create_task(asyncio.to_thread(load_name_index))
+    app.state.filter_index_task = asyncio.create_task(
+        asyncio.to_thread(load_filter_index)
+    )
+    yield
+    await close_async_pool()
 
 
 app = FastAPI(
@@ -43,15 +119,22 @@ app = FastAPI(
     license_info={
         "name": "MIT",
     },
+    lifespan=lifespan,
 )
 
-player_dao = PlayerDao()
+# Read-only card and search endpoints await the asyncio DAOs. Endpoints going
+# through the business layer use the synchronous DAOs and are declared with
+# `def` so that FastAPI runs them in its threadpool instead of the event loop.
+embedding_service = EmbeddingService(cache=EmbeddingCache())
+player_dao = AsyncPlayerDao(embedding_service, EmbeddingBatcher(embedding_service))
+async_card_dao = AsyncCardDao()
 card_dao = CardDao()
 deck_dao = DeckDao()
 favorite_dao = FavoriteDao()
 user_dao = UserDao()
 admin_dao = AdminDao()
-deck_business = DeckBusiness(deck_dao, user_dao, card_dao)
+name_index = NameIndex()
+deck_business = DeckBusiness(deck_dao, user_dao, card_dao, name_index)
 favorite_business = FavoriteBusiness(favorite_dao, user_dao, card_dao)
 history_dao = HistoryDao()
 history_business = HistoryBusiness(history_dao, user_dao)
@@ -80,6 +163,43 @@ class SearchQuery(BaseModel):
         description="Additional filters (colors, mana_value, etc.)",
         example={"colors": ["U"], "mana_value__lte": 3},
     )
+    ef_search: Optional[int] = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="HNSW candidate list size: higher is more accurate but slower",
+    )
+    probes: Optional[int] = Field(
+        None, ge=1, description="IVFFlat lists scanned: higher is more accurate but slower"
+    )
+    mode: Literal["vector", "lexical", "hybrid"] = Field(
+        "vector",
+        description="vector (semantic), lexical (name and rules text) or hybrid (both, fused)",
+    )
+    vector_weight: float = Field(
+        1.0, ge=0, description="Weight of the semantic ranking in hybrid mode"
+    )
+    lexical_weight: float = Field(
+        1.0, ge=0, description="Weight of the lexical ranking in hybrid mode"
+    )
+    timeout_ms: Optional[int] = Field(
+        None,
+        ge=10,
+        le=30000,
+        description="Milliseconds each search of the hybrid and lexical modes may take",
+    )
+
+
+class BatchSearchItem(SearchQuery):
+    key: Optional[str] = Field(
+        None, description="Key of this query in the response, default its position"
+    )
+
+
+class BatchSearchQuery(BaseModel):
+    queries: List[BatchSearchItem] = Field(
+        ..., min_length=1, max_length=20, description="The searches to run"
+    )
 
 
 class CardFilterQuery(BaseModel):
@@ -97,6 +217,16 @@ class CardFilterQuery(BaseModel):
         10, ge=1, le=100, description="Maximum number of results"
     )
     offset: Optional[int] = Field(0, ge=0, description="Pagination offset")
+    after: Optional[str] = Field(
+        None,
+        description="`next` token of the previous page. Unlike `offset`, deep "
+        "pages cost the same as the first one",
+    )
+    profile: CardProfile = Field(
+        "summary",
+        description="Card columns returned: summary (list view), detail "
+        "(everything but raw data and embeddings) or full",
+    )
 
 
 class UserRegistration(BaseModel):
@@ -154,6 +284,30 @@ class DeckaddCardQuery(BaseModel):
     card_id: int = Field(..., gt=0, description="Card ID to add")
 
 
+class DeckCardChange(BaseModel):
+    card_id: int = Field(..., gt=0, description="Card ID")
+    quantity_delta: int = Field(
+        ..., description="Copies to add (positive) or remove (negative)"
+    )
+
+
+class DeckBulkQuery(BaseModel):
+    operations: List[DeckCardChange] = Field(
+        ..., min_length=1, max_length=250, description="Changes applied together"
+    )
+
+
+class DeckImportQuery(BaseModel):
+    decklist: str = Field(
+        ...,
+        max_length=100_000,
+        description="Plain text, MTGA export or MTGO .dek decklist",
+    )
+    include_sideboard: bool = Field(
+        False, description="Also add the sideboard cards to the deck"
+    )
+
+
 class FavoriteAction(BaseModel):
     card_id: int
 
@@ -174,6 +328,34 @@ class AdminUserUpdateUsername(BaseModel):
     )
 
 
+async def run_search(query: SearchQuery):
+    """Run one search with the DAO method of its mode."""
+    limit = min(query.limit, 300)
+    filters = query.filters or {}
+    if query.mode == "hybrid":
+        return await player_dao.hybrid_search(
+            query.text,
+            filters=filters,
+            limit=limit,
+            vector_weight=query.vector_weight,
+            lexical_weight=query.lexical_weight,
+            timeout=query.timeout_ms,
+            ef_search=query.ef_search,
+            probes=query.probes,
+        )
+    if query.mode == "lexical":
+        return await player_dao.lexical_search(
+            query.text, filters=filters, limit=limit, statement_timeout=query.timeout_ms
+        )
+    return await player_dao.natural_language_search(
+        query.text,
+        filters=filters,
+        limit=limit,
+        ef_search=query.ef_search,
+        probes=query.probes,
+    )
+
+
 @app.post(
     "/search",
     tags=["Search"],
@@ -184,6 +366,10 @@ class AdminUserUpdateUsername(BaseModel):
     This endpoint converts your text query into a vector and finds the most similar cards
     based on their semantic meaning, not just keyword matching.
 
+    With `mode="hybrid"` a name and rules text search runs alongside, and both rankings
+    are fused (reciprocal rank fusion weighted by `vector_weight` and `lexical_weight`),
+    so exact names like "Lightning Bolt" and keywords like "trample" rank first.
+
     **Examples:**
     - "powerful creatures with trample"
     - "blue control spells that counter"
@@ -199,18 +385,74 @@ async def search(query: SearchQuery):
     print(f"Requête reçue : {text}, limit: {limit}, filters: {filters}")
 
     try:
-        results = player_dao.natural_language_search(text, filters=filters, limit=limit)
+        results = await run_search(query)
 
         if not results:
             return {"results": [], "message": "Aucune carte trouvée."}
 
         return {"results": results}
 
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Erreur dans /search : {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/search/batch",
+    tags=["Search"],
+    summary="Several card searches at once",
+    description="""
+    Run up to 20 searches in one request. The texts of the `vector` searches are embedded
+    in a single call and searched over one database connection; `lexical` and `hybrid`
+    searches run alongside.
+
+    Results are keyed by the `key` of each query, or by its position ("0", "1", ...).
+    """,
+    response_description="Results of each search, keyed by query",
+)
+async def search_batch(batch: BatchSearchQuery):
+    keys = [
+        item.key if item.key is not None else str(position)
+        for position, item in enumerate(batch.queries)
+    ]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Query keys must be unique")
+    vector = [(key, item) for key, item in zip(keys, batch.queries) if item.mode == "vector"]
+    others = [(key, item) for key, item in zip(keys, batch.queries) if item.mode != "vector"]
+
+    try:
+        vector_results, other_results = await asyncio.gather(
+            player_dao.batch_search(
+                [
+                    {
+                        "query": item.text,
+                        "filters": item.filters or {},
+                        "limit": min(item.limit, 300),
+                        "ef_search": item.ef_search,
+                        "probes": item.probes,
+                    }
+                    for _, item in vector
+                ]
+            ),
+            asyncio.gather(*(run_search(item) for _, item in others)),
+        )
+        results = dict(zip((key for key, _ in vector), vector_results))
+        results.update(zip((key for key, _ in others), other_results))
+        return {"results": {key: results[key] for key in keys}}
+
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /search/batch : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post(
     "/filter",
     tags=["Search"],
@@ -239,10 +481,18 @@ async def filter(query: CardFilterQuery):
             filter_kwargs["mana_value__gte"] = query.mana_value__gte
         if query.mana_value__lte:
             filter_kwargs["mana_value__lte"] = query.mana_value__lte
-        results = card_dao.filter(
-            query.order_by, query.asc, query.limit, query.offset, **filter_kwargs
+        results, next_token = await async_card_dao.filter_page(
+            query.order_by,
+            query.asc,
+            query.limit,
+            query.offset,
+            profile=query.profile,
+            after=query.after,
+            **filter_kwargs,
         )
-        return {"results": results}
+        return {"results": results, "next": next_token}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Erreur dans /filter : {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -251,10 +501,11 @@ async def filter(query: CardFilterQuery):
 @app.get(
     "/cards/random",
     tags=["Browse"],
-    summary="Get a random card",
-    description="""Retrieve a randomly selected card from the database.
+    summary="Get random cards",
+    description="""Retrieve randomly selected cards from the database,
+                optionally restricted by colors and types.
                 Perfect for discovery and inspiration!""",
-    response_description="A randomly selected Magic card",
+    response_description="A randomly selected Magic card and the whole batch",
     responses={
         200: {
             "description": "Successful response",
@@ -267,7 +518,8 @@ async def filter(query: CardFilterQuery):
                             "mana_cost": "{R}",
                             "type": "Instant",
                             "text": "Lightning Bolt deals 3 damage to any target.",
-                        }
+                        },
+                        "cards": ["..."],
                     }
                 }
             },
@@ -275,14 +527,22 @@ async def filter(query: CardFilterQuery):
         404: {"description": "No cards found in database"},
     },
 )
-async def get_random_card():
+async def get_random_card(
+    count: int = Query(1, ge=1, le=100, description="Number of distinct cards"),
+    colors: Optional[List[str]] = Query(
+        None, description="Color filter (W, U, B, R, G)"
+    ),
+    types: Optional[List[str]] = Query(
+        None, alias="type", description="Type filter (Creature, Instant, ...)"
+    ),
+):
     try:
-        card = card_dao.get_random_card()
+        cards = await async_card_dao.get_random_cards(count, colors=colors, types=types)
 
-        if not card:
+        if not cards:
             raise HTTPException(status_code=404, detail="No cards found in database")
 
-        return {"card": card}
+        return {"card": cards[0], "cards": cards}
 
     except HTTPException:
         raise
@@ -291,6 +551,33 @@ async def get_random_card():
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.get(
+    "/cards/autocomplete",
+    tags=["Browse"],
+    summary="Autocomplete card names",
+    description="""
+    Complete the beginning of a card name, or of one of its words, from an
+    in-memory index. Completions are ranked by EDHREC popularity.
+
+    **Example:** `q=light` → "Lightning Bolt", "Lightning Greaves", ...
+    """,
+    response_description="Completions, most popular first",
+)
+async def autocomplete_card_names(
+    q: str = Query(..., min_length=1, description="Beginning of the name"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum completions"),
+):
+    try:
+        if not name_index.loaded:
+            await asyncio.to_thread(name_index.load)
+        else:
+            name_index.refresh_in_background()
+        return {"results": name_index.complete(q, limit)}
+    except Exception as e:
+        print(f"Error in /cards/autocomplete: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @app.get(
     "/cards/{card_id}",
     tags=["Browse"],
@@ -305,6 +592,7 @@ async def get_random_card():
 )
 async def get_card_by_id(
     card_id: int = Path(..., gt=0, description="Unique card identifier"),
+    profile: CardProfile = Query("full", description="Card columns returned"),
 ):
     if card_id <= 0:
         raise HTTPException(
@@ -312,7 +600,7 @@ async def get_card_by_id(
         )
 
     try:
-        card = card_dao.get_by_id(card_id)
+        card = await async_card_dao.get_by_id(card_id, profile=profile)
 
         if not card:
             raise HTTPException(
@@ -328,6 +616,60 @@ async def get_card_by_id(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.get(
+    "/cards/{card_id}/similar",
+    tags=["Browse"],
+    summary="Similar cards",
+    description="""
+    Cards whose embedding is nearest to the given card, nearest first.
+
+    Neighbors are precomputed by `python -m utils.cardNeighbors`; cards added since
+    the last run are answered with a vector search on their embedding.
+    """,
+    responses={404: {"description": "Card not found or not embedded"}},
+)
+async def get_similar_cards(
+    card_id: int = Path(..., gt=0, description="Unique card identifier"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of cards"),
+    profile: CardProfile = Query("summary", description="Card columns returned"),
+):
+    try:
+        cards = await async_card_dao.get_similar(card_id, limit, profile)
+        if cards is None:
+            embedding = await player_dao.get_card_embedding(card_id)
+            if embedding is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Card with ID {card_id} not found or not embedded",
+                )
+            hits = await player_dao.natural_language_search(embedding, limit=limit + 1)
+            cards = [hit for hit in hits if hit["id"] != card_id][:limit]
+        return {"card_id": card_id, "results": cards}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in /cards/{card_id}/similar: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.get(
+    "/metrics",
+    tags=["Monitoring"],
+    summary="Cache metrics",
+    description="Hit ratios and sizes of the in-process card and embedding caches.",
+)
+async def get_metrics():
+    return {
+        "card_cache": get_card_cache().stats(),
+        "embedding_cache": embedding_service.cache.stats(),
+        "filter_index": {
+            "cards": len(get_filter_index()),
+            "memory_bytes": get_filter_index().memory_usage(),
+        },
+    }
+
+
 @app.get(
     "/cards",
     tags=["Browse"],
@@ -338,6 +680,8 @@ async def get_card_by_id(
     **Examples:**
     - `name=bolt` → finds "Lightning Bolt", "Bolt Bend", etc.
     - `name=Jace` → finds all cards with "Jace" in the name
+    - `name=lightn&mode=prefix` → typeahead on the start of the name
+    - `name=lightnig bolt&mode=similar` → "Lightning Bolt" despite the typo
     """,
     response_description="List of matching cards with pagination info",
 )
@@ -347,6 +691,15 @@ async def search_cards_by_name(
     ),
     limit: int = Query(20, ge=1, le=100, description="Maximum results"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    after: Optional[str] = Query(
+        None, description="`next` token of the previous page"
+    ),
+    profile: CardProfile = Query("summary", description="Card columns returned"),
+    mode: Literal["contains", "prefix", "similar"] = Query(
+        "contains",
+        description="contains: anywhere in the name, prefix: typeahead, "
+        "similar: ranked by trigram similarity, tolerates typos",
+    ),
 ):
     if not name:
         raise HTTPException(
@@ -356,10 +709,20 @@ async def search_cards_by_name(
     limit = min(limit, 100)
 
     try:
-        cards = card_dao.search_by_name(name, limit=limit, offset=offset)
+        cards, next_token = await async_card_dao.search_by_name_page(
+            name, limit=limit, offset=offset, profile=profile, after=after, mode=mode
+        )
 
-        return {"results": cards, "count": len(cards), "limit": limit, "offset": offset}
+        return {
+            "results": cards,
+            "count": len(cards),
+            "limit": limit,
+            "offset": offset,
+            "next": next_token,
+        }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error in /cards?name={name}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -376,7 +739,7 @@ async def search_cards_by_name(
         400: {"description": "Invalid input or user already exists"},
     },
 )
-async def register(user_data: UserRegistration):
+def register(user_data: UserRegistration):
     try:
         password_hash = hashlib.sha256(user_data.password.encode()).hexdigest()
 
@@ -424,7 +787,7 @@ async def register(user_data: UserRegistration):
     description="Authenticate a user and receive a JWT access token for protected endpoints.",
     response_description="Login confirmation with JWT token",
 )
-async def login(user_data: UserLogin):
+def login(user_data: UserLogin):
     try:
         user_service = UserService(
             username=user_data.username,
@@ -469,7 +832,7 @@ async def login(user_data: UserLogin):
     summary="Get deck by ID",
     description="Retrieve all cards in a specific deck. Only the deck owner can access it.",
 )
-async def reading_deck(query: DeckreadingQuery, current_user: dict = Depends(get_current_user)):
+def reading_deck(query: DeckreadingQuery, current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user['user_id']
         results = deck_business.get_deck_details(user_id, query.deck_id)
@@ -487,7 +850,7 @@ async def reading_deck(query: DeckreadingQuery, current_user: dict = Depends(get
     summary="Create new deck",
     description="Create a new empty deck with a name and optional format type.",
 )
-async def create_deck(query: DeckcreateQuery, current_user: dict = Depends(get_current_user)):
+def create_deck(query: DeckcreateQuery, current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user['user_id']
         results = deck_business.create_new_deck(user_id, query.deck_name,
@@ -507,7 +870,7 @@ async def create_deck(query: DeckcreateQuery, current_user: dict = Depends(get_c
     description="""Permanently delete a deck and all its card associations.
                 Only the deck owner can delete it.""",
 )
-async def delete_deck(query: DeckdeleteQuery, current_user: dict = Depends(get_current_user)):
+def delete_deck(query: DeckdeleteQuery, current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user['user_id']
         results = deck_business.delete_deck(user_id, query.deck_id)
@@ -526,7 +889,7 @@ async def delete_deck(query: DeckdeleteQuery, current_user: dict = Depends(get_c
     description="""Retrieve all decks belonging to the authenticated user,
                 or a specific deck if deck_id is provided.""",
 )
-async def read_user_deck(
+def read_user_deck(
     deck_id: Optional[int] = Query(
         None, gt=0, description="Specific deck ID (optional)"
     ),
@@ -553,7 +916,7 @@ async def read_user_deck(
     description="""Add a card to a deck. If the card already exists, increments quantity.
                 Only the deck owner can add cards.""",
 )
-async def add_card_deck(query: DeckaddCardQuery, current_user: dict = Depends(get_current_user)):
+def add_card_deck(query: DeckaddCardQuery, current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user['user_id']
         results = deck_business.add_card_to_deck(user_id, query.card_id, query.deck_id)
@@ -571,7 +934,7 @@ async def add_card_deck(query: DeckaddCardQuery, current_user: dict = Depends(ge
     summary="Remove card from deck",
     description="""Entirely remove a card from a deck, regardless of quantity.""",
 )
-async def remove_card_deck(
+def remove_card_deck(
     deck_id: int = Query(..., gt=0, description="Deck ID"),
     card_id: int = Query(..., gt=0, description="Card ID to remove"),
     current_user: dict = Depends(get_current_user)
@@ -587,8 +950,153 @@ async def remove_card_deck(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/deck/{deck_id}/cards/bulk",
+    tags=["Deck Management"],
+    summary="Edit many cards of a deck",
+    description="""Apply a list of quantity changes to a deck in one transaction and
+                return the resulting cards. Only the deck owner can edit it.""",
+)
+def bulk_edit_deck(
+    query: DeckBulkQuery,
+    deck_id: int = Path(..., gt=0, description="Deck ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        user_id = current_user['user_id']
+        changes = [operation.model_dump() for operation in query.operations]
+        results = deck_business.apply_card_changes(user_id, deck_id, changes)
+        return {"results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/cards/bulk : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get(
+    "/deck/{deck_id}/statistics",
+    tags=["Deck Management"],
+    summary="Deck statistics",
+    description="""Mana curve, average mana value, color, color identity, type and
+                subtype breakdown of a deck, counting every copy.""",
+)
+def deck_statistics(
+    deck_id: int = Path(..., gt=0, description="Deck ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        user_id = current_user['user_id']
+        results = deck_business.get_deck_statistics(user_id, deck_id)
+        return {"results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/statistics : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get(
+    "/deck/{deck_id}/recommend",
+    tags=["Deck Management"],
+    summary="Recommend cards for a deck",
+    description="""Cards nearest to the quantity-weighted mean embedding of a deck,
+                within its color identity and not already in it, nearest first.""",
+)
+async def recommend_cards(
+    deck_id: int = Path(..., gt=0, description="Deck ID"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of cards"),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        user_id = current_user['user_id']
+        profile = await asyncio.to_thread(deck_business.get_deck_profile, user_id, deck_id)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/recommend : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if profile["centroid"] is None:
+        raise HTTPException(
+            status_code=400, detail="This deck has no card with an embedding"
+        )
+
+    filters = {
+        "color_identity__subset": profile["color_identity"],
+        "id__not_in": profile["card_ids"],
+    }
+    try:
+        results = await player_dao.natural_language_search(
+            profile["centroid"], filters=filters, limit=limit
+        )
+        return {"deck_id": deck_id, "results": results}
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/recommend : {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.post(
+    "/deck/{deck_id}/import",
+    tags=["Deck Management"],
+    summary="Import a decklist",
+    description="""Add the cards of a pasted decklist ("4 Lightning Bolt" lines, MTGA
+                export or MTGO .dek) to a deck in one transaction. Unknown card names
+                are returned in `unresolved`.""",
+)
+def import_decklist(
+    query: DeckImportQuery,
+    deck_id: int = Path(..., gt=0, description="Deck ID"),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        user_id = current_user['user_id']
+        results = deck_business.import_decklist(
+            user_id, deck_id, query.decklist, query.include_sideboard
+        )
+        return {"results": results}
+    except DecklistError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/import : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get(
+    "/deck/{deck_id}/export",
+    tags=["Deck Management"],
+    summary="Export a decklist",
+    description="""Write a deck as plain text, MTGA text or an MTGO .dek file.""",
+)
+def export_decklist(
+    deck_id: int = Path(..., gt=0, description="Deck ID"),
+    fmt: Literal["text", "mtga", "mtgo"] = Query(
+        "text", alias="format", description="Decklist format"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        user_id = current_user['user_id']
+        content = deck_business.export_decklist(user_id, deck_id, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        print(f"Erreur dans /deck/{deck_id}/export : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if fmt == "mtgo":
+        return Response(
+            content,
+            media_type="application/xml",
+            headers={"Content-Disposition": f'attachment; filename="deck-{deck_id}.dek"'},
+        )
+    return Response(content, media_type="text/plain")
+
+
 @app.post("/favorite/add", tags=["Favorite"])
-async def add_to_favorites(fav: FavoriteAction, current_user: dict = Depends(get_current_user)):
+def add_to_favorites(fav: FavoriteAction, current_user: dict = Depends(get_current_user)):
     try:
         result = favorite_business.add_favorite(current_user["user_id"], fav.card_id)
         return {"message": "Added to favorites", "favorite": result}
@@ -600,7 +1108,7 @@ async def add_to_favorites(fav: FavoriteAction, current_user: dict = Depends(get
 
 
 @app.post("/favorite/remove", tags=["Favorite"])
-async def remove_from_favorites(fav: FavoriteAction,
+def remove_from_favorites(fav: FavoriteAction,
                                 current_user: dict = Depends(get_current_user)):
     try:
         result = favorite_business.remove_favorite(current_user["user_id"], fav.card_id)
@@ -614,7 +1122,7 @@ async def remove_from_favorites(fav: FavoriteAction,
 
 
 @app.get("/favorite", tags=["Favorite"])
-async def list_favorites(current_user: dict = Depends(get_current_user)):
+def list_favorites(current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user["user_id"]
         favorites = favorite_business.favorite.get_by_id(user_id)
@@ -625,7 +1133,7 @@ async def list_favorites(current_user: dict = Depends(get_current_user)):
 
 
 @app.post("/history/add", tags=["History"])
-async def add_history(entry: HistoryAction, current_user: dict = Depends(get_current_user)):
+def add_history(entry: HistoryAction, current_user: dict = Depends(get_current_user)):
     try:
         result = history_business.add(current_user["user_id"], entry.prompt)
         return {"message": "Added to history", "history": result}
@@ -638,7 +1146,7 @@ async def add_history(entry: HistoryAction, current_user: dict = Depends(get_cur
 
 
 @app.get("/history", tags=["History"])
-async def list_history(current_user: dict = Depends(get_current_user)):
+def list_history(current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user["user_id"]
         hist = history_business.history.get_by_id(user_id)
@@ -673,7 +1181,7 @@ def _ensure_admin(current_user: dict) -> None:
     description="Return the list of all users. Admin only.",
     response_description="List of users",
 )
-async def admin_list_users(current_user: dict = Depends(get_current_user)):
+def admin_list_users(current_user: dict = Depends(get_current_user)):
     _ensure_admin(current_user)
     try:
         users = admin_dao.get_all()
@@ -689,7 +1197,7 @@ async def admin_list_users(current_user: dict = Depends(get_current_user)):
     description="Delete a user by ID. Admin only.",
     response_description="Deleted user information",
 )
-async def admin_delete_user(
+def admin_delete_user(
     payload: AdminUserDelete, current_user: dict = Depends(get_current_user)
 ):
     _ensure_admin(current_user)
@@ -713,7 +1221,7 @@ async def admin_delete_user(
     description="Update the username of a user by ID. Admin only.",
     response_description="Updated user information",
 )
-async def admin_update_username(
+def admin_update_username(
     payload: AdminUserUpdateUsername, current_user: dict = Depends(get_current_user)
 ):
     _ensure_admin(current_user)
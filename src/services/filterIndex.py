@@ -0,0 +1,343 @@
+import os
+import re
+import threading
+import time
+import numpy as np
+from utils.dbConnection import dbConnection
+from services.cardCache import get_card_cache
+
+# Array columns with one bitset per value
+ARRAY_FIELDS = ("colors", "color_identity", "supertypes", "types", "subtypes", "keywords")
+
+_OVERLAP_CONDITION = re.compile(r"^(\w+) && %s$")
+_MANA_VALUE_CONDITION = re.compile(r"^mana_value (>=|<=|>|<|=) %s$")
+_IN_CONDITION = re.compile(r"^(type|mana_value) IN \(%s(?:, %s)*\)$")
+_COMPARATORS = {
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    ">": np.greater,
+    "<": np.less,
+    "=": np.equal,
+}
+# Number of set bits of each byte value
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint16)
+
+
+class FilterIndex:
+    """
+    Precomputed bitsets of the structured card filters.
+
+    Cards are numbered by ascending ID and every filterable value gets a
+    bitset of the cards having it, packed 8 cards per byte (about 4 KB per
+    value for 32k cards): each color, color identity, supertype, type,
+    subtype and keyword, and each distinct mana value (bucket). The type line
+    is kept as one category code per card.
+
+    Filter conditions, as built by `CardDao._filter_conditions` and
+    `PlayerDao._filter_conditions`, are resolved with bitwise OR (values of
+    one condition) and AND (conditions) before any row is read. `narrow`
+    replaces them with `id = ANY(...)` when few cards match, or `FALSE` when
+    none do; conditions the index does not know are left to PostgreSQL.
+
+    The index is only used once built (see `load`). Card writes through
+    `CardDao` in this process make it unusable until it is rebuilt in the
+    background; after `max_age` seconds it keeps answering while it is
+    rebuilt, which picks up ingests made by other processes.
+    """
+
+    def __init__(self, max_age: float = None, max_candidates: int = None):
+        """
+        Initialize an empty index.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            Seconds after which the index is rebuilt, 0 meaning never.
+            Default is `FILTER_INDEX_MAX_AGE` or 3600.
+        max_candidates : int, optional
+            Largest candidate set sent to PostgreSQL as `id = ANY(...)`;
+            broader filters are left to the query planner.
+            Default is `FILTER_INDEX_MAX_CANDIDATES` or 2000.
+        """
+        self.max_age = float(
+            max_age if max_age is not None else os.getenv("FILTER_INDEX_MAX_AGE", "3600")
+        )
+        self.max_candidates = int(
+            max_candidates
+            if max_candidates is not None
+            else os.getenv("FILTER_INDEX_MAX_CANDIDATES", "2000")
+        )
+        if self.max_age < 0 or self.max_candidates < 0:
+            raise ValueError("max_age and max_candidates must be non-negative")
+        self.ids = None
+        self._bitsets = {}  # (field, value) -> packed bits
+        self._mana_values = None  # distinct mana values, ascending
+        self._mana_bitsets = []  # packed bits of each distinct mana value
+        self._type_codes = None  # type line category of each card
+        self._types = {}  # type line -> category
+        self.loaded_at = None
+        self._card_version = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._rebuilding = False
+
+    @property
+    def loaded(self) -> bool:
+        return self.ids is not None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    def memory_usage(self) -> int:
+        """Return the size in bytes of the bitsets and arrays."""
+        if not self.loaded:
+            return 0
+        bitsets = sum(bits.nbytes for bits in self._bitsets.values())
+        bitsets += sum(bits.nbytes for bits in self._mana_bitsets)
+        return bitsets + self.ids.nbytes + self._type_codes.nbytes
+
+    def load_rows(self, rows):
+        """
+        Build the index from card rows.
+
+        Parameters
+        ----------
+        rows : iterable of tuple
+            `(id, colors, color_identity, supertypes, types, subtypes,
+            keywords, mana_value, type)` of each card, in ascending ID order.
+        """
+        rows = list(rows)
+        count = len(rows)
+        positions = {}  # (field, value) -> card positions
+        mana_values = np.full(count, np.nan)
+        types, type_codes = {}, np.empty(count, dtype=np.int32)
+        for position, (card_id, *arrays, mana_value, type_line) in enumerate(rows):
+            for field, values in zip(ARRAY_FIELDS, arrays):
+                for value in values or ():
+                    positions.setdefault((field, value), []).append(position)
+            if mana_value is not None:
+                mana_values[position] = float(mana_value)
+            type_codes[position] = types.setdefault(type_line, len(types))
+
+        def pack(selected):
+            bits = np.zeros(count, dtype=bool)
+            bits[selected] = True
+            return np.packbits(bits)
+
+        bitsets = {key: pack(selected) for key, selected in positions.items()}
+        # NaN (no mana value) is in no bucket, like NULL in SQL comparisons
+        distinct = np.unique(mana_values[~np.isnan(mana_values)])
+        mana_bitsets = [pack(mana_values == value) for value in distinct]
+
+        with self._lock:
+            self.ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+            self._bitsets = bitsets
+            self._mana_values = distinct
+            self._mana_bitsets = mana_bitsets
+            self._type_codes = type_codes
+            self._types = types
+            self.loaded_at = time.monotonic()
+
+    def load(self):
+        """(Re)build the index from the `cards` table."""
+        with self._load_lock:
+            version = get_card_cache().version
+            with dbConnection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT id, {', '.join(ARRAY_FIELDS)}, mana_value, type "
+                        "FROM cards ORDER BY id"
+                    )
+                    self.load_rows(cursor.fetchall())
+            self._card_version = version
+
+    @property
+    def stale(self) -> bool:
+        """True when the index is missing, too old or cards were written."""
+        if not self.loaded:
+            return True
+        if self._card_version not in (None, get_card_cache().version):
+            return True
+        return self.max_age > 0 and time.monotonic() - self.loaded_at > self.max_age
+
+    def refresh_in_background(self) -> bool:
+        """
+        Rebuild the index in a thread if it is stale and no rebuild is running.
+
+        Returns
+        -------
+        bool
+            True if a rebuild was started.
+        """
+        with self._lock:
+            if self._rebuilding or not self.stale:
+                return False
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Filter index rebuild failed: {e}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=rebuild, name="filter-index-rebuild", daemon=True).start()
+        return True
+
+    def _usable(self) -> bool:
+        """True when the bitsets reflect the cards written by this process."""
+        if not self.loaded:
+            return False
+        if self.stale:
+            self.refresh_in_background()
+        return self._card_version in (None, get_card_cache().version)
+
+    def _empty(self):
+        return np.zeros((len(self.ids) + 7) // 8, dtype=np.uint8)
+
+    def _union(self, bitsets):
+        bits = self._empty()
+        for other in bitsets:
+            np.bitwise_or(bits, other, out=bits)
+        return bits
+
+    def _mana_value_bits(self, comparator, value):
+        selected = _COMPARATORS[comparator](self._mana_values, value)
+        return self._union(
+            bits for bits, keep in zip(self._mana_bitsets, selected) if keep
+        )
+
+    def _type_bits(self, type_lines):
+        codes = [self._types[line] for line in type_lines if line in self._types]
+        return np.packbits(np.isin(self._type_codes, codes))
+
+    def _condition_bits(self, condition, params):
+        """Return the bits of one condition, None if the index cannot answer it."""
+        if condition == "FALSE":
+            return self._empty()
+        match = _OVERLAP_CONDITION.match(condition)
+        if match and match.group(1) in ARRAY_FIELDS and isinstance(params[0], list):
+            field = match.group(1)
+            return self._union(
+                self._bitsets[(field, value)]
+                for value in params[0]
+                if (field, value) in self._bitsets
+            )
+        numeric = all(
+            isinstance(value, (int, float)) and not isinstance(value, bool)
+            for value in params
+        )
+        match = _MANA_VALUE_CONDITION.match(condition)
+        if match and numeric:
+            return self._mana_value_bits(match.group(1), params[0])
+        match = _IN_CONDITION.match(condition)
+        if match and match.group(1) == "mana_value" and numeric:
+            return self._union(self._mana_value_bits("=", value) for value in params)
+        if match and match.group(1) == "type":
+            return self._type_bits(params)
+        if condition == "type = %s" and isinstance(params[0], str):
+            return self._type_bits(params)
+        return None
+
+    def resolve(self, conditions):
+        """
+        AND the conditions the index can answer.
+
+        Parameters
+        ----------
+        conditions : list[tuple[str, list]]
+            Filter conditions and their parameters.
+
+        Returns
+        -------
+        tuple
+            The packed bits of the matching cards (None if no condition could
+            be answered or the index is not usable), the card IDs they are
+            numbered after, read with them so that a concurrent rebuild
+            cannot mix two indexes, and the conditions left to PostgreSQL.
+        """
+        if not conditions or not self._usable():
+            return None, None, list(conditions or ())
+        with self._lock:
+            resolved, remaining = None, []
+            for condition, params in conditions:
+                bits = self._condition_bits(condition, params)
+                if bits is None:
+                    remaining.append((condition, params))
+                elif resolved is None:
+                    resolved = bits
+                else:
+                    resolved = np.bitwise_and(resolved, bits)
+            return resolved, self.ids, remaining
+
+    def candidates(self, conditions):
+        """
+        Return the IDs of the cards matching every condition.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The ascending card IDs, None if a condition cannot be answered
+            by the index or it is not usable.
+        """
+        bits, ids, remaining = self.resolve(conditions)
+        if bits is None or remaining:
+            return None
+        return ids[np.flatnonzero(np.unpackbits(bits, count=len(ids)))]
+
+    def count(self, conditions):
+        """
+        Count the cards matching every condition.
+
+        Returns
+        -------
+        tuple or None
+            `(matched, total)`, None if a condition cannot be answered by the
+            index or it is not usable.
+        """
+        bits, ids, remaining = self.resolve(conditions)
+        if bits is None or remaining:
+            return None
+        return int(_POPCOUNT[bits].sum()), len(ids)
+
+    def narrow(self, conditions):
+        """
+        Replace the conditions the index answers by the matching IDs.
+
+        Parameters
+        ----------
+        conditions : list[tuple[str, list]]
+            Filter conditions and their parameters.
+
+        Returns
+        -------
+        list[tuple[str, list]]
+            `("FALSE", [])` when no card matches; `id = ANY(%s)` followed by
+            the remaining conditions when at most `max_candidates` cards
+            match; otherwise the conditions unchanged.
+        """
+        bits, ids, remaining = self.resolve(conditions)
+        if bits is None:
+            return list(conditions or ())
+        matched = int(_POPCOUNT[bits].sum())
+        if matched == 0:
+            return [("FALSE", [])]
+        if matched > self.max_candidates:
+            return list(conditions)
+        ids = ids[np.flatnonzero(np.unpackbits(bits, count=len(ids)))]
+        return [("id = ANY(%s)", [ids.tolist()])] + remaining
+
+
+_filter_index = None
+_filter_index_lock = threading.Lock()
+
+
+def get_filter_index():
+    """Return the filter index shared by every DAO of the process."""
+    global _filter_index
+    with _filter_index_lock:
+        if _filter_index is None:
+            _filter_index = FilterIndex()
+        return _filter_index
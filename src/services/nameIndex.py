@@ -0,0 +1,286 @@
+import bisect
+import os
+import re
+import threading
+import time
+import unicodedata
+import numpy as np
+from utils.dbConnection import dbConnection
+from services.cardCache import get_card_cache
+
+# Added to the score of matches that start inside the name (e.g. "bolt" for
+# "Lightning Bolt") so that they rank after every match on the name start
+_INNER_WORD_PENALTY = 1e9
+# Score of the cards without an EDHREC rank
+_UNRANKED = 5e8
+# "Fire // Ice", "Fire//Ice" and "Fire/Ice" name the same split card
+_SPLIT_SEPARATOR = re.compile(r"\s*/+\s*")
+
+
+class NameIndex:
+    """
+    In-memory prefix index over the card names, for autocompletion.
+
+    Every normalized `name` and `ascii_name`, and every suffix of them starting
+    at a word, is stored in one sorted list. A completion is two `bisect`
+    calls giving the range of keys starting with the prefix, then an
+    `argpartition` of their scores (the EDHREC rank of the card, word
+    matches after name-start matches).
+
+    `lookup` resolves whole names (`name`, `ascii_name` or `face_name`) to a
+    card ID with one dictionary access each, for decklist imports.
+
+    The index is built from the `cards` table. It is considered stale once
+    `max_age` seconds have passed or when cards were written through
+    `CardDao` in this process, and is then rebuilt in the background while
+    the previous index keeps answering.
+    """
+
+    def __init__(self, max_age: float = None):
+        """
+        Initialize an empty index; it is built on the first completion.
+
+        Parameters
+        ----------
+        max_age : float, optional
+            Seconds after which the index is rebuilt, 0 meaning never.
+            Default is `NAME_INDEX_MAX_AGE` or 3600.
+        """
+        self.max_age = float(
+            max_age if max_age is not None else os.getenv("NAME_INDEX_MAX_AGE", "3600")
+        )
+        if self.max_age < 0:
+            raise ValueError("max_age must be non-negative")
+        self.keys = []
+        self.ids = None
+        self.names = []
+        self.ranks = None
+        self._positions = None
+        self._scores = None
+        self._exact = {}  # exact key -> (face name match, card id)
+        self.loaded_at = None
+        self._card_version = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._rebuilding = False
+
+    @property
+    def loaded(self) -> bool:
+        return self.ids is not None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Casefold, strip accents and collapse whitespace."""
+        decomposed = unicodedata.normalize("NFKD", text)
+        stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+        return " ".join(stripped.casefold().split())
+
+    @classmethod
+    def exact_key(cls, text: str) -> str:
+        """Normalize a whole card name, with one spelling of split cards."""
+        return _SPLIT_SEPARATOR.sub("/", cls.normalize(text))
+
+    def load_rows(self, rows):
+        """
+        Build the index from card rows.
+
+        Parameters
+        ----------
+        rows : iterable of tuple
+            `(id, name, ascii_name, edhrec_rank)` of each card, optionally
+            followed by its `face_name`.
+        """
+        ids, names, ranks = [], [], []
+        entries = []  # (key, card position, inner word match)
+        exact = {}
+        for card_id, name, ascii_name, edhrec_rank, *face in rows:
+            if not name:
+                continue
+            face_name = face[0] if face else None
+            # Reprints share names: keep the lowest ID, whole names before faces
+            for is_face, text in ((False, name), (False, ascii_name), (True, face_name)):
+                if text:
+                    key = self.exact_key(text)
+                    match = (is_face, card_id)
+                    exact[key] = min(exact.get(key, match), match)
+            position = len(ids)
+            ids.append(card_id)
+            names.append(name)
+            ranks.append(np.nan if edhrec_rank is None else float(edhrec_rank))
+            keys = {self.normalize(text) for text in (name, ascii_name) if text}
+            words = set()
+            for key in keys:
+                entries.append((key, position, False))
+                parts = key.split(" ")
+                words.update(" ".join(parts[i:]) for i in range(1, len(parts)))
+            entries.extend((word, position, True) for word in words - keys)
+        entries.sort()
+
+        ranks = np.asarray(ranks, dtype=np.float64)
+        positions = np.fromiter(
+            (position for _, position, _ in entries), dtype=np.int64, count=len(entries)
+        )
+        inner = np.fromiter(
+            (is_inner for _, _, is_inner in entries), dtype=bool, count=len(entries)
+        )
+        scores = np.where(np.isnan(ranks), _UNRANKED, ranks)[positions]
+        scores[inner] += _INNER_WORD_PENALTY
+
+        with self._lock:
+            self.keys = [key for key, _, _ in entries]
+            self.ids = np.asarray(ids, dtype=np.int64)
+            self.names = names
+            self.ranks = ranks
+            self._positions = positions
+            self._scores = scores
+            self._exact = {key: card_id for key, (_, card_id) in exact.items()}
+            self.loaded_at = time.monotonic()
+
+    def load(self):
+        """(Re)build the index from the `cards` table."""
+        with self._load_lock:
+            version = get_card_cache().version
+            with dbConnection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT id, name, ascii_name, edhrec_rank, face_name FROM cards "
+                        "WHERE name IS NOT NULL"
+                    )
+                    self.load_rows(cursor.fetchall())
+            self._card_version = version
+
+    @property
+    def stale(self) -> bool:
+        """True when the index is missing, too old or cards were written."""
+        if not self.loaded:
+            return True
+        if self._card_version not in (None, get_card_cache().version):
+            return True
+        return self.max_age > 0 and time.monotonic() - self.loaded_at > self.max_age
+
+    def refresh_in_background(self) -> bool:
+        """
+        Rebuild the index in a thread if it is stale and no rebuild is running.
+
+        Returns
+        -------
+        bool
+            True if a rebuild was started.
+        """
+        with self._lock:
+            if self._rebuilding or not self.stale:
+                return False
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Name index rebuild failed: {e}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name="name-index-rebuild", daemon=True).start()
+        return True
+
+    def lookup(self, names):
+        """
+        Resolve whole card names to card IDs.
+
+        Parameters
+        ----------
+        names : iterable of str
+            Card names, matched without case, accents or extra spaces against
+            `name`, `ascii_name` and then `face_name`.
+
+        Returns
+        -------
+        dict
+            The ID of each name, None for unknown names.
+
+        Raises
+        ------
+        RuntimeError
+            If the index has not been loaded.
+        """
+        with self._lock:
+            if not self.loaded:
+                raise RuntimeError("Name index is not loaded")
+            exact = self._exact
+        return {name: exact.get(self.exact_key(name)) for name in names}
+
+    def complete(self, prefix: str, limit: int = 10):
+        """
+        Return the card names starting with a prefix, best ranked first.
+
+        Parameters
+        ----------
+        prefix : str
+            Beginning of the name, or of one of its words.
+        limit : int, optional
+            Maximum number of completions. Default is 10.
+
+        Returns
+        -------
+        list[dict]
+            `id`, `name` and `edhrec_rank` of each completion, distinct names.
+
+        Raises
+        ------
+        RuntimeError
+            If the index has not been loaded.
+        ValueError
+            If `limit` is not positive.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        with self._lock:
+            if not self.loaded:
+                raise RuntimeError("Name index is not loaded")
+            keys, ids, names, ranks = self.keys, self.ids, self.names, self.ranks
+            positions, scores = self._positions, self._scores
+
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+        low = bisect.bisect_left(keys, prefix)
+        high = bisect.bisect_left(keys, prefix + "\U0010ffff", lo=low)
+        candidates = scores[low:high]
+
+        # A card matches through several keys (name, ascii_name, words) and
+        # reprints share names, so take a margin before deduplicating
+        wanted = limit * 4
+        if len(candidates) > wanted:
+            order = np.argpartition(candidates, wanted)[:wanted]
+            order = order[np.argsort(candidates[order], kind="stable")]
+        else:
+            order = np.argsort(candidates, kind="stable")
+
+        def collect(order):
+            results, seen = [], set()
+            for offset in order:
+                position = positions[low + offset]
+                name = names[position]
+                if name in seen:
+                    continue
+                seen.add(name)
+                rank = ranks[position]
+                results.append(
+                    {
+                        "id": int(ids[position]),
+                        "name": name,
+                        "edhrec_rank": None if np.isnan(rank) else int(rank),
+                    }
+                )
+                if len(results) == limit:
+                    break
+            return results
+
+        results = collect(order)
+        if len(results) < limit and len(order) < len(candidates):
+            # The margin was not enough: fall back to every candidate
+            results = collect(np.argsort(candidates, kind="stable"))
+        return results
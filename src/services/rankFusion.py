@@ -0,0 +1,53 @@
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings, weights=None, k: int = RRF_K):
+    """
+    Merge several rankings of the same items with reciprocal rank fusion.
+
+    Each item scores `sum(weight / (k + rank))` over the rankings it appears
+    in, ranks starting at 1. Only positions are used, so rankings with
+    unrelated scores (vector distance, text relevance) can be combined.
+
+    Parameters
+    ----------
+    rankings : list of list
+        Item keys of each ranking, best first. Duplicates after the first
+        occurrence are ignored.
+    weights : list of float, optional
+        Weight of each ranking. Default is 1 for every ranking.
+    k : int, optional
+        Damping constant: higher values flatten the gap between the first
+        ranks. Default is 60.
+
+    Returns
+    -------
+    list[tuple]
+        `(key, score)` pairs, best first. Ties keep the order in which the
+        items were first seen.
+
+    Raises
+    ------
+    ValueError
+        If the weights do not match the rankings or are negative, or `k` is
+        negative.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    if len(weights) != len(rankings):
+        raise ValueError("Expected one weight per ranking")
+    if any(weight < 0 for weight in weights):
+        raise ValueError("Weights must be non-negative")
+    if k < 0:
+        raise ValueError("k must be non-negative")
+
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        seen = set()
+        for rank, key in enumerate(ranking, start=1):
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    # sorted() is stable, dicts keep insertion order
+    return sorted(scores.items(), key=lambda item: -item[1])
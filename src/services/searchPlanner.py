@@ -0,0 +1,214 @@
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from services.cardCache import get_card_cache
+
+SEARCH_STRATEGIES = ("exact", "ann")
+# pgvector's default hnsw.ef_search, and the largest value it accepts
+_DEFAULT_EF_SEARCH = 40
+_MAX_EF_SEARCH = 1000
+
+
+class SearchPlanner:
+    """
+    Choose how pgvector runs a filtered vector search.
+
+    An approximate (HNSW/IVFFlat) index returns its nearest candidates first
+    and the `WHERE` filters are applied afterwards, so a selective filter can
+    leave fewer than `limit` rows. The planner counts the matching cards, up
+    to `exact_threshold`, and picks:
+
+    * "exact": few cards match, rank them all without the index;
+    * "ann": many cards match, use the index with a candidate list large
+      enough for the filtered share of the table (`hnsw.ef_search`), and
+      optionally an iterative scan.
+
+    The DAOs rerun a filtered "ann" search that still returns fewer than
+    `limit` rows as an exact one, so every matching card can be returned.
+
+    Counts are cached per filter combination until cards are written through
+    `CardDao` in this process (see `CardCache.version`).
+    """
+
+    def __init__(
+        self,
+        exact_threshold: int = None,
+        max_entries: int = 1024,
+        iterative_scan: bool = None,
+    ):
+        """
+        Initialize the planner.
+
+        Parameters
+        ----------
+        exact_threshold : int, optional
+            Largest number of matching cards ranked with an exact scan.
+            Default is `SEARCH_EXACT_THRESHOLD` or 5000.
+        max_entries : int, optional
+            Number of filter combinations whose count is kept. Default is 1024.
+        iterative_scan : bool, optional
+            Let filtered HNSW scans continue past `ef_search`, see
+            `scan_settings`. Default is `SEARCH_ITERATIVE_SCAN` or off.
+        """
+        self.exact_threshold = int(
+            exact_threshold
+            if exact_threshold is not None
+            else os.getenv("SEARCH_EXACT_THRESHOLD", "5000")
+        )
+        if self.exact_threshold < 0 or max_entries <= 0:
+            raise ValueError("exact_threshold must be non-negative and max_entries positive")
+        self.max_entries = max_entries
+        self.iterative_scan = (
+            iterative_scan
+            if iterative_scan is not None
+            else os.getenv("SEARCH_ITERATIVE_SCAN", "").lower() in ("1", "true", "yes")
+        )
+        self._counts = OrderedDict()  # filters key -> (matched, total, version)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filters):
+        """Return the cache key of a filter combination."""
+        return json.dumps(filters or {}, sort_keys=True, default=str)
+
+    def get(self, key):
+        """
+        Return the cached `(matched, total)` counts of a filter combination.
+
+        Returns
+        -------
+        tuple or None
+            The counts, None if they must be read from the database.
+        """
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None:
+                return None
+            if entry[2] != get_card_cache().version:
+                del self._counts[key]
+                return None
+            self._counts.move_to_end(key)
+            return entry[:2]
+
+    def counts(self, filters):
+        """
+        Return the cached counts of the search filters.
+
+        Returns
+        -------
+        tuple or None
+            `(matched, total)`, `(None, None)` without filters, None if the
+            counts must be read with `count_query`.
+        """
+        if not filters:
+            return None, None
+        return self.get(self.key(filters))
+
+    def put(self, key, matched, total, version):
+        """
+        Store the counts of a filter combination.
+
+        Parameters
+        ----------
+        version : int
+            `CardCache.version` read before the counts were fetched.
+
+        Returns
+        -------
+        tuple
+            `(matched, total)`.
+        """
+        with self._lock:
+            self._counts[key] = (matched, total, version)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return matched, total
+
+    def count_query(self, conditions):
+        """
+        Build the query counting the cards matching filter conditions.
+
+        The count stops at `exact_threshold + 1`, so broad filters cost no
+        more than selective ones. The table size is the planner statistic
+        `pg_class.reltuples`.
+
+        Parameters
+        ----------
+        conditions : list[tuple[str, list]]
+            See `PlayerDao._filter_conditions`.
+
+        Returns
+        -------
+        tuple[str, list]
+            The SQL query, returning `matched` and `total`, and its parameters.
+        """
+        params = []
+        for _, condition_params in conditions:
+            params.extend(condition_params)
+        where = " AND ".join(condition for condition, _ in conditions) or "TRUE"
+        query_sql = f"""
+            SELECT
+                (SELECT count(*) FROM (
+                    SELECT 1 FROM cards WHERE {where} LIMIT %s
+                ) AS matching) AS matched,
+                (SELECT reltuples::bigint FROM pg_class
+                 WHERE oid = 'cards'::regclass) AS total
+        """
+        return query_sql, [*params, self.exact_threshold + 1]
+
+    def plan(self, matched, total, candidates, ef_search=None):
+        """
+        Pick the strategy of a search.
+
+        Parameters
+        ----------
+        matched : int
+            Cards matching the filters, capped at `exact_threshold + 1`,
+            None for an unfiltered search.
+        total : int
+            Estimated number of cards, None for an unfiltered search.
+        candidates : int
+            Rows the index must return (`limit`, times the re-ranking factor
+            of a two-stage search).
+        ef_search : int, optional
+            `hnsw.ef_search` asked for by the caller.
+
+        Returns
+        -------
+        tuple
+            The strategy ("exact" or "ann") and the `hnsw.ef_search` to use,
+            None to keep the server setting.
+        """
+        if matched is not None and matched <= self.exact_threshold:
+            return "exact", ef_search
+        # matched is a lower bound, so this over-fetches rather than under-fetches
+        share = min(1.0, matched / total) if matched and total and total > 0 else 1.0
+        needed = math.ceil(candidates / share)
+        if ef_search is None and needed <= _DEFAULT_EF_SEARCH:
+            return "ann", None
+        return "ann", min(_MAX_EF_SEARCH, max(needed, ef_search or 0))
+
+    def scan_settings(self):
+        """
+        Build the statements enabling pgvector's iterative index scans.
+
+        With `iterative_scan`, an HNSW scan keeps visiting the graph until
+        enough rows pass the filters instead of stopping at `ef_search`
+        candidates (pgvector 0.8 or later).
+
+        Returns
+        -------
+        list[tuple[str, tuple]]
+            SQL statements and their parameters, empty when disabled.
+        """
+        if not self.iterative_scan:
+            return []
+        return [("SELECT set_config('hnsw.iterative_scan', %s, true)", ("strict_order",))]
+
+    def clear(self):
+        """Drop every cached count."""
+        with self._lock:
+            self._counts.clear()
@@ -0,0 +1,407 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from services.cardCache import get_card_cache
+from utils.dbConnection import dbConnection
+from utils import embeddingSnapshot
+
+# Conditions answered from the arrays loaded with the embeddings
+_NUMERIC_CONDITION = re.compile(r"^mana_value (>=|<=|>|<|=) %s$")
+_COMPARATORS = {
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    ">": np.greater,
+    "<": np.less,
+    "=": np.equal,
+}
+
+QUANTIZATIONS = ("float16", "int8")
+# Rows converted back to float32 at a time when scoring quantized vectors
+_CHUNK_ROWS = 4096
+
+
+class VectorSearchEngine:
+    """
+    Exact nearest neighbour search over the card embeddings, held in RAM.
+
+    All `cards.embedding` rows are loaded once into a contiguous float32
+    matrix. A search is one matrix-vector product followed by an
+    `argpartition` top-k, restricted by boolean masks built from the
+    search filters. `colors` and `mana_value` filters are answered from
+    arrays loaded with the embeddings; any other condition is resolved once
+    with an id-only SQL query and its mask is cached until cards are written
+    through `CardDao` (see `CardCache.version`).
+
+    When a snapshot file exists (see `utils.embeddingSnapshot`), the corpus
+    is memory-mapped from it instead of read from the database, and it is
+    reloaded when the snapshot is replaced.
+
+    With `quantization`, a float16 or int8 (one scale per vector) copy of the
+    matrix is scored first, then the `limit * rerank_factor` best candidates
+    are re-ranked with their full-precision vectors. Combined with a
+    snapshot, only the quantized copy lives in each worker's memory.
+    """
+
+    def __init__(
+        self,
+        max_masks: int = 256,
+        snapshot_path: str = None,
+        check_interval: float = 5.0,
+        quantization: str = None,
+        rerank_factor: int = 4,
+    ):
+        """
+        Initialize an empty engine; it is loaded on the first search.
+
+        Parameters
+        ----------
+        max_masks : int, optional
+            Number of SQL-resolved filter masks kept in memory. Default is 256.
+        snapshot_path : str, optional
+            Snapshot file to memory-map. Default is `EMBEDDING_SNAPSHOT_PATH`;
+            the database is used when unset or when the file does not exist.
+        check_interval : float, optional
+            Minimum seconds between two checks for a new snapshot. Default is 5.
+        quantization : str, optional
+            "float16" or "int8" to score candidates on quantized vectors.
+            Default is exact float32 scoring.
+        rerank_factor : int, optional
+            Candidates re-ranked at full precision per requested result.
+            Default is 4.
+
+        Raises
+        ------
+        ValueError
+            If the quantization is unknown or `rerank_factor` is below 1.
+        """
+        if quantization is not None and quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}"
+            )
+        if rerank_factor < 1:
+            raise ValueError("rerank_factor must be at least 1")
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self._codes = None
+        self._scales = None
+        self.max_masks = max_masks
+        self.snapshot_path = snapshot_path or embeddingSnapshot.default_path()
+        self.check_interval = check_interval
+        self.source = None
+        self._snapshot_version = None
+        self._checked_at = 0.0
+        self.ids = None
+        self.matrix = None
+        self.loaded_at = None
+        self._norms = None
+        self._mana_values = None
+        self._color_masks = {}
+        self._masks = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.matrix is not None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    def load_arrays(self, ids, matrix, colors=None, mana_values=None, norms=None):
+        """
+        Install the corpus from arrays.
+
+        Parameters
+        ----------
+        ids : array-like of int
+            Card IDs, in ascending order.
+        matrix : array-like
+            One embedding per row, aligned with `ids`.
+        colors : list of list of str, optional
+            The `colors` of each card.
+        mana_values : array-like of float, optional
+            The `mana_value` of each card, NaN for NULL.
+        norms : array-like of float, optional
+            Squared norm of each row, computed when not given.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("matrix must have one row per id")
+        if len(ids) > 1 and np.any(np.diff(ids) <= 0):
+            raise ValueError("ids must be strictly increasing")
+
+        color_masks = {}
+        for position, card_colors in enumerate(colors or []):
+            for color in card_colors or []:
+                color_masks.setdefault(color, np.zeros(len(ids), dtype=bool))[
+                    position
+                ] = True
+        if mana_values is None:
+            mana_values = np.full(len(ids), np.nan)
+        codes, scales = self._quantize(matrix)
+
+        with self._lock:
+            self.ids = ids
+            self.matrix = matrix
+            self._norms = (
+                np.einsum("ij,ij->i", matrix, matrix)
+                if norms is None
+                else np.asarray(norms, dtype=np.float32)
+            )
+            self._mana_values = np.asarray(mana_values, dtype=float)
+            self._color_masks = color_masks
+            self._codes, self._scales = codes, scales
+            self._masks.clear()
+            self.loaded_at = time.time()
+
+    def _quantize(self, matrix):
+        if self.quantization is None:
+            return None, None
+        if self.quantization == "float16":
+            return matrix.astype(np.float16), None
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), _CHUNK_ROWS):
+            chunk = np.asarray(matrix[start : start + _CHUNK_ROWS], dtype=np.float32)
+            chunk_scales = np.abs(chunk).max(axis=1) / 127
+            chunk_scales[chunk_scales == 0] = 1
+            codes[start : start + _CHUNK_ROWS] = np.rint(chunk / chunk_scales[:, None])
+            scales[start : start + _CHUNK_ROWS] = chunk_scales
+        return codes, scales
+
+    def memory_usage(self) -> dict:
+        """
+        Bytes held by the engine.
+
+        Returns
+        -------
+        dict
+            `matrix` (0 when memory-mapped, the page cache holds it) and
+            `quantized` sizes.
+        """
+        matrix = self.matrix
+        mapped = isinstance(matrix, np.memmap) or isinstance(
+            getattr(matrix, "base", None), np.memmap
+        )
+        return {
+            "matrix": 0 if matrix is None or mapped else matrix.nbytes,
+            "quantized": sum(
+                a.nbytes for a in (self._codes, self._scales) if a is not None
+            ),
+        }
+
+    def load(self, chunk_size: int = 2000):
+        """(Re)load every embedded card, from the snapshot or the database."""
+        with self._load_lock:
+            self._load(chunk_size)
+
+    def _load(self, chunk_size):
+        version = self._stat_snapshot()
+        if version is not None:
+            snapshot = embeddingSnapshot.read_snapshot(self.snapshot_path)
+            self.load_arrays(
+                snapshot["ids"],
+                snapshot["matrix"],
+                snapshot["colors"],
+                snapshot["mana_values"],
+                snapshot["norms"],
+            )
+            self.source = self.snapshot_path
+        else:
+            self.load_arrays(*embeddingSnapshot.fetch_embeddings(chunk_size))
+            self.source = "database"
+        self._snapshot_version = version
+        self._checked_at = time.monotonic()
+
+    def _stat_snapshot(self):
+        if not self.snapshot_path:
+            return None
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the corpus if the snapshot file was replaced since the last load.
+
+        Returns
+        -------
+        bool
+            True if the corpus was reloaded.
+        """
+        if not self.snapshot_path:
+            return False
+        self._checked_at = time.monotonic()
+        with self._load_lock:
+            if self._stat_snapshot() in (None, self._snapshot_version):
+                return False
+            self._load(2000)
+            return True
+
+    def refresh(self):
+        """Reload the corpus, e.g. after embeddings were regenerated."""
+        self.load()
+
+    def _sql_mask(self, condition, params, ids):
+        # Cards written through `CardDao` since a mask was cached may match
+        # the condition differently, hence the card cache version in the key
+        key = (condition, repr(params), get_card_cache().version)
+        with self._lock:
+            mask = self._masks.get(key) if self.ids is ids else None
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+
+        with dbConnection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT id FROM cards WHERE {condition}", params)
+                matching = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+        mask = np.isin(ids, matching)
+
+        with self._lock:
+            # Masks of a corpus replaced meanwhile would not line up with it
+            if self.ids is ids:
+                self._masks[key] = mask
+                while len(self._masks) > self.max_masks:
+                    self._masks.popitem(last=False)
+        return mask
+
+    def _condition_mask(self, condition, params, corpus):
+        ids, mana_values, color_masks = corpus
+        if condition == "colors && %s":
+            mask = np.zeros(len(ids), dtype=bool)
+            for color in params[0]:
+                if color in color_masks:
+                    mask |= color_masks[color]
+            return mask
+        match = _NUMERIC_CONDITION.match(condition)
+        if match and isinstance(params[0], (int, float)):
+            # NaN compares False, like NULL in SQL
+            return _COMPARATORS[match.group(1)](mana_values, params[0])
+        return self._sql_mask(condition, params, ids)
+
+    def mask(self, conditions, corpus=None):
+        """
+        Combine filter conditions into one boolean mask over the corpus.
+
+        Parameters
+        ----------
+        conditions : list[tuple[str, list]]
+            Conditions as built by `PlayerDao._filter_conditions`.
+        corpus : tuple, optional
+            `(ids, mana_values, color_masks)` the mask is built over, read
+            together under the lock so that a concurrent reload cannot mix
+            two corpora. Default is the current corpus.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The rows matching every condition, None if there is no condition.
+        """
+        if corpus is None:
+            with self._lock:
+                corpus = self.ids, self._mana_values, self._color_masks
+        mask = None
+        for condition, params in conditions or []:
+            condition_mask = self._condition_mask(condition, params, corpus)
+            mask = condition_mask if mask is None else mask & condition_mask
+        return mask
+
+    def search(self, query_embedding, conditions=None, limit: int = 5):
+        """
+        Find the cards closest to a query embedding (L2 distance).
+
+        Parameters
+        ----------
+        query_embedding : array-like
+            The query vector.
+        conditions : list[tuple[str, list]], optional
+            Filter conditions, see `mask`.
+        limit : int, optional
+            Maximum number of results. Default is 5.
+
+        Returns
+        -------
+        list[tuple[int, float]]
+            `(card_id, distance)` pairs, closest first.
+
+        Raises
+        ------
+        ValueError
+            If the query does not have the dimension of the corpus.
+        """
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self.load()
+        elif (
+            self.snapshot_path
+            and time.monotonic() - self._checked_at > self.check_interval
+        ):
+            self.reload_if_changed()
+        with self._lock:
+            ids, matrix, norms = self.ids, self.matrix, self._norms
+            codes, scales = self._codes, self._scales
+            corpus = ids, self._mana_values, self._color_masks
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if len(ids) == 0:
+            return []
+        if query.shape[0] != matrix.shape[1]:
+            raise ValueError(
+                f"Query has {query.shape[0]} dimensions, expected {matrix.shape[1]}"
+            )
+
+        mask = self.mask(conditions, corpus)
+        candidates = None
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            limit = min(limit, len(candidates))
+        limit = min(limit, len(ids))
+        if limit <= 0:
+            return []
+
+        if self.quantization is None:
+            distances = self._distances(query, matrix, norms, candidates)
+        else:
+            # Coarse top-k on the quantized vectors, then exact re-ranking
+            distances = self._quantized_distances(query, norms, codes, scales, candidates)
+            shortlist = min(limit * self.rerank_factor, len(distances))
+            shortlist = np.sort(np.argpartition(distances, shortlist - 1)[:shortlist])
+            candidates = shortlist if candidates is None else candidates[shortlist]
+            distances = self._distances(query, matrix, norms, candidates)
+
+        top = np.argpartition(distances, limit - 1)[:limit]
+        top = top[np.argsort(distances[top], kind="stable")]
+        rows = top if candidates is None else candidates[top]
+        return [
+            (int(ids[row]), float(np.sqrt(max(distances[i], 0.0))))
+            for row, i in zip(rows, top)
+        ]
+
+    @staticmethod
+    def _distances(query, matrix, norms, rows=None):
+        """Squared L2 distances of the query to the given rows (default all)."""
+        # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+        if rows is None:
+            return norms - 2 * (matrix @ query) + query @ query
+        return norms[rows] - 2 * (matrix[rows] @ query) + query @ query
+
+    @staticmethod
+    def _quantized_distances(query, norms, codes, scales, rows=None):
+        """Approximate squared L2 distances computed on the quantized rows."""
+        count = len(codes) if rows is None else len(rows)
+        dots = np.empty(count, dtype=np.float32)
+        for start in range(0, count, _CHUNK_ROWS):
+            chunk = slice(start, start + _CHUNK_ROWS)
+            selected = chunk if rows is None else rows[chunk]
+            dots[chunk] = codes[selected].astype(np.float32) @ query
+            if scales is not None:
+                dots[chunk] *= scales[selected]
+        selected_norms = norms if rows is None else norms[rows]
+        return selected_norms - 2 * dots + query @ query
@@ -0,0 +1,22 @@
+import pytest
+from utils.dbConnection import reset_pool
+from services.cardCache import get_card_cache
+from services.deckCache import get_deck_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_connection_pool():
+    """Each test starts with an empty pool so mocked connections never leak."""
+    reset_pool()
+    yield
+    reset_pool()
+
+
+@pytest.fixture(autouse=True)
+def empty_card_cache():
+    """Cards cached by a test must not answer the queries of the next one."""
+    get_card_cache().clear()
+    get_deck_cache().clear()
+    yield
+    get_card_cache().clear()
+    get_deck_cache().clear()
@@ -0,0 +1,112 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from business_object.deckBusiness import DeckBusiness
+from services.decklist import DecklistError
+
+
+@pytest.fixture
+def mock_deck_business():
+    mock_deck_dao = MagicMock()
+    mock_user_dao = MagicMock()
+    mock_card_dao = MagicMock()
+    deck_business = DeckBusiness(mock_deck_dao, mock_user_dao, mock_card_dao)
+    return deck_business, mock_deck_dao, mock_user_dao, mock_card_dao
+
+
+def test_add_card_to_deck_single_dao_call(mock_deck_business):
+    deck_business, deck_dao, user_dao, card_dao = mock_deck_business
+
+    result = deck_business.add_card_to_deck(1, 42, 3)
+
+    deck_dao.add_card_to_deck.assert_called_once_with(42, 3, user_id=1)
+    user_dao.exist.assert_not_called()
+    card_dao.exist.assert_not_called()
+    deck_dao.exist.assert_not_called()
+    deck_dao.get_all_decks_from_user.assert_not_called()
+    assert result["deck_id"] == 3 and result["card_id"] == 42
+
+
+def test_add_card_to_deck_not_owned(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    deck_dao.add_card_to_deck.side_effect = ValueError("This deck does not belong to the user")
+
+    with pytest.raises(ValueError, match="belong"):
+        deck_business.add_card_to_deck(1, 42, 3)
+
+
+def test_remove_card_not_in_deck(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    deck_dao.remove_card_from_deck.return_value = None
+
+    with pytest.raises(ValueError, match="not found"):
+        deck_business.remove_card_from_deck(1, 42, 3)
+    deck_dao.remove_card_from_deck.assert_called_once_with(42, 3, user_id=1)
+
+
+def test_delete_and_read_deck(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    deck_dao.get_by_id.return_value = [{"id": 42, "quantity": 4}]
+
+    assert deck_business.delete_deck(1, 3)["deck_id"] == 3
+    deck_dao.delete.assert_called_once_with(3, user_id=1)
+    assert deck_business.get_deck_details(1, 3) == [{"id": 42, "quantity": 4}]
+    deck_dao.get_by_id.assert_called_once_with(3, user_id=1)
+
+
+def test_import_decklist_resolves_names_in_bulk(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    names = MagicMock()
+    names.loaded = True
+    names.lookup.return_value = {"Lightning Bolt": 42, "Goblin Guide": 7, "Bolt of Typo": None}
+    deck_business.names = names
+    deck_dao.apply_card_changes.return_value = [{"id": 42, "quantity": 4}]
+
+    result = deck_business.import_decklist(
+        1, 3, "Deck\n3 Lightning Bolt\n4 Goblin Guide\n1 Lightning Bolt\n"
+              "1 Bolt of Typo\n\nSideboard\n2 Duress\n"
+    )
+
+    names.lookup.assert_called_once_with(
+        {"Lightning Bolt": 4, "Goblin Guide": 4, "Bolt of Typo": 1}
+    )
+    deck_dao.apply_card_changes.assert_called_once_with(
+        3,
+        [{"card_id": 42, "quantity_delta": 4}, {"card_id": 7, "quantity_delta": 4}],
+        user_id=1,
+    )
+    assert result["imported"] == 8
+    assert result["skipped"] == 2
+    assert result["unresolved"] == ["Bolt of Typo"]
+
+
+def test_import_empty_decklist(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+
+    with pytest.raises(DecklistError, match="no card"):
+        deck_business.import_decklist(1, 3, "Sideboard\n2 Duress\n")
+    deck_dao.apply_card_changes.assert_not_called()
+
+
+def test_export_decklist(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    deck_dao.get_by_id.return_value = [{"id": 42, "name": "Lightning Bolt", "quantity": 4}]
+
+    assert deck_business.export_decklist(1, 3, "mtga") == "Deck\n4 Lightning Bolt\n"
+    deck_dao.get_by_id.assert_called_once_with(3, user_id=1)
+    with pytest.raises(ValueError):
+        deck_business.export_decklist(1, 3, "csv")
+
+
+def test_get_deck_profile(mock_deck_business):
+    deck_business, deck_dao, _, _ = mock_deck_business
+    deck_dao.get_centroid.return_value = {
+        "centroid": np.array([0.5, 0.5], dtype=np.float32),
+        "card_ids": [42],
+        "color_identity": ["R"],
+    }
+
+    assert deck_business.get_deck_profile(1, 3) == {
+        "centroid": [0.5, 0.5], "card_ids": [42], "color_identity": ["R"]
+    }
+    deck_dao.get_centroid.assert_called_once_with(3, user_id=1)
@@ -0,0 +1,43 @@
+import threading
+from unittest.mock import MagicMock, patch
+from dao.deckDao import DeckDao
+
+
+def test_concurrent_requests_keep_their_own_cursor():
+    pool = MagicMock(name="pool")
+    pool.getconn.side_effect = lambda: MagicMock(name="conn")
+    dao = DeckDao()
+    inside = threading.Barrier(2)
+    seen = {}
+
+    def request(name):
+        with dao:
+            mine = dao.cursor
+            inside.wait(5)  # both threads hold a connection now
+            seen[name] = dao.cursor is mine and dao.conn.cursor.return_value is mine
+            inside.wait(5)
+
+    with patch("dao.abstractDao.get_pool", return_value=pool):
+        threads = [threading.Thread(target=request, args=(name,)) for name in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    assert seen == {"a": True, "b": True}
+    assert pool.putconn.call_count == 2
+
+
+def test_connection_is_forgotten_once_returned():
+    pool = MagicMock(name="pool")
+    pool.getconn.side_effect = lambda: MagicMock(name="conn")
+    dao = DeckDao()
+
+    with patch("dao.abstractDao.get_pool", return_value=pool):
+        with dao:
+            outer = dao.conn
+            with dao:
+                assert dao.conn is not outer
+            assert dao.conn is outer
+        assert dao.conn is None
+        assert dao.cursor is None
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+import psycopg
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from dao.asyncCardDao import AsyncCardDao
+
+
+@pytest.fixture
+def mock_async_card_dao(monkeypatch):
+    cursor = MagicMock(name="cursor")
+    cursor.execute = AsyncMock()
+    cursor.fetchone = AsyncMock(return_value={"id": 420, "name": "Example Card"})
+    cursor.fetchall = AsyncMock(return_value=[{"id": 420, "name": "Example Card"}])
+
+    @asynccontextmanager
+    async def fake_cursor(self):
+        yield cursor
+
+    monkeypatch.setattr(AsyncCardDao, "cursor", fake_cursor)
+    return AsyncCardDao(), cursor
+
+
+def test_get_by_id_runs_a_single_query(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    card = asyncio.run(dao.get_by_id(420))
+    assert card["id"] == 420
+    cursor.execute.assert_awaited_once()
+    sql, params = cursor.execute.call_args[0]
+    assert "WHERE ID = %S" in sql.upper()
+    assert params == (420,)
+
+
+def test_get_by_id_invalid_id(mock_async_card_dao):
+    dao, _ = mock_async_card_dao
+    with pytest.raises(TypeError):
+        asyncio.run(dao.get_by_id("420"))
+    with pytest.raises(ValueError):
+        asyncio.run(dao.get_by_id(-1))
+
+
+def test_get_by_id_served_from_cache(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    asyncio.run(dao.get_by_id(420))
+    assert asyncio.run(dao.get_by_id(420))["name"] == "Example Card"
+    cursor.execute.assert_awaited_once()
+    dao.cache.invalidate(420)
+    asyncio.run(dao.get_by_id(420))
+    assert cursor.execute.await_count == 2
+
+
+def test_filter_uses_card_dao_query(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    results = asyncio.run(dao.filter("id", colors=["U"], mana_value__lte=3))
+    assert results == cursor.fetchall.return_value
+    sql, params = cursor.execute.call_args[0]
+    assert "colors && %s" in sql
+    assert "mana_value <= %s" in sql
+    assert params == [["U"], 3, 10, 0]
+
+
+def test_filter_invalid_column(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    with pytest.raises(ValueError):
+        asyncio.run(dao.filter("not_a_column"))
+    cursor.execute.assert_not_awaited()
+
+
+def test_search_by_name_pattern(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    asyncio.run(dao.search_by_name("bolt", limit=5, offset=10))
+    _, params = cursor.execute.call_args[0]
+    assert params == ("%bolt%", "%bolt%", 5, 10)
+
+
+def test_operational_error_becomes_connection_error(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    cursor.execute.side_effect = psycopg.OperationalError("down")
+    with pytest.raises(ConnectionError):
+        asyncio.run(dao.get_random_card())
+
+
+def test_get_similar_reads_the_neighbor_table(mock_async_card_dao):
+    dao, cursor = mock_async_card_dao
+    cursor.fetchall = AsyncMock(return_value=[{"id": 7, "distance": 0.2}])
+
+    assert asyncio.run(dao.get_similar(420, limit=5)) == [{"id": 7, "distance": 0.2}]
+    sql, params = cursor.execute.call_args[0]
+    assert "FROM card_neighbors" in sql
+    assert "ORDER BY n.rank" in sql
+    assert params == [5, 5, 420]
+
+    cursor.fetchall = AsyncMock(return_value=[])
+    assert asyncio.run(dao.get_similar(420)) is None
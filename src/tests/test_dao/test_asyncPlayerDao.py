@@ -0,0 +1,195 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from dao.asyncPlayerDao import AsyncPlayerDao
+
+
+@pytest.fixture
+def mock_async_player_db(monkeypatch):
+    cursor = MagicMock(name="cursor")
+    cursor.execute = AsyncMock()
+    cursor.fetchall = AsyncMock(return_value=[{"id": 1, "distance": 0.1}])
+    cursor.fetchone = AsyncMock(return_value={"embedding": [0.1, 0.2]})
+
+    @asynccontextmanager
+    async def fake_cursor(self):
+        yield cursor
+
+    monkeypatch.setattr(AsyncPlayerDao, "cursor", fake_cursor)
+    return cursor
+
+
+def test_natural_language_search_embeds_text(mock_async_player_db):
+    embedding_service = MagicMock()
+    embedding_service.vectorize.return_value = [0.5, 0.5]
+    dao = AsyncPlayerDao(embedding_service=embedding_service)
+    mock_async_player_db.fetchone.return_value = {"matched": 40, "total": 30000}
+
+    results = asyncio.run(
+        dao.natural_language_search("flying", filters={"colors": ["U"]}, limit=3)
+    )
+
+    assert results == [{"id": 1, "distance": 0.1}]
+    embedding_service.vectorize.assert_called_once_with("flying")
+    count_sql, count_params = mock_async_player_db.execute.call_args_list[0][0]
+    assert "count(*)" in count_sql
+    assert count_params == [["U"], dao.planner.exact_threshold + 1]
+    # Few cards match: exact scan of the filtered subset
+    sql, params = mock_async_player_db.execute.call_args[0]
+    assert "colors && %s" in sql
+    assert params == [["U"], [0.5, 0.5], 3]
+
+
+def test_natural_language_search_with_vector(mock_async_player_db):
+    embedding_service = MagicMock()
+    dao = AsyncPlayerDao(embedding_service=embedding_service)
+    asyncio.run(dao.natural_language_search([1, 0], limit=1))
+    embedding_service.vectorize.assert_not_called()
+    _, params = mock_async_player_db.execute.call_args[0]
+    assert params == [[1.0, 0.0], 1]
+
+
+def test_natural_language_search_invalid_arguments():
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+    with pytest.raises(ValueError):
+        asyncio.run(dao.natural_language_search("q", limit=0))
+    with pytest.raises(ValueError):
+        asyncio.run(dao.natural_language_search(12345))
+
+
+def test_get_card_embedding(mock_async_player_db):
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+    assert asyncio.run(dao.get_card_embedding(7)) == [0.1, 0.2]
+
+
+def test_natural_language_search_applies_ef_search(mock_async_player_db):
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+    asyncio.run(dao.natural_language_search([1, 0], limit=1, ef_search=80))
+    first_sql, first_params = mock_async_player_db.execute.call_args_list[0][0]
+    assert "hnsw.ef_search" in first_sql
+    assert first_params == ("80",)
+
+
+def test_natural_language_search_memory_backend(mock_async_player_db):
+    engine = MagicMock()
+    engine.search.return_value = [(1, 0.25)]
+    dao = AsyncPlayerDao(embedding_service=MagicMock(), backend="memory", engine=engine)
+
+    results = asyncio.run(dao.natural_language_search([1, 0], limit=1))
+
+    assert results == [{"id": 1, "distance": 0.25}]
+    sql, params = mock_async_player_db.execute.call_args[0]
+    assert "id = ANY(%s)" in sql
+    assert params == ([1],)
+
+
+def test_hybrid_search_drops_a_leg_that_times_out():
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+
+    async def slow_vector(*args, **kwargs):
+        await asyncio.sleep(1)
+        return [{"id": 1, "distance": 0.1}]
+
+    async def lexical(*args, **kwargs):
+        return [{"id": 2, "lexical_score": 0.9}]
+
+    dao.natural_language_search = slow_vector
+    dao.lexical_search = lexical
+
+    results = asyncio.run(dao.hybrid_search("Lightning Bolt", limit=5, timeout=50))
+
+    assert [row["id"] for row in results] == [2]
+    assert results[0]["distance"] is None
+
+
+def test_hybrid_search_times_out_when_every_leg_does():
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    dao.natural_language_search = slow
+    dao.lexical_search = slow
+    with pytest.raises(TimeoutError):
+        asyncio.run(dao.hybrid_search("trample", timeout=20))
+
+
+def _fake_connection(monkeypatch, fetchall):
+    """Patch `AsyncPlayerDao.connection` with a connection whose cursors return `fetchall`."""
+    conn = MagicMock(name="conn")
+    conn.commit = AsyncMock()
+    conn.execute = AsyncMock()
+    cursors = []
+
+    def make_cursor(**kwargs):
+        cursor = MagicMock(name="cursor")
+        cursor.__aenter__.return_value = cursor
+        cursor.execute = AsyncMock()
+        cursor.fetchall = AsyncMock(side_effect=fetchall)
+        cursor.close = AsyncMock()
+        cursors.append(cursor)
+        return cursor
+
+    conn.cursor.side_effect = make_cursor
+
+    @asynccontextmanager
+    async def fake_connection(self):
+        yield conn
+
+    monkeypatch.setattr(AsyncPlayerDao, "connection", fake_connection)
+    return conn, cursors
+
+
+def test_batch_search_embeds_once_and_pipelines(monkeypatch):
+    conn, cursors = _fake_connection(
+        monkeypatch, lambda: [{"id": 1, "distance": 0.1}]
+    )
+    embedding_service = MagicMock()
+    embedding_service.vectorize_many.return_value = [[0.5, 0.5], [0.2, 0.8]]
+    dao = AsyncPlayerDao(embedding_service=embedding_service)
+
+    results = asyncio.run(dao.batch_search([
+        {"query": "flying", "limit": 1},
+        {"query": [1, 0], "limit": 1, "ef_search": 80},
+        {"query": "trample", "limit": 1},
+    ]))
+
+    assert results == [[{"id": 1, "distance": 0.1}]] * 3
+    embedding_service.vectorize_many.assert_called_once_with(["flying", "trample"])
+    conn.pipeline.assert_called_once()
+    assert conn.transaction.call_count == 3
+    # The knob of the second search is set inside its own transaction
+    conn.execute.assert_awaited_once()
+    assert "hnsw.ef_search" in conn.execute.call_args[0][0]
+    searches = [cursor for cursor in cursors if cursor.close.await_count]
+    assert [cursor.execute.call_args[0][1][0] for cursor in searches] == [
+        [0.5, 0.5], [1.0, 0.0], [0.2, 0.8]
+    ]
+
+
+def test_batch_search_memory_backend_hydrates_once(mock_async_player_db):
+    engine = MagicMock()
+    engine.search.side_effect = [[(1, 0.25)], [(2, 0.5), (1, 0.75)]]
+    mock_async_player_db.fetchall.return_value = [{"id": 1}, {"id": 2}]
+    dao = AsyncPlayerDao(embedding_service=MagicMock(), backend="memory", engine=engine)
+
+    results = asyncio.run(dao.batch_search([
+        {"query": [1, 0], "limit": 1},
+        {"query": [0, 1], "limit": 2},
+    ]))
+
+    assert results == [
+        [{"id": 1, "distance": 0.25}],
+        [{"id": 2, "distance": 0.5}, {"id": 1, "distance": 0.75}],
+    ]
+    mock_async_player_db.execute.assert_awaited_once()
+
+
+def test_batch_search_invalid_arguments():
+    dao = AsyncPlayerDao(embedding_service=MagicMock())
+    assert asyncio.run(dao.batch_search([])) == []
+    with pytest.raises(ValueError):
+        asyncio.run(dao.batch_search([{"query": "q", "limit": 0}]))
+    with pytest.raises(ValueError):
+        asyncio.run(dao.batch_search([{"query": 12345}]))
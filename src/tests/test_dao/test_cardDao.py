@@ -9,7 +9,7 @@ pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
 @pytest.fixture
 def mock_card_dao():
     """Provides a CardDao instance with mocked database interactions."""
-    with patch("dao.cardDao.psycopg2.connect") as mock_connect:
+    with patch("utils.dbConnection.psycopg2.connect") as mock_connect:
         base_card = {
             "id": 420,
             "card_key": "example_key",
@@ -61,6 +61,7 @@ def mock_card_dao():
         mock_cursor = MagicMock()
         mock_connect.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.connection = mock_conn
 
         # Context manager support
         mock_cursor.__enter__.return_value = mock_cursor
@@ -260,7 +261,7 @@ def test_edit_text_to_embed_valid(mock_card_dao):
     query_str = str(query) if hasattr(query, "as_string") else query
     assert "UPDATE cards SET text_to_embed" in query_str or "text_to_embed" in query_str
     assert params == ("New embedded text", 420)
-    dao.conn.commit.assert_called()
+    cursor.connection.commit.assert_called()
 
 
 def test_edit_text_to_embed_invalid_type(mock_card_dao):
@@ -323,7 +324,7 @@ def test_edit_vector_valid(mock_card_dao):
     query_str = str(query) if hasattr(query, "as_string") else query
     assert "UPDATE cards SET embedding" in query_str or "embedding" in query_str
     assert params == (vector, 420)
-    dao.conn.commit.assert_called()
+    cursor.connection.commit.assert_called()
 
 
 def test_edit_vector_invalid_type(mock_card_dao):
@@ -465,8 +466,8 @@ def test_get_random_card_success(mock_card_dao):
     cursor.execute.assert_called()
     query = cursor.execute.call_args[0][0]
     assert "SELECT" in query.upper()
-    assert "ORDER BY RANDOM()" in query
-    assert "LIMIT 1" in query
+    assert "WHERE id = ANY(%s)" in query
+    assert "RANDOM()" not in query
 
 
 def test_get_random_card_empty_database(mock_card_dao):
@@ -571,7 +572,7 @@ def test_edit_text_to_embed_with_context_manager(mock_card_dao):
             result = dao.edit_text_to_embed("Context test", 420)
 
             assert result == 1
-            dao.conn.commit.assert_called()
+            cursor.connection.commit.assert_called()
 
 
 def test_edit_vector_with_mixed_numeric_types(mock_card_dao):
@@ -642,7 +643,7 @@ def test_get_random_card_returns_specific_columns(mock_card_dao):
     query = cursor.execute.call_args[0][0]
     # Should select specific columns
     assert "SELECT id, name" in query
-    assert "ORDER BY RANDOM()" in query
+    assert "RANDOM()" not in query
 
 
 def test_filter_with_multiple_conditions(mock_card_dao):
@@ -723,3 +724,204 @@ def test_edit_vector_updates_correct_card(mock_card_dao):
     params = cursor.execute.call_args[0][1]
     assert params[0] == vector
     assert params[1] == 420
+
+
+def test_iter_embedding_sources_streams_rows(mock_card_dao):
+    """Test that iter_embedding_sources streams rows from a named cursor"""
+    dao, cursor, fake_db = mock_card_dao
+    cursor.__iter__.return_value = iter([{"id": 420, "name": "Example Card"}])
+
+    rows = list(
+        dao.iter_embedding_sources(start_after=100, end_at=500, only_missing=True)
+    )
+
+    assert rows == [{"id": 420, "name": "Example Card"}]
+    assert cursor.connection.cursor.call_args.kwargs["name"] == "embedding_sources"
+    query, params = cursor.execute.call_args[0]
+    assert "id <= %s" in query
+    assert "embedding IS NULL" in query
+    assert query.endswith("ORDER BY id")
+    assert params == [100, 500]
+
+
+def test_bulk_update_embeddings_single_statement(mock_card_dao):
+    """Test that bulk_update_embeddings writes a batch in one statement"""
+    dao, cursor, fake_db = mock_card_dao
+    cursor.rowcount = 2
+
+    with patch("dao.cardDao.register_vector"), patch(
+        "dao.cardDao.execute_values"
+    ) as mock_execute_values:
+        updated = dao.bulk_update_embeddings(
+            [(420, "text a", [0.1, 0.2]), (421, "text b", [0.3, 0.4])]
+        )
+
+    assert updated == 2
+    mock_execute_values.assert_called_once()
+    values = mock_execute_values.call_args[0][2]
+    assert [(card_id, text) for card_id, text, _ in values] == [
+        (420, "text a"),
+        (421, "text b"),
+    ]
+    assert mock_execute_values.call_args.kwargs["template"] == "(%s, %s, %s::vector)"
+    cursor.connection.commit.assert_called_once()
+
+
+def test_bulk_update_embeddings_empty(mock_card_dao):
+    """Test that an empty batch does not touch the database"""
+    dao, cursor, fake_db = mock_card_dao
+
+    assert dao.bulk_update_embeddings([]) == 0
+    cursor.execute.assert_not_called()
+
+
+def test_get_by_id_is_cached_until_update(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    assert dao.get_by_id(420)["name"] == "Example Card"
+    assert cursor.execute.call_count == 1
+    assert dao.get_by_id(420)["name"] == "Example Card"
+    assert cursor.execute.call_count == 1
+    dao.update(420, name="Renamed Card")
+    assert dao.get_by_id(420)["name"] == "Renamed Card"
+    assert dao.cache.stats()["hits"] == 1
+
+
+def test_delete_invalidates_cached_card(mock_card_dao):
+    dao, _, _ = mock_card_dao
+    dao.get_by_id(420)
+    dao.delete(420)
+    assert dao.get_by_id(420) is None
+
+
+def test_filter_summary_profile_skips_heavy_columns(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    dao.filter(order_by="id", profile="summary", type="Creature")
+    query = cursor.execute.call_args[0][0]
+    assert query.startswith("SELECT id, name, ascii_name, type")
+    for column in ("raw", "embedding", "text_to_embed", "*"):
+        assert column not in query.split("FROM")[0]
+    with pytest.raises(ValueError):
+        dao.filter(order_by="id", profile="slim")
+
+
+def test_get_by_id_projects_cached_card(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    assert "raw" in dao.get_by_id(420)
+    detail = dao.get_by_id(420, profile="detail")
+    assert cursor.execute.call_count == 1
+    assert "text" in detail and "raw" not in detail and "embedding" not in detail
+    assert set(dao.get_by_id(420, profile="summary")) == set(dao.SUMMARY_COLUMNS)
+
+
+def test_filter_after_token_seeks_past_last_row(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    token = CardDao.next_page_token(
+        [{"id": 7, "mana_value": 2}], "mana_value", True, limit=1
+    )
+    dao.filter(order_by="mana_value", limit=1, after=token, type="Creature")
+    query, params = cursor.execute.call_args[0]
+    assert "((mana_value, id) > (%s, %s) OR mana_value IS NULL)" in query
+    assert "ORDER BY mana_value ASC, id ASC" in query
+    assert params == ["Creature", 2, 7, 1, 0]
+
+
+def test_filter_after_null_value_descending(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    token = CardDao.next_page_token(
+        [{"id": 9, "edhrec_rank": None}], "edhrec_rank", False, limit=1
+    )
+    dao.filter(order_by="edhrec_rank", asc=False, limit=1, after=token)
+    query, params = cursor.execute.call_args[0]
+    assert "(edhrec_rank IS NOT NULL OR id < %s)" in query
+    assert params == [9, 1, 0]
+    with pytest.raises(ValueError):
+        dao.filter(order_by="edhrec_rank", asc=True, after=token)
+
+
+def test_search_by_name_page_returns_next_token(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    cursor.fetchall.side_effect = None
+    cursor.fetchall.return_value = [{"id": 3, "name": "Bolt"}, {"id": 5, "name": "Opt"}]
+    rows, token = dao.search_by_name_page("o", limit=2)
+    assert token is not None
+    dao.search_by_name("o", limit=2, after=token)
+    query, params = cursor.execute.call_args[0]
+    assert "(name, id) > (%s, %s)" in query
+    assert params == ("%o%", "%o%", "Opt", 5, 2, 0)
+    cursor.fetchall.return_value = [{"id": 8, "name": "Ponder"}]
+    assert dao.search_by_name_page("o", limit=2, after=token)[1] is None
+
+
+def test_search_by_name_prefix_mode(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    cursor.fetchall.side_effect = None
+    cursor.fetchall.return_value = []
+    dao.search_by_name("Lightn", mode="prefix")
+    query, params = cursor.execute.call_args[0]
+    assert "lower(name) LIKE %s OR lower(ascii_name) LIKE %s" in query
+    assert params == ("lightn%", "lightn%", 20, 0)
+
+
+def test_search_by_name_similar_mode_ranks_by_similarity(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    cursor.fetchall.side_effect = None
+    cursor.fetchall.return_value = [{"id": 1, "name": "Lightning Bolt"}]
+    rows, token = dao.search_by_name_page("lightnig bolt", limit=1, mode="similar")
+    assert token is None
+    query, params = cursor.execute.call_args[0]
+    assert "%s <%% name OR %s <%% ascii_name" in query
+    assert "ORDER BY GREATEST(word_similarity(%s, name)" in query
+    assert params == ("lightnig bolt",) * 4 + (1, 0)
+    with pytest.raises(ValueError):
+        dao.search_by_name("bolt", mode="similar", after="token")
+    with pytest.raises(ValueError):
+        dao.search_by_name("bolt", mode="fuzzy")
+
+
+def test_search_by_name_escapes_like_wildcards(mock_card_dao):
+    dao, cursor, _ = mock_card_dao
+    cursor.fetchall.side_effect = None
+    cursor.fetchall.return_value = []
+    dao.search_by_name("100%_")
+    assert cursor.execute.call_args[0][1][0] == "%100\\%\\_%"
+
+
+def test_get_random_cards_reuses_candidate_ids(mock_card_dao):
+    dao, cursor, fake_db = mock_card_dao
+    for card_id in (421, 422):
+        fake_db[card_id] = {**copy.deepcopy(fake_db[420]), "id": card_id}
+
+    cards = dao.get_random_cards(2, colors=["G"], types=["Creature"])
+    assert len(cards) == 2
+    assert len({card["id"] for card in cards}) == 2
+    candidates_query, params = cursor.execute.call_args_list[0][0]
+    assert "colors && %s AND types && %s" in candidates_query
+    assert params == [["G"], ["Creature"]]
+
+    calls = cursor.execute.call_count
+    dao.get_random_cards(1, colors=["G"], types=["Creature"])
+    assert cursor.execute.call_count == calls + 1  # only the card lookup
+    with pytest.raises(ValueError):
+        dao.get_random_cards(0)
+
+
+def test_filter_query_resolves_filters_with_the_filter_index():
+    from services.filterIndex import FilterIndex
+
+    index = FilterIndex(max_age=0)
+    index.load_rows([
+        (1, ["U"], ["U"], [], ["Creature"], [], [], 2.0, "Creature"),
+        (2, ["R"], ["R"], [], ["Instant"], [], [], 1.0, "Instant"),
+        (3, ["U"], ["U"], [], ["Instant"], [], [], 1.0, "Instant"),
+    ])
+
+    query, params = CardDao._filter_query(
+        "name", True, 10, 0, "summary", None, index, colors=["U"], types=["Instant"]
+    )
+    assert "WHERE id = ANY(%s) ORDER BY name ASC, id ASC" in query
+    assert params == [[3], 10, 0]
+
+    query, params = CardDao._filter_query(
+        "id", True, 10, 0, "summary", None, index, colors=["B"]
+    )
+    assert "WHERE FALSE" in query
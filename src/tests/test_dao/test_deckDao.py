@@ -0,0 +1,240 @@
+import pytest
+import numpy as np
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+from dao.deckDao import DeckDao
+from services.deckCache import DeckCache
+
+
+def access(**flags):
+    row = {"user_exists": True, "card_exists": True, "deck_exists": True, "owned": True}
+    row.update(flags)
+    return row
+
+
+@pytest.fixture
+def mock_deck_db():
+    with patch("dao.deckDao.psycopg2.connect") as mock_connect:
+        mock_conn = MagicMock(name="conn")
+        mock_cursor = MagicMock(name="cursor")
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        yield mock_connect, mock_conn, mock_cursor
+
+
+def test_add_card_checks_and_upserts_in_one_statement(mock_deck_db):
+    mock_connect, mock_conn, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.return_value = {
+        **access(), "deck_id": 3, "card_id": 42, "quantity": 2
+    }
+
+    result = DeckDao().add_card_to_deck(42, 3, user_id=1)
+
+    assert result == {"deck_id": 3, "card_id": 42, "quantity": 2}
+    mock_cursor.execute.assert_called_once()
+    sql, params = mock_cursor.execute.call_args[0]
+    assert "INSERT INTO deck_cards" in sql and "user_deck_link" in sql
+    assert params == {"deck_id": 3, "user_id": 1, "card_id": 42}
+    mock_conn.commit.assert_called_once()
+    assert mock_connect.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "flags, message",
+    [
+        ({"user_exists": False, "owned": False}, "user_id"),
+        ({"card_exists": False}, "card_id"),
+        ({"deck_exists": False, "owned": False}, "deck_id"),
+        ({"owned": False}, "belong"),
+    ],
+)
+def test_add_card_access_errors(mock_deck_db, flags, message):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.return_value = {
+        **access(**flags), "deck_id": None, "card_id": None, "quantity": None
+    }
+
+    with pytest.raises(ValueError, match=message):
+        DeckDao().add_card_to_deck(42, 3, user_id=1)
+
+
+def test_add_card_invalid_ids():
+    with pytest.raises(TypeError):
+        DeckDao().add_card_to_deck("42", 3)
+    with pytest.raises(ValueError):
+        DeckDao().add_card_to_deck(42, 3, user_id=0)
+
+
+def test_remove_card_not_in_deck(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.return_value = {
+        **access(), "deck_id": None, "card_id": None, "quantity": None
+    }
+
+    assert DeckDao().remove_card_from_deck(42, 3, user_id=1) is None
+    assert "DELETE FROM deck_cards" in mock_cursor.execute.call_args[0][0]
+
+
+def test_get_by_id_strips_access_flags(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchall.return_value = [
+        {**access(), "id": 42, "name": "Bolt", "image_url": None, "quantity": 4,
+         "deck_name": "Burn", "deck_type": "Modern"},
+    ]
+
+    assert DeckDao().get_by_id(3, user_id=1) == [
+        {"id": 42, "name": "Bolt", "image_url": None, "quantity": 4,
+         "deck_name": "Burn", "deck_type": "Modern"},
+    ]
+    mock_cursor.execute.assert_called_once()
+
+    mock_cursor.fetchall.return_value = [{**access(), "id": None}]
+    assert DeckDao().get_by_id(3, user_id=1) == []
+
+    mock_cursor.fetchall.return_value = [{**access(owned=False), "id": None}]
+    with pytest.raises(ValueError, match="belong"):
+        DeckDao().get_by_id(3, user_id=1)
+
+
+def test_delete_not_owned_deletes_nothing(mock_deck_db):
+    _, mock_conn, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.return_value = access(owned=False)
+
+    with pytest.raises(ValueError, match="belong"):
+        DeckDao().delete(3, user_id=1)
+
+    mock_cursor.execute.assert_called_once()
+    mock_conn.commit.assert_not_called()
+
+
+def test_apply_card_changes_batches_upserts(mock_deck_db):
+    _, mock_conn, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.side_effect = [access(), {"missing": None}]
+    mock_cursor.fetchall.return_value = [{"id": 42, "quantity": 4}]
+
+    with patch("dao.deckDao.execute_values") as mock_execute_values:
+        result = DeckDao().apply_card_changes(
+            3,
+            [
+                {"card_id": 42, "quantity_delta": 3},
+                {"card_id": 7, "quantity_delta": -1},
+                {"card_id": 42, "quantity_delta": 1},
+                {"card_id": 9, "quantity_delta": 0},
+            ],
+            user_id=1,
+        )
+
+    assert result == [{"id": 42, "quantity": 4}]
+    mock_execute_values.assert_called_once()
+    assert mock_execute_values.call_args[0][2] == [(3, 42, 4), (3, 7, -1)]
+    mock_conn.commit.assert_called_once()
+
+
+def test_apply_card_changes_missing_card_rolls_back(mock_deck_db):
+    _, mock_conn, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.side_effect = [access(), {"missing": [7]}]
+
+    with patch("dao.deckDao.execute_values") as mock_execute_values:
+        with pytest.raises(ValueError, match=r"\[7\]"):
+            DeckDao().apply_card_changes(
+                3, [{"card_id": 7, "quantity_delta": 1}], user_id=1
+            )
+
+    mock_execute_values.assert_not_called()
+    mock_conn.rollback.assert_called_once()
+    mock_conn.commit.assert_not_called()
+
+
+def statistics_row(**flags):
+    return {
+        **access(**flags),
+        "owners": [1],
+        "card_count": 60,
+        "distinct_cards": 15,
+        "land_count": 20,
+        "average_mana_value": Decimal("1.85"),
+        "mana_curve": {"1": 24, "2": 12, "3": 4},
+        "colors": {"R": 40},
+        "color_identity": {"R": 40, "C": 20},
+        "types": {"Instant": 16, "Creature": 24, "Land": 20},
+        "subtypes": {"Goblin": 8},
+    }
+
+
+def test_get_statistics_is_one_query_then_cached(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchone.return_value = statistics_row()
+    dao = DeckDao(cache=DeckCache(ttl=0))
+
+    statistics = dao.get_statistics(3, user_id=1)
+
+    assert statistics["card_count"] == 60
+    assert statistics["average_mana_value"] == 1.85
+    assert statistics["mana_curve"] == {"1": 24, "2": 12, "3": 4}
+    assert "owners" not in statistics and "owned" not in statistics
+    sql = mock_cursor.execute.call_args[0][0]
+    assert "jsonb_object_agg" in sql and "user_deck_link" in sql
+
+    assert dao.get_statistics(3, user_id=1) == statistics
+    mock_cursor.execute.assert_called_once()
+
+    # Another user goes to the database, which refuses
+    mock_cursor.fetchone.return_value = statistics_row(owned=False)
+    with pytest.raises(ValueError, match="belong"):
+        dao.get_statistics(3, user_id=2)
+
+
+def test_editing_a_deck_invalidates_its_statistics(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    dao = DeckDao(cache=DeckCache(ttl=0))
+    mock_cursor.fetchone.return_value = statistics_row()
+    dao.get_statistics(3, user_id=1)
+
+    mock_cursor.fetchone.return_value = {
+        **access(), "deck_id": 3, "card_id": 42, "quantity": 2
+    }
+    dao.add_card_to_deck(42, 3, user_id=1)
+
+    mock_cursor.fetchone.return_value = {**statistics_row(), "card_count": 61}
+    assert dao.get_statistics(3, user_id=1)["card_count"] == 61
+    assert mock_cursor.execute.call_count == 3
+
+
+def centroid_rows():
+    row = {**access(), "owners": [1]}
+    return [
+        {**row, "card_id": 42, "quantity": 3, "color_identity": ["R"], "embedding": [1.0, 0.0]},
+        {**row, "card_id": 7, "quantity": 1, "color_identity": ["G"], "embedding": [0.0, 1.0]},
+        {**row, "card_id": 9, "quantity": 2, "color_identity": None, "embedding": None},
+    ]
+
+
+def test_get_centroid_weights_by_quantity_and_is_cached(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchall.return_value = centroid_rows()
+    dao = DeckDao(cache=DeckCache(ttl=0))
+
+    profile = dao.get_centroid(3, user_id=1)
+
+    np.testing.assert_allclose(profile["centroid"], [0.75, 0.25])
+    assert profile["card_ids"] == [42, 7, 9]
+    assert profile["color_identity"] == ["G", "R"]
+    assert dao.get_centroid(3, user_id=1)["card_ids"] == [42, 7, 9]
+    mock_cursor.execute.assert_called_once()
+
+    mock_cursor.fetchone.return_value = {**access(), "deck_id": 3, "card_id": 7, "quantity": 0}
+    dao.remove_card_from_deck(7, 3, user_id=1)
+    mock_cursor.fetchall.return_value = centroid_rows()[:1]
+    np.testing.assert_allclose(dao.get_centroid(3, user_id=1)["centroid"], [1.0, 0.0])
+
+
+def test_get_centroid_of_an_empty_deck(mock_deck_db):
+    _, _, mock_cursor = mock_deck_db
+    mock_cursor.fetchall.return_value = [
+        {**access(), "owners": [1], "card_id": None, "quantity": None,
+         "color_identity": None, "embedding": None}
+    ]
+
+    profile = DeckDao(cache=DeckCache(ttl=0)).get_centroid(3, user_id=1)
+
+    assert profile == {"centroid": None, "card_ids": [], "color_identity": []}
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 import psycopg2
 from dao.playerDao import PlayerDao
+from services.cardCache import get_card_cache
 
 
 @pytest.fixture
@@ -77,6 +78,8 @@ def test_natural_language_search_with_filters_includes_conditions(mock_player_db
 
     dao = PlayerDao(embedding_service=embedding_service)
     filters = {"color_identity": "G", "type": "Creature"}
+    # Counts already known: a selective filter, ranked with an exact scan
+    dao.planner.put(dao.planner.key(filters), 10, 30000, get_card_cache().version)
     dao.natural_language_search("q", filters=filters, limit=5)
 
     mock_cursor.execute.assert_called_once()
@@ -146,3 +149,195 @@ def test_natural_language_search_raises_runtime_error_on_unexpected_db_error(
     dao = PlayerDao(embedding_service=MagicMock())
     with pytest.raises(RuntimeError):
         dao.natural_language_search([0.1], limit=1)
+
+
+def test_natural_language_search_applies_index_knobs(mock_player_db):
+    mock_conn, mock_cursor = mock_player_db
+    dao = PlayerDao(embedding_service=MagicMock())
+
+    dao.natural_language_search([0.1], limit=1, ef_search=100, probes=10)
+
+    calls = [c[0] for c in mock_cursor.execute.call_args_list]
+    assert calls[0] == ("SELECT set_config('hnsw.ef_search', %s, true)", ("100",))
+    assert calls[1] == ("SELECT set_config('ivfflat.probes', %s, true)", ("10",))
+    assert "ORDER BY distance" in calls[2][0]
+
+
+@pytest.mark.parametrize("knobs", [{"ef_search": 0}, {"ef_search": 1001}, {"probes": 0}])
+def test_natural_language_search_invalid_index_knobs(knobs):
+    dao = PlayerDao(embedding_service=MagicMock())
+    with pytest.raises(ValueError):
+        dao.natural_language_search([0.1], limit=1, **knobs)
+
+
+def test_natural_language_search_memory_backend_hydrates_top_k(mock_player_db):
+    mock_conn, mock_cursor = mock_player_db
+    engine = MagicMock()
+    engine.search.return_value = [(2, 0.1), (1, 0.3)]
+    mock_cursor.fetchall.return_value = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+
+    dao = PlayerDao(embedding_service=MagicMock(), backend="memory", engine=engine)
+    results = dao.natural_language_search(
+        [0.1], filters={"mana_value__lte": 3}, limit=2
+    )
+
+    assert results == [
+        {"id": 2, "name": "B", "distance": 0.1},
+        {"id": 1, "name": "A", "distance": 0.3},
+    ]
+    engine.search.assert_called_once_with([0.1], [("mana_value <= %s", [3])], 2)
+    sql, params = mock_cursor.execute.call_args[0]
+    assert "id = ANY(%s)" in sql
+    assert params == ([2, 1],)
+
+
+def test_unknown_search_backend_raises():
+    with pytest.raises(ValueError):
+        PlayerDao(embedding_service=MagicMock(), backend="faiss")
+
+
+def test_search_query_float16_two_stage():
+    sql, params = PlayerDao._search_query(
+        [0.1], {"mana_value__lte": 3}, limit=5, quantization="float16", rerank_factor=4
+    )
+
+    assert "embedding::halfvec(1024) <-> %s::halfvec(1024)" in sql
+    assert "WHERE mana_value <= %s" in sql
+    assert params == [[0.1], 3, [0.1], 20, 5]
+
+
+def test_int8_quantization_needs_memory_backend():
+    with pytest.raises(ValueError):
+        PlayerDao(embedding_service=MagicMock(), backend="pgvector", quantization="int8")
+
+
+def test_lexical_query_matches_name_and_text_with_filters():
+    sql, params = PlayerDao._lexical_query("trample", {"colors": ["G"]}, 4)
+    assert "%s <%% name" in sql
+    assert "websearch_to_tsquery('english', %s)" in sql
+    assert PlayerDao.LEXICAL_DOCUMENT in sql
+    assert "colors && %s" in sql
+    assert "ORDER BY lexical_score DESC, id" in sql
+    assert params == ["trample"] * 4 + [["G"], 4]
+
+
+def test_lexical_search_applies_statement_timeout(mock_player_db):
+    _, mock_cursor = mock_player_db
+    dao = PlayerDao(embedding_service=MagicMock())
+    dao.lexical_search("Lightning Bolt", limit=3, statement_timeout=500)
+    first_sql, first_params = mock_cursor.execute.call_args_list[0][0]
+    assert "statement_timeout" in first_sql
+    assert first_params == ("500",)
+    with pytest.raises(ValueError):
+        dao.lexical_search("   ")
+
+
+def test_hybrid_search_fuses_both_rankings():
+    dao = PlayerDao(embedding_service=MagicMock())
+    dao.natural_language_search = MagicMock(
+        return_value=[{"id": 1, "distance": 0.1}, {"id": 2, "distance": 0.2}]
+    )
+    dao.lexical_search = MagicMock(
+        return_value=[{"id": 2, "lexical_score": 1.0}, {"id": 3, "lexical_score": 0.5}]
+    )
+
+    results = dao.hybrid_search("Lightning Bolt", limit=2, timeout=1000)
+
+    assert [row["id"] for row in results] == [2, 1]
+    assert results[0]["distance"] == 0.2
+    assert results[0]["lexical_score"] == 1.0
+    assert results[1]["lexical_score"] is None
+    # Each leg reads limit * HYBRID_CANDIDATE_FACTOR candidates
+    assert dao.lexical_search.call_args[0][2] == 2 * PlayerDao.HYBRID_CANDIDATE_FACTOR
+
+
+def test_hybrid_search_degrades_when_a_leg_fails():
+    dao = PlayerDao(embedding_service=MagicMock())
+    dao.natural_language_search = MagicMock(side_effect=ConnectionError("down"))
+    dao.lexical_search = MagicMock(return_value=[{"id": 3, "lexical_score": 0.5}])
+
+    results = dao.hybrid_search("trample", limit=5, timeout=1000)
+
+    assert [row["id"] for row in results] == [3]
+    assert results[0]["distance"] is None
+
+    dao.lexical_search = MagicMock(side_effect=RuntimeError("boom"))
+    with pytest.raises(ConnectionError):
+        dao.hybrid_search("trample", limit=5, timeout=1000)
+
+
+def test_hybrid_search_invalid_arguments():
+    dao = PlayerDao(embedding_service=MagicMock())
+    with pytest.raises(ValueError):
+        dao.hybrid_search("q", vector_weight=0, lexical_weight=0)
+    with pytest.raises(ValueError):
+        dao.hybrid_search("q", lexical_weight=-1)
+    with pytest.raises(ValueError):
+        dao.hybrid_search([0.1, 0.2])
+    with pytest.raises(ValueError):
+        dao.hybrid_search("q", timeout=0)
+
+
+def test_search_query_exact_strategy_filters_before_ranking():
+    sql, params = PlayerDao._search_query(
+        [0.1], {"colors": ["U"]}, limit=5, strategy="exact"
+    )
+    assert "AS MATERIALIZED" in sql
+    assert "colors && %s" in sql
+    assert params == [["U"], [0.1], 5]
+
+
+def test_natural_language_search_counts_filters_then_scans_exactly(mock_player_db):
+    _, mock_cursor = mock_player_db
+    mock_cursor.fetchone.return_value = {"matched": 12, "total": 30000}
+    dao = PlayerDao(embedding_service=MagicMock())
+
+    dao.natural_language_search([0.1], filters={"colors": ["U"]}, limit=5)
+    dao.natural_language_search([0.1], filters={"colors": ["U"]}, limit=5)
+
+    statements = [call[0][0] for call in mock_cursor.execute.call_args_list]
+    # The count is read once, then cached
+    assert sum("pg_class" in sql for sql in statements) == 1
+    assert all("AS MATERIALIZED" in sql for sql in statements[1:])
+
+
+def test_natural_language_search_broad_filter_falls_back_to_exact(mock_player_db):
+    _, mock_cursor = mock_player_db
+    mock_cursor.fetchone.return_value = {"matched": 5001, "total": 30000}
+    dao = PlayerDao(embedding_service=MagicMock())
+
+    dao.natural_language_search([0.1], filters={"colors": ["U"]}, limit=5)
+
+    statements = [call[0][0] for call in mock_cursor.execute.call_args_list]
+    # The index query returned 1 row out of 5, so it is rerun exactly
+    assert "AS MATERIALIZED" not in statements[1]
+    assert "AS MATERIALIZED" in statements[2]
+
+
+def test_natural_language_search_counts_with_the_filter_index(mock_player_db):
+    from services.filterIndex import FilterIndex
+
+    _, mock_cursor = mock_player_db
+    index = FilterIndex(max_age=0)
+    index.load_rows([
+        (1, ["U"], ["U"], [], ["Creature"], [], [], 2.0, "Creature"),
+        (2, ["G"], ["G"], [], ["Creature"], [], [], 3.0, "Creature"),
+    ])
+    dao = PlayerDao(embedding_service=MagicMock(), filter_index=index)
+
+    dao.natural_language_search([0.1], filters={"colors": ["U"]}, limit=5)
+
+    # No count query: the index knows one card matches
+    (sql, params), = [call[0] for call in mock_cursor.execute.call_args_list]
+    assert "AS MATERIALIZED" in sql
+    assert "id = ANY(%s)" in sql
+    assert params == [[1], [0.1], 5]
+
+
+def test_filter_conditions_subset_and_exclusion():
+    assert PlayerDao._filter_conditions(
+        {"color_identity__subset": ["G", "R"], "id__not_in": [42, 7]}
+    ) == [
+        ("COALESCE(color_identity, '{}') <@ %s::text[]", [["G", "R"]]),
+        ("NOT (id = ANY(%s))", [[42, 7]]),
+    ]
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from services.cardCache import CardCache
+
+
+def test_get_returns_a_copy():
+    cache = CardCache(max_size=10, ttl=0)
+    cache.put(1, {"id": 1, "name": "Lightning Bolt"})
+    card = cache.get(1)
+    card["name"] = "Shock"
+    assert cache.get(1)["name"] == "Lightning Bolt"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = CardCache(max_size=2, ttl=0)
+    cache.put(1, {"id": 1})
+    cache.put(2, {"id": 2})
+    assert cache.get(1) == {"id": 1}
+    cache.put(3, {"id": 3})
+    assert cache.get(2) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = CardCache(max_size=10, ttl=60)
+    with patch("services.cardCache.time.time", return_value=1000.0):
+        cache.put(1, {"id": 1})
+    with patch("services.cardCache.time.time", return_value=1100.0):
+        assert cache.get(1) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_put_after_invalidation_is_discarded():
+    cache = CardCache(max_size=10, ttl=0)
+    version = cache.version
+    cache.invalidate(1)
+    cache.put(1, {"id": 1, "name": "stale"}, version)
+    assert cache.get(1) is None
+
+
+def test_invalidate_all_and_hit_ratio():
+    cache = CardCache(max_size=10, ttl=0)
+    cache.put(1, {"id": 1})
+    cache.put(2, {"id": 2})
+    assert cache.get(1) is not None
+    cache.invalidate_all()
+    assert cache.get(2) is None
+    stats = cache.stats()
+    assert stats["invalidations"] == 2
+    assert stats["hit_ratio"] == 0.5
+    assert stats["size"] == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = CardCache(max_size=0)
+    cache.put(1, {"id": 1})
+    assert len(cache) == 0
+
+
+def test_invalid_settings_raise():
+    with pytest.raises(ValueError):
+        CardCache(max_size=-1)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from services.cardCache import get_card_cache
+from services.cardSampler import CardSampler
+
+
+def test_sample_is_distinct_and_bounded():
+    sampler = CardSampler(seed=0)
+    ids = np.arange(100, 110)
+    sample = sampler.sample(ids, 5)
+    assert len(set(sample)) == 5
+    assert set(sample) <= set(ids.tolist())
+    assert sorted(sampler.sample(ids, 50)) == ids.tolist()
+    assert sampler.sample(np.array([], dtype=np.int64), 3) == []
+    with pytest.raises(ValueError):
+        sampler.sample(ids, 0)
+
+
+def test_sample_is_uniform():
+    sampler = CardSampler(seed=1)
+    ids = np.arange(4)
+    counts = np.bincount([sampler.sample(ids)[0] for _ in range(4000)], minlength=4)
+    assert counts.min() > 850
+
+
+def test_key_ignores_order():
+    assert CardSampler.key(["U", "B"], None) == CardSampler.key(["B", "U"], [])
+
+
+def test_card_writes_and_age_drop_cached_ids():
+    sampler = CardSampler(max_age=60)
+    key = sampler.key(["U"])
+    sampler.put(key, [1, 2, 3], get_card_cache().version)
+    assert sampler.get(key).tolist() == [1, 2, 3]
+    get_card_cache().invalidate(1)
+    assert sampler.get(key) is None
+
+    with patch("services.cardSampler.time.monotonic", return_value=0.0):
+        sampler.put(key, [1], get_card_cache().version)
+    with patch("services.cardSampler.time.monotonic", return_value=61.0):
+        assert sampler.get(key) is None
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+from services.cardCache import get_card_cache
+from services.deckCache import DeckCache
+
+
+def test_put_and_invalidate():
+    cache = DeckCache(max_size=10, ttl=0)
+    cache.put(1, "statistics", {"card_count": 60}, cache.current_version())
+    cache.put(2, "statistics", {"card_count": 100}, cache.current_version())
+    assert cache.get(1, "statistics") == {"card_count": 60}
+
+    cache.invalidate(1)
+    assert cache.get(1, "statistics") is None
+    assert cache.get(2, "statistics") == {"card_count": 100}
+
+
+def test_put_after_a_write_is_dropped():
+    cache = DeckCache(max_size=10, ttl=0)
+    version = cache.current_version()
+    cache.invalidate(1)
+    cache.put(1, "statistics", {"card_count": 60}, version)
+    assert cache.get(1, "statistics") is None
+
+
+def test_card_writes_and_ttl_expire_entries():
+    cache = DeckCache(max_size=10, ttl=60)
+    cache.put(1, "statistics", {}, cache.current_version())
+    get_card_cache().invalidate(42)
+    assert cache.get(1, "statistics") is None
+
+    cache.put(1, "statistics", {}, cache.current_version())
+    with patch("services.deckCache.time.time", return_value=1e12):
+        assert cache.get(1, "statistics") is None
+
+
+def test_lru_bound():
+    cache = DeckCache(max_size=2, ttl=0)
+    for deck_id in (1, 2, 3):
+        cache.put(deck_id, "statistics", deck_id, cache.current_version())
+    assert len(cache) == 2
+    assert cache.get(1, "statistics") is None
@@ -0,0 +1,94 @@
+import pytest
+from services.decklist import DecklistError, format_decklist, iter_decklist
+
+MTGA_EXPORT = """About
+Name Burn
+
+Commander
+1 Zada, Hedron Grinder (BFZ) 162
+
+Deck
+4 Lightning Bolt (M10) 146
+4x Goblin Guide
+Fire // Ice
+
+Sideboard
+2 Smash to Smithereens (ORI) 163
+"""
+
+
+def test_mtga_sections_and_set_codes():
+    assert list(iter_decklist(MTGA_EXPORT)) == [
+        (1, "Zada, Hedron Grinder", "commander"),
+        (4, "Lightning Bolt", "main"),
+        (4, "Goblin Guide", "main"),
+        (1, "Fire // Ice", "main"),
+        (2, "Smash to Smithereens", "sideboard"),
+    ]
+
+
+def test_plain_text_blank_line_starts_sideboard():
+    text = "// Burn\n4 Lightning Bolt\n2 Goblin Guide\n\n3 Duress\nSB: 1 Negate\n"
+    assert list(iter_decklist(text)) == [
+        (4, "Lightning Bolt", "main"),
+        (2, "Goblin Guide", "main"),
+        (3, "Duress", "sideboard"),
+        (1, "Negate", "sideboard"),
+    ]
+
+
+def test_blank_lines_between_groups_are_not_a_sideboard():
+    text = "4 Goblin Guide\n\n4 Lightning Bolt\n\n2 Mountain\n"
+    assert [section for _, _, section in iter_decklist(text)] == ["main"] * 3
+
+
+def test_group_headers_are_not_cards():
+    text = (
+        "Creatures (4)\n4 Goblin Guide\n\n"
+        "Instants (4)\n4 Lightning Bolt\n\n"
+        "Sideboard (3)\n3 Duress\n"
+    )
+    assert list(iter_decklist(text)) == [
+        (4, "Goblin Guide", "main"),
+        (4, "Lightning Bolt", "main"),
+        (3, "Duress", "sideboard"),
+    ]
+
+
+def test_zero_quantity_is_rejected():
+    with pytest.raises(DecklistError, match="Line 2"):
+        list(iter_decklist("1 Island\n0 Lightning Bolt\n"))
+
+
+def test_mtgo_export_round_trip():
+    cards = [
+        {"name": "Lightning Bolt", "quantity": 4},
+        {"name": 'Kongming, "Sleeping Dragon"', "quantity": 1},
+    ]
+    dek = format_decklist(cards, "mtgo")
+
+    assert dek.startswith("<?xml")
+    assert list(iter_decklist(dek)) == [
+        (4, "Lightning Bolt", "main"),
+        (1, 'Kongming, "Sleeping Dragon"', "main"),
+    ]
+
+
+def test_dek_sideboard_and_errors():
+    dek = (
+        "<Deck>"
+        '<Cards CatID="1" Quantity="3" Sideboard="true" Name="Duress" />'
+        '<Cards CatID="2" Quantity="4" Sideboard="false" Name="Island" />'
+        "</Deck>"
+    )
+    assert list(iter_decklist(dek)) == [(3, "Duress", "sideboard"), (4, "Island", "main")]
+    with pytest.raises(DecklistError, match="dek"):
+        list(iter_decklist("<Deck><Cards"))
+
+
+def test_text_formats():
+    cards = [{"name": "Lightning Bolt", "quantity": 4}, {"name": "Island", "quantity": 20}]
+    assert format_decklist(cards) == "4 Lightning Bolt\n20 Island\n"
+    assert format_decklist(cards, "mtga") == "Deck\n4 Lightning Bolt\n20 Island\n"
+    with pytest.raises(ValueError):
+        format_decklist(cards, "cockatrice")
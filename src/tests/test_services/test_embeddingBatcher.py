@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from services.embeddingBatcher import EmbeddingBatcher
+from services.embeddingCache import EmbeddingCache
+from services.embeddingService import EmbeddingService
+
+
+def make_service(**kwargs):
+    return EmbeddingService(endpoint_url="http://embed", api_key="k", **kwargs)
+
+
+def test_vectorize_many_sends_one_request():
+    service = make_service()
+    response = MagicMock()
+    response.json.return_value = {"embeddings": [[3.0, 4.0], [1.0, 0.0]]}
+    with patch("services.embeddingService.requests.post", return_value=response) as post:
+        embeddings = service.vectorize_many(["a", "b", "a"])
+    post.assert_called_once()
+    assert post.call_args.kwargs["json"]["input"] == ["a", "b"]
+    assert embeddings == [[0.6, 0.8], [1.0, 0.0], [0.6, 0.8]]
+
+
+def test_vectorize_many_only_fetches_uncached_texts():
+    service = make_service(cache=EmbeddingCache(max_size=10))
+    service.cache.put(service._cache_key("a", True), [1.0])
+    with patch.object(
+        EmbeddingService, "_request_embeddings", return_value=[[2.0]]
+    ) as request:
+        assert service.vectorize_many(["a", "b"]) == [[1.0], [2.0]]
+    request.assert_called_once_with(["b"], True)
+
+
+def test_fetch_many_splits_in_batches():
+    service = make_service(max_batch_size=2)
+    with patch.object(
+        EmbeddingService,
+        "_request_embeddings",
+        side_effect=lambda texts, normalize: [[float(len(t))] for t in texts],
+    ) as request:
+        assert service.fetch_many(["a", "bb", "ccc"]) == [[1.0], [2.0], [3.0]]
+    assert request.call_count == 2
+
+
+def test_mismatched_response_raises():
+    service = make_service()
+    response = MagicMock()
+    response.json.return_value = {"embeddings": [[1.0]]}
+    with patch("services.embeddingService.requests.post", return_value=response):
+        with pytest.raises(ValueError):
+            service.vectorize_many(["a", "b"])
+
+
+def test_batcher_coalesces_concurrent_requests():
+    service = make_service()
+    service.fetch_many = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    batcher = EmbeddingBatcher(service, max_batch_size=10, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.vectorize("a"), batcher.vectorize("bb"), batcher.vectorize("a")
+        )
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [1.0]]
+    service.fetch_many.assert_called_once_with(["a", "bb"])
+    assert batcher.batches == 1
+
+
+def test_batcher_flushes_when_full():
+    service = make_service()
+    service.fetch_many = MagicMock(side_effect=lambda texts: [[1.0] for _ in texts])
+    batcher = EmbeddingBatcher(service, max_batch_size=2, max_wait=10)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.vectorize("a"), batcher.vectorize("b")), 1
+        )
+
+    assert asyncio.run(run()) == [[1.0], [1.0]]
+
+
+def test_batcher_propagates_errors():
+    service = make_service()
+    service.fetch_many = MagicMock(side_effect=ValueError("API down"))
+    batcher = EmbeddingBatcher(service, max_batch_size=10, max_wait=0)
+
+    with pytest.raises(ValueError, match="API down"):
+        asyncio.run(batcher.vectorize("a"))
+
+
+def test_batcher_skips_queue_on_cache_hit():
+    service = make_service(cache=EmbeddingCache(max_size=10))
+    service.cache.put(service._cache_key("a", True), [1.0])
+    service.fetch_many = MagicMock()
+    batcher = EmbeddingBatcher(service, max_wait=0)
+    assert asyncio.run(batcher.vectorize("A")) == [1.0]
+    service.fetch_many.assert_not_called()
+
+
+def test_batcher_deduplicates_on_the_cache_key():
+    service = make_service(cache=EmbeddingCache(max_size=10))
+    service.fetch_many = MagicMock(side_effect=lambda texts: [[1.0] for _ in texts])
+    batcher = EmbeddingBatcher(service, max_batch_size=10, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.vectorize("Lightning  Bolt"), batcher.vectorize("lightning bolt")
+        )
+
+    assert asyncio.run(run()) == [[1.0], [1.0]]
+    service.fetch_many.assert_called_once_with(["Lightning  Bolt"])
+
+
+def test_batcher_reads_the_disk_cache_off_the_event_loop(tmp_path):
+    service = make_service(cache=EmbeddingCache(max_size=0, path=str(tmp_path / "e.db")))
+    service.cache.put(service._cache_key("a", True), [1.0])
+    service.fetch_many = MagicMock()
+    get = service.cache.get
+    disk_threads = []
+
+    def record_get(key, disk=True):
+        if disk:
+            disk_threads.append(threading.current_thread())
+        return get(key, disk=disk)
+
+    service.cache.get = record_get
+    batcher = EmbeddingBatcher(service, max_wait=0)
+
+    assert asyncio.run(batcher.vectorize("a")) == [1.0]
+    service.fetch_many.assert_not_called()
+    assert disk_threads and threading.main_thread() not in disk_threads
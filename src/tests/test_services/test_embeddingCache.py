@@ -0,0 +1,98 @@
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+from services.embeddingCache import EmbeddingCache
+from services.embeddingService import EmbeddingService
+
+
+def test_normalize_collapses_case_and_spaces():
+    assert EmbeddingCache.normalize("  Blue   Control\tCards ") == "blue control cards"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_size=2, ttl=0)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = EmbeddingCache(max_size=10, ttl=60)
+    with patch("services.embeddingCache.time.time", return_value=1000.0):
+        cache.put("a", [1.0])
+    with patch("services.embeddingCache.time.time", return_value=1100.0):
+        assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+
+
+def test_sqlite_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingCache(max_size=10, ttl=0, path=path).put("a", [0.25, 0.5])
+    cache = EmbeddingCache(max_size=10, ttl=0, path=path)
+    assert "a" in cache
+    assert cache.get("a") == [0.25, 0.5]
+    assert cache.get("a") == [0.25, 0.5]
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hits"] == 1
+
+
+def test_memory_only_lookup_skips_the_sqlite_tier(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingCache(max_size=10, ttl=0, path=path).put("a", [0.25, 0.5])
+    cache = EmbeddingCache(max_size=10, ttl=0, path=path)
+    assert cache.get("a", disk=False) is None
+    # Not a miss yet: the caller looks the disk tier up next
+    assert cache.stats()["misses"] == 0
+    assert cache.get("a") == [0.25, 0.5]
+    assert cache.get("a", disk=False) == [0.25, 0.5]
+
+
+def test_sqlite_errors_do_not_fail_the_cache(tmp_path):
+    cache = EmbeddingCache(max_size=10, ttl=0, path=str(tmp_path / "cache.sqlite"))
+    db = MagicMock(wraps=cache._db)
+    db.execute.side_effect = sqlite3.OperationalError("database is locked")
+    cache._db = db
+
+    cache.put("bolt", [0.1, 0.2])
+
+    assert cache.get("bolt") == [0.1, 0.2]
+    assert "bolt" in cache
+    assert cache.get("shock") is None
+    assert "shock" not in cache
+
+
+def test_invalid_settings_raise():
+    with pytest.raises(ValueError):
+        EmbeddingCache(max_size=-1)
+
+
+def test_vectorize_uses_cache_for_equivalent_queries():
+    service = EmbeddingService(
+        endpoint_url="http://embed", api_key="k", cache=EmbeddingCache(max_size=10)
+    )
+    with patch.object(
+        EmbeddingService, "_request_embeddings", return_value=[[0.6, 0.8]]
+    ) as request:
+        assert service.vectorize("Blue control cards") == [0.6, 0.8]
+        assert service.vectorize("  blue CONTROL cards") == [0.6, 0.8]
+    request.assert_called_once()
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_warm_up_skips_cached_prompts():
+    service = EmbeddingService(
+        endpoint_url="http://embed", api_key="k", cache=EmbeddingCache(max_size=10)
+    )
+    service.cache.put(service._cache_key("deathtouch", True), [0.0])
+    with patch.object(
+        EmbeddingService, "_request_embeddings", return_value=[[1.0], [0.0]]
+    ) as request:
+        assert service.warm_up(["flying", "trample", "", "Flying", "deathtouch"]) == 2
+    request.assert_called_once_with(["flying", "trample"], True)
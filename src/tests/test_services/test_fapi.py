@@ -27,7 +27,7 @@ def test_filter_endpoint_calls_dao(monkeypatch):
         },
     ]
 
-    def mock_filter(self, order_by, asc, limit, offset, **kwargs):
+    async def mock_filter(self, order_by, asc, limit, offset, **kwargs):
         assert kwargs["colors"] == ["U", "R"]
         assert kwargs["mana_value__lte"] == 4
         assert order_by == "id"
@@ -36,9 +36,9 @@ def test_filter_endpoint_calls_dao(monkeypatch):
         assert offset == 0
         return mock_results
 
-    from dao.cardDao import CardDao
+    from dao.asyncCardDao import AsyncCardDao
 
-    monkeypatch.setattr(CardDao, "filter", mock_filter)
+    monkeypatch.setattr(AsyncCardDao, "filter", mock_filter)
 
     response = client.post(
         "/filter",
@@ -60,6 +60,178 @@ def test_filter_endpoint_calls_dao(monkeypatch):
     assert data["results"][1]["mana_value"] == "5"
 
 
+def test_filter_endpoint_defaults_to_summary_profile(monkeypatch):
+    from dao.asyncCardDao import AsyncCardDao
+
+    calls = []
+
+    async def mock_filter(self, order_by, asc, limit, offset, **kwargs):
+        calls.append(kwargs)
+        return []
+
+    monkeypatch.setattr(AsyncCardDao, "filter", mock_filter)
+
+    assert client.post("/filter", json={}).status_code == 200
+    assert calls[-1]["profile"] == "summary"
+    assert client.post("/filter", json={"profile": "full"}).status_code == 200
+    assert calls[-1]["profile"] == "full"
+    assert client.post("/filter", json={"profile": "slim"}).status_code == 422
+
+
+def test_filter_endpoint_returns_next_token(monkeypatch):
+    from dao.asyncCardDao import AsyncCardDao
+
+    async def mock_filter(self, order_by, asc, limit, offset, **kwargs):
+        if kwargs["after"] == "garbage":
+            raise ValueError("Invalid page token")
+        return [{"id": 1}, {"id": 2}][:limit]
+
+    monkeypatch.setattr(AsyncCardDao, "filter", mock_filter)
+
+    first = client.post("/filter", json={"limit": 2}).json()
+    assert first["next"]
+    last = client.post("/filter", json={"limit": 3, "after": first["next"]}).json()
+    assert last["next"] is None
+    response = client.post("/filter", json={"after": "garbage"})
+    assert response.status_code == 400
+
+
+def test_autocomplete_endpoint(monkeypatch):
+    from services import fapi
+
+    index = fapi.NameIndex(max_age=0)
+    index.load_rows([(1, "Lightning Bolt", None, 5), (2, "Opt", None, 1)])
+    monkeypatch.setattr(fapi, "name_index", index)
+
+    response = client.get("/cards/autocomplete", params={"q": "light"})
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": 1, "name": "Lightning Bolt", "edhrec_rank": 5}
+    ]
+    assert client.get("/cards/autocomplete").status_code == 422
+
+
+def test_random_endpoint_batch_with_filters(monkeypatch):
+    from dao.asyncCardDao import AsyncCardDao
+
+    async def mock_random(self, count=1, colors=None, types=None):
+        assert (count, colors, types) == (3, ["U"], ["Creature"])
+        return [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    monkeypatch.setattr(AsyncCardDao, "get_random_cards", mock_random)
+
+    response = client.get(
+        "/cards/random", params={"count": 3, "colors": "U", "type": "Creature"}
+    )
+    assert response.status_code == 200
+    assert response.json()["card"] == {"id": 1}
+    assert len(response.json()["cards"]) == 3
+
+
+def test_search_endpoint_hybrid_mode(monkeypatch):
+    from dao.asyncPlayerDao import AsyncPlayerDao
+
+    async def mock_hybrid(self, text, filters=None, limit=5, vector_weight=1.0,
+                          lexical_weight=1.0, timeout=None, ef_search=None, probes=None):
+        assert (text, limit) == ("Lightning Bolt", 5)
+        assert (vector_weight, lexical_weight, timeout) == (0.5, 2.0, 300)
+        return [{"id": 1, "name": "Lightning Bolt", "score": 0.04}]
+
+    monkeypatch.setattr(AsyncPlayerDao, "hybrid_search", mock_hybrid)
+
+    response = client.post(
+        "/search",
+        json={
+            "text": "Lightning Bolt",
+            "limit": 5,
+            "mode": "hybrid",
+            "vector_weight": 0.5,
+            "lexical_weight": 2,
+            "timeout_ms": 300,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["name"] == "Lightning Bolt"
+
+    async def mock_timeout(self, *args, **kwargs):
+        raise TimeoutError("every search timed out")
+
+    monkeypatch.setattr(AsyncPlayerDao, "hybrid_search", mock_timeout)
+    response = client.post("/search", json={"text": "bolt", "mode": "hybrid"})
+    assert response.status_code == 504
+
+
+def test_similar_endpoint(monkeypatch):
+    from dao.asyncCardDao import AsyncCardDao
+    from dao.asyncPlayerDao import AsyncPlayerDao
+
+    async def mock_similar(self, card_id, limit=10, profile="summary"):
+        assert (card_id, limit, profile) == (42, 3, "summary")
+        return [{"id": 7, "distance": 0.1}]
+
+    monkeypatch.setattr(AsyncCardDao, "get_similar", mock_similar)
+    response = client.get("/cards/42/similar", params={"limit": 3})
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": 7, "distance": 0.1}]
+
+    # Not precomputed: vector search on the card embedding, without the card
+    async def no_neighbors(self, card_id, limit=10, profile="summary"):
+        return None
+
+    async def mock_embedding(self, card_id):
+        return [0.1, 0.2] if card_id == 42 else None
+
+    async def mock_search(self, query, filters=None, limit=5, **kwargs):
+        assert limit == 4
+        return [{"id": 42, "distance": 0.0}, {"id": 8, "distance": 0.3}]
+
+    monkeypatch.setattr(AsyncCardDao, "get_similar", no_neighbors)
+    monkeypatch.setattr(AsyncPlayerDao, "get_card_embedding", mock_embedding)
+    monkeypatch.setattr(AsyncPlayerDao, "natural_language_search", mock_search)
+    response = client.get("/cards/42/similar", params={"limit": 3})
+    assert response.json()["results"] == [{"id": 8, "distance": 0.3}]
+
+    assert client.get("/cards/43/similar").status_code == 404
+
+
+def test_search_batch_endpoint(monkeypatch):
+    from dao.asyncPlayerDao import AsyncPlayerDao
+
+    async def mock_batch(self, queries):
+        assert [query["query"] for query in queries] == ["flying", "trample"]
+        assert queries[0]["filters"] == {"colors": ["U"]}
+        return [[{"id": 1}], [{"id": 2}]]
+
+    async def mock_lexical(self, text, filters=None, limit=5, statement_timeout=None):
+        return [{"id": 3, "name": text}]
+
+    monkeypatch.setattr(AsyncPlayerDao, "batch_search", mock_batch)
+    monkeypatch.setattr(AsyncPlayerDao, "lexical_search", mock_lexical)
+
+    response = client.post(
+        "/search/batch",
+        json={
+            "queries": [
+                {"text": "flying", "filters": {"colors": ["U"]}, "key": "blue"},
+                {"text": "Lightning Bolt", "mode": "lexical"},
+                {"text": "trample"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["results"] == {
+        "blue": [{"id": 1}],
+        "1": [{"id": 3, "name": "Lightning Bolt"}],
+        "2": [{"id": 2}],
+    }
+
+    response = client.post(
+        "/search/batch",
+        json={"queries": [{"text": "a", "key": "x"}, {"text": "b", "key": "x"}]},
+    )
+    assert response.status_code == 400
+    assert client.post("/search/batch", json={"queries": []}).status_code == 422
+
 def test_filter_endpoint_integration_real():
     """
     Test d'intégration complet : on appelle /filter et on récupère des cartes
@@ -86,3 +258,105 @@ def test_filter_endpoint_integration_real():
     card = data["results"][0]
     assert all(key in card for key in ["id", "name", "colors", "type", "text"])
     assert isinstance(card["id"], int)
+
+
+def test_bulk_edit_deck_endpoint(monkeypatch):
+    from utils.auth import get_current_user
+    from business_object.deckBusiness import DeckBusiness
+
+    def mock_apply(self, user_id, deck_id, changes):
+        assert (user_id, deck_id) == (1, 3)
+        assert changes == [
+            {"card_id": 42, "quantity_delta": 4},
+            {"card_id": 7, "quantity_delta": -1},
+        ]
+        return {"user_id": 1, "deck_id": 3, "cards": [{"id": 42, "quantity": 4}]}
+
+    monkeypatch.setattr(DeckBusiness, "apply_card_changes", mock_apply)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 1}
+    try:
+        response = client.post(
+            "/deck/3/cards/bulk",
+            json={"operations": [
+                {"card_id": 42, "quantity_delta": 4},
+                {"card_id": 7, "quantity_delta": -1},
+            ]},
+        )
+        assert response.status_code == 200
+        assert response.json()["results"]["cards"] == [{"id": 42, "quantity": 4}]
+        assert client.post("/deck/3/cards/bulk", json={"operations": []}).status_code == 422
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_import_decklist_endpoint_errors(monkeypatch):
+    from utils.auth import get_current_user
+    from business_object.deckBusiness import DeckBusiness
+    from services.decklist import iter_decklist
+
+    def mock_import(self, user_id, deck_id, decklist, include_sideboard=False):
+        if deck_id == 4:
+            raise ValueError("You cannot edit this deck")
+        return list(iter_decklist(decklist))
+
+    monkeypatch.setattr(DeckBusiness, "import_decklist", mock_import)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 1}
+    try:
+        # A decklist that cannot be read is the client's error, not a denial
+        assert client.post(
+            "/deck/3/import", json={"decklist": "0 Lightning Bolt"}
+        ).status_code == 400
+        assert client.post(
+            "/deck/3/import", json={"decklist": "<Deck><Cards"}
+        ).status_code == 400
+        assert client.post(
+            "/deck/4/import", json={"decklist": "4 Lightning Bolt"}
+        ).status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_export_decklist_endpoint(monkeypatch):
+    from utils.auth import get_current_user
+    from business_object.deckBusiness import DeckBusiness
+
+    monkeypatch.setattr(
+        DeckBusiness, "export_decklist", lambda self, user_id, deck_id, fmt: f"{fmt}\n"
+    )
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 1}
+    try:
+        response = client.get("/deck/3/export", params={"format": "mtgo"})
+        assert response.status_code == 200
+        assert response.text == "mtgo\n"
+        assert response.headers["content-type"].startswith("application/xml")
+        assert "deck-3.dek" in response.headers["content-disposition"]
+        assert client.get("/deck/3/export").text == "text\n"
+        assert client.get("/deck/3/export", params={"format": "csv"}).status_code == 422
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_recommend_endpoint(monkeypatch):
+    from utils.auth import get_current_user
+    from business_object.deckBusiness import DeckBusiness
+    from dao.asyncPlayerDao import AsyncPlayerDao
+
+    profile = {"centroid": [0.5, 0.5], "card_ids": [42, 7], "color_identity": ["R"]}
+    monkeypatch.setattr(DeckBusiness, "get_deck_profile", lambda self, user_id, deck_id: profile)
+
+    async def mock_search(self, query, filters=None, limit=5, **kwargs):
+        assert query == [0.5, 0.5]
+        assert filters == {"color_identity__subset": ["R"], "id__not_in": [42, 7]}
+        return [{"id": 1, "distance": 0.1}][:limit]
+
+    monkeypatch.setattr(AsyncPlayerDao, "natural_language_search", mock_search)
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": 1}
+    try:
+        response = client.get("/deck/3/recommend", params={"limit": 5})
+        assert response.status_code == 200
+        assert response.json() == {"deck_id": 3, "results": [{"id": 1, "distance": 0.1}]}
+
+        profile["centroid"] = None
+        assert client.get("/deck/3/recommend").status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from services.cardCache import get_card_cache
+from services.filterIndex import FilterIndex
+
+ROWS = [
+    # id, colors, color_identity, supertypes, types, subtypes, keywords, mana_value, type
+    (1, ["R"], ["R"], [], ["Instant"], [], [], 1.0, "Instant"),
+    (2, ["U"], ["U"], [], ["Creature"], ["Bird"], ["Flying"], 2.0, "Creature — Bird"),
+    (3, ["U", "R"], ["U", "R"], ["Legendary"], ["Creature"], ["Human", "Wizard"],
+     [], 3.0, "Legendary Creature — Human Wizard"),
+    (4, [], [], [], ["Land"], [], [], 0.0, "Land"),
+    (5, ["G"], ["G"], [], ["Creature"], ["Elf"], ["Trample"], 0.5, "Creature — Elf"),
+    (6, None, None, None, ["Creature"], None, None, None, "Creature — Bird"),
+]
+
+
+@pytest.fixture
+def index():
+    index = FilterIndex(max_age=0, max_candidates=3)
+    index.load_rows(ROWS)
+    return index
+
+
+def test_array_overlap_is_an_or_of_bitsets(index):
+    assert index.candidates([("colors && %s", [["U", "R"]])]).tolist() == [1, 2, 3]
+    assert index.candidates([("keywords && %s", [["Flying", "Trample"]])]).tolist() == [2, 5]
+    assert index.candidates([("subtypes && %s", [["Goblin"]])]).tolist() == []
+
+
+def test_conditions_are_anded(index):
+    conditions = [("types && %s", [["Creature"]]), ("mana_value <= %s", [2])]
+    assert index.candidates(conditions).tolist() == [2, 5]
+    assert index.count(conditions) == (2, 6)
+
+
+def test_mana_value_buckets_match_sql_comparisons(index):
+    assert index.candidates([("mana_value < %s", [1])]).tolist() == [4, 5]
+    assert index.candidates([("mana_value = %s", [3])]).tolist() == [3]
+    # A card without mana value matches no comparison, like NULL
+    assert index.candidates([("mana_value >= %s", [0])]).tolist() == [1, 2, 3, 4, 5]
+    assert index.candidates([("mana_value IN (%s, %s)", [0, 2])]).tolist() == [2, 4]
+
+
+def test_type_line_equality(index):
+    assert index.candidates([("type = %s", ["Creature — Bird"])]).tolist() == [2, 6]
+    assert index.candidates([("type IN (%s, %s)", ["Land", "Instant"])]).tolist() == [1, 4]
+    assert index.candidates([("type = %s", ["Plane"])]).tolist() == []
+
+
+def test_unknown_conditions_are_left_to_sql(index):
+    conditions = [("colors && %s", [["G"]]), ("name = %s", ["Llanowar Elves"])]
+    assert index.candidates(conditions) is None
+    assert index.count(conditions) is None
+    assert index.narrow(conditions) == [
+        ("id = ANY(%s)", [[5]]),
+        ("name = %s", ["Llanowar Elves"]),
+    ]
+
+
+def test_narrow(index):
+    assert index.narrow([("colors && %s", [["B"]])]) == [("FALSE", [])]
+    assert index.narrow([("FALSE", [])]) == [("FALSE", [])]
+    # More than max_candidates: PostgreSQL evaluates the filters itself
+    broad = [("types && %s", [["Creature"]])]
+    assert index.narrow(broad) == broad
+    assert index.narrow([]) == []
+
+
+def test_unloaded_or_outdated_index_is_not_used(index, monkeypatch):
+    assert FilterIndex().narrow([("colors && %s", [["U"]])]) == [("colors && %s", [["U"]])]
+
+    index._card_version = get_card_cache().version
+    monkeypatch.setattr(index, "refresh_in_background", lambda: True)
+    get_card_cache().invalidate(2)
+    assert index.count([("colors && %s", [["U"]])]) is None
+
+
+def test_bitsets_are_packed(index):
+    assert index._bitsets[("colors", "U")].dtype == np.uint8
+    assert len(index._bitsets[("colors", "U")]) == 1
+    assert index.memory_usage() > 0
+
+
+def test_ids_are_read_with_the_bits(index, monkeypatch):
+    resolve = index.resolve
+
+    def resolve_then_rebuild(conditions):
+        resolved = resolve(conditions)
+        # A background rebuild swaps the index once the lock is released
+        index.load_rows([(7, ["U"], ["U"], [], ["Land"], [], [], 0.0, "Land")])
+        return resolved
+
+    monkeypatch.setattr(index, "resolve", resolve_then_rebuild)
+    assert index.candidates([("colors && %s", [["U", "R"]])]).tolist() == [1, 2, 3]
+    index.load_rows(ROWS)
+    assert index.count([("colors && %s", [["U"]])]) == (2, 6)
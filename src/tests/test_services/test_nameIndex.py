@@ -0,0 +1,86 @@
+import pytest
+from services.cardCache import get_card_cache
+from services.nameIndex import NameIndex
+
+ROWS = [
+    (1, "Lightning Bolt", None, 5),
+    (2, "Lightning Greaves", None, 2),
+    (3, "Chain Lightning", None, 40),
+    (4, "Lightning Bolt", None, 5),  # reprint sharing the name
+    (5, "Lim-Dûl's Vault", "Lim-Dul's Vault", None),
+    (6, "Light Up the Stage", None, 90),
+]
+
+
+@pytest.fixture
+def index():
+    index = NameIndex(max_age=0)
+    index.load_rows(ROWS)
+    return index
+
+
+def test_completions_are_ranked_by_edhrec_rank(index):
+    names = [card["name"] for card in index.complete("light", 10)]
+    assert names == [
+        "Lightning Greaves",
+        "Lightning Bolt",
+        "Light Up the Stage",
+        "Chain Lightning",
+    ]
+
+
+def test_word_matches_come_after_name_start_matches(index):
+    results = index.complete("LIGHTNING", 3)
+    assert [card["name"] for card in results] == [
+        "Lightning Greaves",
+        "Lightning Bolt",
+        "Chain Lightning",
+    ]
+    assert results[1] == {"id": 1, "name": "Lightning Bolt", "edhrec_rank": 5}
+
+
+def test_accents_and_ascii_name(index):
+    assert index.complete("lim-dul", 5)[0]["id"] == 5
+    assert index.complete("Lim-Dûl", 5)[0]["edhrec_rank"] is None
+
+
+def test_limit_and_no_match(index):
+    assert len(index.complete("l", 2)) == 2
+    assert index.complete("zzz") == []
+    assert index.complete("   ") == []
+    with pytest.raises(ValueError):
+        index.complete("l", 0)
+
+
+def test_not_loaded_raises():
+    with pytest.raises(RuntimeError):
+        NameIndex().complete("bolt")
+
+
+def test_card_writes_make_the_index_stale(index):
+    index._card_version = get_card_cache().version
+    assert not index.stale
+    get_card_cache().invalidate(1)
+    assert index.stale
+
+
+def test_lookup_resolves_whole_names():
+    index = NameIndex(max_age=0)
+    index.load_rows(ROWS + [
+        (7, "Fire // Ice", None, 300, "Fire"),
+        (8, "Delver of Secrets // Insectile Aberration", None, 80, "Insectile Aberration"),
+        (9, "Fire", None, None, None),
+    ])
+
+    assert index.lookup([
+        "lightning bolt", "Lim-Dul's Vault", "Fire/Ice", "FIRE  //  ICE",
+        "Insectile Aberration", "Fire", "Lightning",
+    ]) == {
+        "lightning bolt": 1,
+        "Lim-Dul's Vault": 5,
+        "Fire/Ice": 7,
+        "FIRE  //  ICE": 7,
+        "Insectile Aberration": 8,
+        "Fire": 9,  # a whole name wins over a face name
+        "Lightning": None,
+    }
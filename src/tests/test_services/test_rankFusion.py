@@ -0,0 +1,32 @@
+import pytest
+from services.rankFusion import reciprocal_rank_fusion
+
+
+def test_items_found_by_both_rankings_come_first():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+    assert [key for key, _ in fused] == [3, 1, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_weights_favor_a_ranking():
+    fused = reciprocal_rank_fusion([[1, 2], [2, 1]], weights=[1.0, 3.0])
+    assert [key for key, _ in fused] == [2, 1]
+
+
+def test_zero_weight_keeps_order_of_other_ranking():
+    fused = reciprocal_rank_fusion([[], [5, 6, 7]], weights=[0.0, 1.0])
+    assert [key for key, _ in fused] == [5, 6, 7]
+
+
+def test_duplicates_are_counted_once():
+    fused = reciprocal_rank_fusion([[1, 1, 2]], k=0)
+    assert dict(fused) == {1: 1.0, 2: 1 / 3}
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion([[1]], weights=[1.0, 1.0])
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion([[1]], weights=[-1.0])
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion([[1]], k=-1)
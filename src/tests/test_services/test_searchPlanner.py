@@ -0,0 +1,60 @@
+import pytest
+from services.cardCache import get_card_cache
+from services.searchPlanner import SearchPlanner
+
+
+def test_selective_filters_use_an_exact_scan():
+    planner = SearchPlanner(exact_threshold=100)
+    assert planner.plan(100, 30000, 10) == ("exact", None)
+    assert planner.plan(3, 30000, 10, ef_search=80) == ("exact", 80)
+
+
+def test_broad_filters_over_fetch_from_the_index():
+    planner = SearchPlanner(exact_threshold=100)
+    # a third of the cards match: three times the candidates
+    assert planner.plan(10000, 30000, 20) == ("ann", 60)
+    # few candidates fit in the default ef_search
+    assert planner.plan(30000, 30000, 10) == ("ann", None)
+    # never below the caller's value, never above pgvector's maximum
+    assert planner.plan(10000, 30000, 20, ef_search=200) == ("ann", 200)
+    assert planner.plan(101, 30000, 150) == ("ann", 1000)
+
+
+def test_unfiltered_search_fetches_at_least_the_candidates():
+    planner = SearchPlanner()
+    assert planner.plan(None, None, 10) == ("ann", None)
+    assert planner.plan(None, None, 150) == ("ann", 150)
+
+
+def test_count_query_stops_past_the_threshold():
+    planner = SearchPlanner(exact_threshold=100)
+    sql, params = planner.count_query([("colors && %s", [["U"]]), ("mana_value <= %s", [3])])
+    assert "WHERE colors && %s AND mana_value <= %s LIMIT %s" in sql
+    assert params == [["U"], 3, 101]
+
+
+def test_counts_are_cached_until_cards_change():
+    planner = SearchPlanner()
+    filters = {"colors": ["U"]}
+    assert planner.counts(None) == (None, None)
+    assert planner.counts(filters) is None
+
+    planner.put(planner.key(filters), 12, 30000, get_card_cache().version)
+    assert planner.counts({"colors": ["U"]}) == (12, 30000)
+
+    get_card_cache().invalidate_all()
+    assert planner.counts(filters) is None
+
+
+def test_scan_settings():
+    assert SearchPlanner(iterative_scan=False).scan_settings() == []
+    (sql, params), = SearchPlanner(iterative_scan=True).scan_settings()
+    assert "hnsw.iterative_scan" in sql
+    assert params == ("strict_order",)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SearchPlanner(exact_threshold=-1)
+    with pytest.raises(ValueError):
+        SearchPlanner(max_entries=0)
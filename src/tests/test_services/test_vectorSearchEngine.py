@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from services.cardCache import get_card_cache
+from services.vectorSearchEngine import VectorSearchEngine
+
+
+@pytest.fixture
+def engine():
+    engine = VectorSearchEngine()
+    engine.load_arrays(
+        ids=[1, 2, 3, 4],
+        matrix=[[1, 0], [0, 1], [0.8, 0.6], [-1, 0]],
+        colors=[["U"], ["B"], ["U", "B"], None],
+        mana_values=[1, 2, 3, np.nan],
+    )
+    return engine
+
+
+def test_search_matches_exact_l2_ranking(engine):
+    hits = engine.search([1, 0], limit=3)
+
+    assert [card_id for card_id, _ in hits] == [1, 3, 2]
+    assert hits[0][1] == pytest.approx(0.0, abs=1e-6)
+    assert hits[1][1] == pytest.approx(np.linalg.norm([0.2, -0.6]), rel=1e-5)
+
+
+def test_search_limit_larger_than_corpus(engine):
+    assert len(engine.search([1, 0], limit=10)) == 4
+
+
+def test_search_colors_filter(engine):
+    hits = engine.search([1, 0], [("colors && %s", [["B"]])], limit=5)
+    assert [card_id for card_id, _ in hits] == [3, 2]
+
+
+def test_search_mana_value_filter_ignores_null(engine):
+    hits = engine.search([-1, 0], [("mana_value <= %s", [2])], limit=5)
+    assert sorted(card_id for card_id, _ in hits) == [1, 2]
+
+
+def test_search_combines_filters(engine):
+    conditions = [("colors && %s", [["U"]]), ("mana_value >= %s", [2])]
+    assert [card_id for card_id, _ in engine.search([1, 0], conditions)] == [3]
+
+
+def test_search_no_match(engine):
+    assert engine.search([1, 0], [("colors && %s", [["G"]])]) == []
+
+
+def test_other_conditions_are_resolved_in_sql_once(engine):
+    with patch("services.vectorSearchEngine.dbConnection") as mock_db_conn:
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter([(2,), (4,)])
+        conn = mock_db_conn.return_value.__enter__.return_value
+        conn.cursor.return_value.__enter__.return_value = cursor
+
+        conditions = [("type = %s", ["Creature"])]
+        first = engine.search([1, 0], conditions, limit=5)
+        second = engine.search([1, 0], conditions, limit=5)
+
+    assert [card_id for card_id, _ in first] == [2, 4]
+    assert first == second
+    cursor.execute.assert_called_once_with(
+        "SELECT id FROM cards WHERE type = %s", ["Creature"]
+    )
+
+
+def test_sql_masks_are_dropped_when_cards_are_written(engine):
+    with patch("services.vectorSearchEngine.dbConnection") as mock_db_conn:
+        cursor = MagicMock()
+        cursor.__iter__.side_effect = [iter([(2,)]), iter([(2,), (4,)])]
+        conn = mock_db_conn.return_value.__enter__.return_value
+        conn.cursor.return_value.__enter__.return_value = cursor
+
+        conditions = [("type = %s", ["Creature"])]
+        first = engine.search([1, 0], conditions, limit=5)
+        get_card_cache().invalidate(4)
+        second = engine.search([1, 0], conditions, limit=5)
+
+    assert [card_id for card_id, _ in first] == [2]
+    assert [card_id for card_id, _ in second] == [2, 4]
+    assert cursor.execute.call_count == 2
+
+
+def test_sql_mask_follows_the_searched_corpus(engine):
+    def reload_during_query():
+        # Another thread replaces the corpus while the filter is resolved
+        engine.load_arrays([5, 6], [[1, 0], [0, 1]])
+        return iter([(2,), (4,)])
+
+    with patch("services.vectorSearchEngine.dbConnection") as mock_db_conn:
+        cursor = MagicMock()
+        cursor.__iter__.side_effect = reload_during_query
+        conn = mock_db_conn.return_value.__enter__.return_value
+        conn.cursor.return_value.__enter__.return_value = cursor
+
+        hits = engine.search([1, 0], [("type = %s", ["Creature"])], limit=5)
+
+    assert [card_id for card_id, _ in hits] == [2, 4]
+    # The mask of the replaced corpus is not cached for the new one
+    assert len(engine._masks) == 0
+
+
+def test_search_wrong_dimension(engine):
+    with pytest.raises(ValueError):
+        engine.search([1, 0, 0])
+
+
+def test_load_arrays_rejects_unsorted_ids():
+    with pytest.raises(ValueError):
+        VectorSearchEngine().load_arrays([2, 1], [[0.0], [1.0]])
+
+
+def test_search_loads_lazily():
+    engine = VectorSearchEngine()
+    with patch.object(
+        engine, "load", side_effect=lambda: engine.load_arrays([7], [[1.0, 0.0]])
+    ) as mock_load:
+        assert engine.search([1, 0])[0][0] == 7
+        engine.search([1, 0])
+    mock_load.assert_called_once()
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_quantized_search_reranks_at_full_precision(quantization):
+    rng = np.random.default_rng(1)
+    matrix = rng.normal(size=(300, 16)).astype(np.float32)
+    exact = VectorSearchEngine()
+    exact.load_arrays(np.arange(300), matrix)
+    quantized = VectorSearchEngine(quantization=quantization, rerank_factor=4)
+    quantized.load_arrays(np.arange(300), matrix)
+
+    query = matrix[7] + 0.01
+    expected = exact.search(query, limit=5)
+    hits = quantized.search(query, limit=5)
+
+    assert hits[0][0] == 7
+    # Re-ranked distances are the exact ones
+    assert dict(hits)[7] == pytest.approx(dict(expected)[7], rel=1e-5)
+    assert len({card_id for card_id, _ in hits} & {c for c, _ in expected}) >= 4
+
+
+def test_quantized_search_with_filter():
+    engine = VectorSearchEngine(quantization="int8", rerank_factor=2)
+    engine.load_arrays(
+        [1, 2, 3], [[1, 0], [0.9, 0.1], [0, 1]], colors=[["U"], ["B"], ["B"]]
+    )
+    hits = engine.search([1, 0], [("colors && %s", [["B"]])], limit=1)
+    assert hits[0][0] == 2
+
+
+def test_unknown_quantization():
+    with pytest.raises(ValueError):
+        VectorSearchEngine(quantization="int4")
@@ -0,0 +1,38 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+from utils import asyncDbConnection
+
+
+def test_concurrent_first_calls_open_one_pool():
+    opened = []
+
+    def make_pool(**kwargs):
+        pool = MagicMock(name="pool")
+
+        async def open():
+            await asyncio.sleep(0.01)
+            opened.append(pool)
+
+        async def close():
+            pass
+
+        pool.open = open
+        pool.close = close
+        return pool
+
+    async def scenario():
+        pools = await asyncio.gather(
+            *(asyncDbConnection.get_async_pool() for _ in range(3))
+        )
+        await asyncDbConnection.close_async_pool()
+        return pools
+
+    env = {"DB_HOST": "h", "DB_NAME": "n", "DB_USER": "u", "DB_PASSWORD": "p"}
+    with patch.dict("os.environ", env), patch.object(
+        asyncDbConnection, "AsyncConnectionPool", side_effect=make_pool
+    ) as mock_pool:
+        mock_pool.check_connection = None
+        pools = asyncio.run(scenario())
+
+    assert len(opened) == 1
+    assert pools == [opened[0]] * 3
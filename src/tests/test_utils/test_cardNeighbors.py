@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from utils.cardNeighbors import compute_neighbors
+
+
+def test_blocked_neighbors_match_brute_force():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(300, 16)).astype(np.float32)
+    ids = np.arange(1000, 1300)
+
+    neighbor_ids, distances = compute_neighbors(ids, matrix, k=5, block_size=64)
+
+    full = np.linalg.norm(matrix[:, None, :] - matrix[None, :, :], axis=2)
+    np.fill_diagonal(full, np.inf)
+    expected = np.argsort(full, axis=1)[:, :5]
+    assert neighbor_ids.shape == (300, 5)
+    assert (neighbor_ids == ids[expected]).all()
+    assert np.allclose(distances, np.take_along_axis(full, expected, axis=1), atol=1e-4)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_a_card_is_not_its_own_neighbor():
+    matrix = np.array([[0, 0], [0, 0], [3, 4]], dtype=np.float32)
+    neighbor_ids, distances = compute_neighbors([1, 2, 3], matrix, k=10)
+    # k is capped at the number of other cards
+    assert neighbor_ids.tolist() == [[2, 3], [1, 3], [1, 2]]
+    assert distances[0].tolist() == [0.0, 5.0]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        compute_neighbors([1, 2], np.zeros((2, 2)), k=0)
+    with pytest.raises(ValueError):
+        compute_neighbors([1, 2], np.zeros((2, 2)), block_size=0)
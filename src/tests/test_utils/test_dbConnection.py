@@ -0,0 +1,109 @@
+import threading
+import pytest
+import psycopg2
+from unittest.mock import MagicMock, patch
+from utils.dbConnection import ConnectionPool, dbConnection, get_pool
+
+
+def make_conn():
+    conn = MagicMock(name="conn")
+    conn.closed = 0
+    conn.get_transaction_status.return_value = 0
+    return conn
+
+
+@pytest.fixture
+def mock_connect():
+    with patch("utils.dbConnection.psycopg2.connect") as mock_connect:
+        mock_connect.side_effect = lambda **kwargs: make_conn()
+        with patch.dict(
+            "os.environ",
+            {"DB_HOST": "h", "DB_NAME": "n", "DB_USER": "u", "DB_PASSWORD": "p"},
+        ):
+            yield mock_connect
+
+
+def test_connection_is_reused(mock_connect):
+    pool = ConnectionPool(minconn=1, maxconn=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert mock_connect.call_count == 1
+    metrics = pool.metrics()
+    assert metrics["created"] == 1
+    assert metrics["reused"] == 1
+    assert metrics["in_use"] == 1
+
+
+def test_putconn_rolls_back(mock_connect):
+    pool = ConnectionPool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.rollback.assert_called_once()
+    assert pool.metrics()["idle"] == 1
+
+
+def test_closed_connection_is_replaced(mock_connect):
+    pool = ConnectionPool()
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = 1
+    other = pool.getconn()
+    assert other is not conn
+    assert pool.metrics()["discarded"] == 1
+
+
+def test_failed_ping_discards_connection(mock_connect):
+    pool = ConnectionPool(ping_after=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.cursor.return_value.__enter__.return_value.execute.side_effect = (
+        psycopg2.OperationalError("gone")
+    )
+    assert pool.getconn() is not conn
+
+
+def test_ping_does_not_hold_the_pool_lock(mock_connect):
+    pool = ConnectionPool(minconn=0, maxconn=3, ping_after=0)
+    slow, other = pool.getconn(), pool.getconn()
+    pool.putconn(slow)
+    pinging, release = threading.Event(), threading.Event()
+
+    def slow_ping(sql):
+        pinging.set()
+        release.wait(5)
+
+    slow.cursor.return_value.__enter__.return_value.execute.side_effect = slow_ping
+    checkout = threading.Thread(target=pool.getconn)
+    checkout.start()
+    assert pinging.wait(5)
+    # Other borrowers are served while the ping is in flight
+    giveback = threading.Thread(target=pool.putconn, args=(other,))
+    giveback.start()
+    giveback.join(1)
+    assert not giveback.is_alive()
+    release.set()
+    checkout.join(5)
+    assert pool.metrics()["in_use"] == 1
+    assert pool.metrics()["reused"] == 1
+
+
+def test_exhausted_pool_times_out(mock_connect):
+    pool = ConnectionPool(minconn=0, maxconn=1, timeout=0.01)
+    pool.getconn()
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    assert pool.metrics()["timeouts"] == 1
+
+
+def test_invalid_sizes_raise():
+    with pytest.raises(ValueError):
+        ConnectionPool(minconn=3, maxconn=2)
+
+
+def test_dbconnection_borrows_from_shared_pool(mock_connect):
+    with dbConnection() as conn:
+        assert get_pool().metrics()["in_use"] == 1
+    with dbConnection() as again:
+        assert again is conn
+    assert get_pool().metrics()["in_use"] == 0
@@ -0,0 +1,113 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from utils.embed_everything import (
+    embed_all_cards,
+    embed_batch,
+    iter_batches,
+    read_checkpoint,
+    write_checkpoint,
+)
+
+
+def make_cards(n):
+    return [
+        {"id": i, "name": f"Card {i}", "type": "Creature", "text": "Flying"}
+        for i in range(1, n + 1)
+    ]
+
+
+@pytest.fixture
+def dao():
+    dao = MagicMock()
+    dao.iter_embedding_sources.return_value = iter(make_cards(5))
+    return dao
+
+
+@pytest.fixture
+def embedding_service():
+    service = MagicMock()
+    service.fetch_many.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    return service
+
+
+def test_iter_batches_builds_texts():
+    batches = list(iter_batches(make_cards(5), 2))
+
+    assert [ids for ids, _ in batches] == [[1, 2], [3, 4], [5]]
+    assert batches[0][1][0] == (
+        "Card 1 is a Creature. It has the following abilities: Flying."
+    )
+
+
+def test_embed_all_cards_writes_batches_in_order(dao, embedding_service):
+    checkpoints = []
+
+    stats = embed_all_cards(
+        batch_size=2,
+        workers=3,
+        on_checkpoint=checkpoints.append,
+        dao=dao,
+        embedding_service=embedding_service,
+    )
+
+    assert stats["success"] == 5
+    assert stats["batches"] == 3
+    assert embedding_service.fetch_many.call_count == 3
+    written = [
+        row[0] for call in dao.bulk_update_embeddings.call_args_list for row in call[0][0]
+    ]
+    assert written == [1, 2, 3, 4, 5]
+    assert checkpoints == [2, 4, 5]
+
+
+def test_embed_all_cards_passes_resume_options(dao, embedding_service):
+    embed_all_cards(
+        start_after=3,
+        end_at=10,
+        only_missing=True,
+        dao=dao,
+        embedding_service=embedding_service,
+    )
+
+    dao.iter_embedding_sources.assert_called_once_with(
+        start_after=3, end_at=10, only_missing=True
+    )
+
+
+@patch("utils.embed_everything.time.sleep")
+def test_embed_all_cards_skips_failed_batch(mock_sleep, dao, embedding_service):
+    def fetch_many(texts):
+        if "Card 3" in texts[0]:
+            raise ValueError("API down")
+        return [[0.0] for _ in texts]
+
+    embedding_service.fetch_many.side_effect = fetch_many
+
+    stats = embed_all_cards(
+        batch_size=2, workers=1, max_retries=2, dao=dao, embedding_service=embedding_service
+    )
+
+    assert stats["success"] == 3
+    assert stats["failed_ids"] == [3, 4]
+    assert dao.bulk_update_embeddings.call_count == 2
+
+
+def test_embed_all_cards_invalid_arguments(dao):
+    with pytest.raises(ValueError):
+        embed_all_cards(batch_size=0, dao=dao, embedding_service=MagicMock())
+
+
+@patch("utils.embed_everything.time.sleep")
+def test_embed_batch_retries(mock_sleep, embedding_service):
+    embedding_service.fetch_many.side_effect = [ValueError("timeout"), [[1.0]]]
+
+    assert embed_batch(embedding_service, ["text"], max_retries=3) == [[1.0]]
+    mock_sleep.assert_called_once_with(2)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "progress")
+
+    assert read_checkpoint(path) == 0
+    write_checkpoint(1234, path)
+    assert read_checkpoint(path) == 1234
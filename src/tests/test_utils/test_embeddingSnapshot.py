@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from services.vectorSearchEngine import VectorSearchEngine
+from utils import embeddingSnapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "embeddings.snap")
+    embeddingSnapshot.write_snapshot(
+        path,
+        ids=[3, 5, 8],
+        matrix=[[1, 0], [0, 1], [0.6, 0.8]],
+        colors=[["U"], None, ["U", "G"]],
+        mana_values=[1, np.nan, 4],
+    )
+    return path
+
+
+def test_round_trip_is_memory_mapped(snapshot_path):
+    snapshot = embeddingSnapshot.read_snapshot(snapshot_path)
+
+    assert isinstance(snapshot["matrix"], np.memmap)
+    assert snapshot["count"] == 3
+    assert snapshot["dimension"] == 2
+    np.testing.assert_array_equal(snapshot["ids"], [3, 5, 8])
+    np.testing.assert_allclose(snapshot["matrix"][2], [0.6, 0.8], rtol=1e-6)
+    np.testing.assert_allclose(snapshot["norms"], [1, 1, 1], rtol=1e-6)
+    assert snapshot["colors"] == [["U"], [], ["U", "G"]]
+    assert np.isnan(snapshot["mana_values"][1])
+    # Sections are aligned for efficient mapping
+    assert all(
+        offset % embeddingSnapshot.ALIGNMENT == 0
+        for offset in snapshot["offsets"].values()
+    )
+
+
+def test_write_replaces_atomically(snapshot_path, tmp_path):
+    embeddingSnapshot.write_snapshot(snapshot_path, [1], [[0.0, 1.0]])
+
+    assert embeddingSnapshot.read_snapshot(snapshot_path)["count"] == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["embeddings.snap"]
+
+
+def test_read_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        embeddingSnapshot.read_snapshot(str(path))
+
+
+def test_read_rejects_unknown_version(snapshot_path):
+    with open(snapshot_path, "r+b") as f:
+        f.seek(8)
+        f.write((99).to_bytes(4, "little"))
+    with pytest.raises(ValueError, match="version"):
+        embeddingSnapshot.read_snapshot(snapshot_path)
+
+
+def test_export_requires_a_path(monkeypatch):
+    monkeypatch.delenv("EMBEDDING_SNAPSHOT_PATH", raising=False)
+    with pytest.raises(ValueError):
+        embeddingSnapshot.export_snapshot()
+
+
+def test_engine_loads_snapshot_and_follows_swaps(snapshot_path):
+    engine = VectorSearchEngine(snapshot_path=snapshot_path, check_interval=0)
+
+    hits = engine.search([1, 0], [("colors && %s", [["U"]])], limit=5)
+    assert [card_id for card_id, _ in hits] == [3, 8]
+    assert engine.source == snapshot_path
+
+    embeddingSnapshot.write_snapshot(snapshot_path, [42], [[1.0, 0.0]])
+    assert engine.search([1, 0])[0][0] == 42
+    assert len(engine) == 1
@@ -0,0 +1,27 @@
+import pytest
+from utils.pageToken import encode_page_token, decode_page_token
+
+
+def test_round_trip():
+    token = encode_page_token("name", True, "Lightning Bolt", 42)
+    assert "=" not in token
+    assert decode_page_token(token, "name", True) == ("Lightning Bolt", 42)
+
+
+def test_null_value_round_trip():
+    token = encode_page_token("edhrec_rank", False, None, 7)
+    assert decode_page_token(token, "edhrec_rank", False) == (None, 7)
+
+
+def test_other_sort_order_is_rejected():
+    token = encode_page_token("name", True, "Opt", 3)
+    with pytest.raises(ValueError):
+        decode_page_token(token, "name", False)
+    with pytest.raises(ValueError):
+        decode_page_token(token, "mana_value", True)
+
+
+@pytest.mark.parametrize("token", ["", "not a token", "W10", "eyJvIjoibmFtZSJ9"])
+def test_malformed_token_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_page_token(token, "name", True)
@@ -0,0 +1,23 @@
+import numpy as np
+from utils.searchBenchmark import benchmark, recall_at_k
+
+
+def test_recall_at_k():
+    assert recall_at_k([[1, 2], [3, 4]], [[2, 1], [3, 5]], 2) == 0.75
+    assert recall_at_k([], [], 5) == 0.0
+
+
+def test_benchmark_reports_every_configuration():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(500, 32)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    queries = matrix[:20] + rng.normal(0, 0.05, (20, 32)).astype(np.float32)
+
+    rows = benchmark(np.arange(1, 501), matrix, queries, k=5, rerank_factors=(4,))
+
+    assert [row["quantization"] for row in rows] == ["float32", "float16", "int8"]
+    assert rows[0]["recall"] == 1.0
+    assert all(row["recall"] >= 0.9 for row in rows[1:])
+    # float16 halves the matrix, int8 quarters it (plus one scale per row)
+    assert rows[1]["memory_bytes"] == matrix.nbytes // 2
+    assert rows[2]["memory_bytes"] == matrix.nbytes // 4 + 500 * 4
@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from utils import vectorIndex
+
+
+@pytest.fixture
+def mock_db():
+    with patch("utils.vectorIndex.dbConnection") as mock_db_conn:
+        conn = MagicMock()
+        cursor = MagicMock()
+        mock_db_conn.return_value.__enter__.return_value = conn
+        conn.cursor.return_value.__enter__.return_value = cursor
+        yield conn, cursor
+
+
+def test_index_statement_hnsw():
+    statement = vectorIndex.index_statement("hnsw", m=24, ef_construction=100)
+    assert statement == (
+        "CREATE INDEX cards_embedding_idx ON cards USING hnsw "
+        "(embedding vector_l2_ops) WITH (m = 24, ef_construction = 100)"
+    )
+
+
+def test_index_statement_ivfflat_concurrently():
+    statement = vectorIndex.index_statement("ivfflat", lists=32, concurrently=True)
+    assert statement.startswith("CREATE INDEX CONCURRENTLY cards_embedding_idx")
+    assert "USING ivfflat" in statement
+    assert "WITH (lists = 32)" in statement
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"method": "flat"},
+        {"method": "hnsw", "m": 1},
+        {"method": "hnsw", "m": 16, "ef_construction": 20},
+        {"method": "ivfflat", "lists": 0},
+    ],
+)
+def test_index_statement_invalid(kwargs):
+    with pytest.raises(ValueError):
+        vectorIndex.index_statement(**kwargs)
+
+
+def test_default_lists():
+    assert vectorIndex.default_lists(0) == 1
+    assert vectorIndex.default_lists(32548) == 32
+    assert vectorIndex.default_lists(4_000_000) == 2000
+
+
+def test_create_index_ivfflat_uses_row_count(mock_db):
+    conn, cursor = mock_db
+    cursor.fetchone.return_value = (5000,)
+
+    vectorIndex.create_index("ivfflat")
+
+    statements = [c[0][0] for c in cursor.execute.call_args_list]
+    assert "DROP INDEX IF EXISTS cards_embedding_idx" in statements
+    assert any("WITH (lists = 5)" in s for s in statements)
+    conn.commit.assert_called()
+
+
+def test_create_index_concurrently_uses_autocommit(mock_db):
+    conn, cursor = mock_db
+    conn.autocommit = False
+    seen = []
+    cursor.execute.side_effect = lambda *a: seen.append(conn.autocommit)
+
+    vectorIndex.create_index("hnsw", concurrently=True)
+
+    assert all(seen)
+    assert conn.autocommit is False
+
+
+def test_failed_concurrent_build_resets_maintenance_work_mem(mock_db):
+    conn, cursor = mock_db
+    statements = []
+
+    def execute(statement, params=None):
+        statements.append(statement)
+        if statement.startswith("CREATE INDEX"):
+            raise RuntimeError("build failed")
+
+    cursor.execute.side_effect = execute
+
+    with pytest.raises(RuntimeError):
+        vectorIndex.create_index(
+            "hnsw", concurrently=True, maintenance_work_mem="1GB"
+        )
+
+    assert statements[-1] == "RESET maintenance_work_mem"
+    assert cursor.execute.call_args_list[0][0][1] == ("1GB", False)
+
+
+def test_maintenance_work_mem_is_transaction_local(mock_db):
+    conn, cursor = mock_db
+
+    vectorIndex.create_index("hnsw", maintenance_work_mem="1GB")
+
+    statements = [c[0][0] for c in cursor.execute.call_args_list]
+    assert cursor.execute.call_args_list[0][0][1] == ("1GB", True)
+    assert "RESET maintenance_work_mem" not in statements
+
+
+def test_set_dimension(mock_db):
+    conn, cursor = mock_db
+    vectorIndex.set_dimension(1024)
+    statements = [c[0][0] for c in cursor.execute.call_args_list]
+    assert statements[-1] == (
+        "ALTER TABLE cards ALTER COLUMN embedding TYPE vector(1024) "
+        "USING embedding::vector(1024)"
+    )
+
+
+def test_index_statement_float16():
+    statement = vectorIndex.index_statement("hnsw", quantization="float16")
+    assert "((embedding::halfvec(1024)) halfvec_l2_ops)" in statement
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from psycopg_pool import AsyncConnectionPool
+
+# Load variables from env file
+load_dotenv()
+
+_pool = None
+_pool_loop = None
+_pool_pid = None
+# asyncio locks belong to one event loop, like the pool
+_pool_lock = None
+_pool_lock_loop = None
+
+
+def _conninfo_kwargs():
+    return {
+        "host": os.environ["DB_HOST"],
+        "port": os.environ.get("DB_PORT", 5432),
+        "dbname": os.environ["DB_NAME"],
+        "user": os.environ["DB_USER"],
+        "password": os.environ["DB_PASSWORD"],
+    }
+
+
+async def get_async_pool():
+    """
+    Return the asyncio connection pool shared by the async DAOs.
+
+    The pool is opened lazily on first use, once even when concurrent tasks
+    ask for it, and uses the same `DB_POOL_*` settings as the synchronous
+    pool. It is bound to the running event loop,
+    so a new one is created if the loop (or the process) changes.
+
+    Returns
+    -------
+    AsyncConnectionPool
+        An open psycopg 3 pool.
+    """
+    global _pool, _pool_loop, _pool_pid, _pool_lock, _pool_lock_loop
+    loop = asyncio.get_running_loop()
+
+    def current():
+        return _pool is not None and _pool_loop is loop and _pool_pid == os.getpid()
+
+    if current():
+        return _pool
+    if _pool_lock is None or _pool_lock_loop is not loop:
+        _pool_lock, _pool_lock_loop = asyncio.Lock(), loop
+    async with _pool_lock:
+        # Another task may have opened the pool while this one waited
+        if not current():
+            pool = AsyncConnectionPool(
+                kwargs=_conninfo_kwargs(),
+                min_size=int(os.environ.get("DB_POOL_MIN", 1)),
+                max_size=int(os.environ.get("DB_POOL_MAX", 10)),
+                timeout=float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+                max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            await pool.open()
+            _pool, _pool_loop, _pool_pid = pool, loop, os.getpid()
+    return _pool
+
+
+async def close_async_pool():
+    """Close the shared async pool if it was opened on the running loop."""
+    global _pool, _pool_loop, _pool_pid
+    if _pool is not None and _pool_loop is asyncio.get_running_loop():
+        await _pool.close()
+    _pool, _pool_loop, _pool_pid = None, None, None
+
+
+def async_pool_metrics():
+    """
+    Counters of the shared async pool.
+
+    Returns
+    -------
+    dict
+        The statistics reported by psycopg_pool, empty if no pool is open.
+    """
+    return _pool.get_stats() if _pool is not None else {}
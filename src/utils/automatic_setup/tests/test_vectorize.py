@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, MagicMock, patch, mock_open, call
+from unittest.mock import patch, mock_open
 import os
 import sys
 
@@ -72,293 +72,110 @@ def test_save_progress_large_number():
 
 
 # Tests for process_all_cards()
+STATS = {"success": 3, "failed": 0, "batches": 1, "elapsed": 1.0, "failed_ids": []}
+
+
 @patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
+@patch("vectorize.embed_all_cards")
 @patch("vectorize.load_dotenv")
 @patch("os.getenv")
 @patch("os.path.exists")
 @patch("os.remove")
-@patch("time.sleep")
-def test_process_all_cards_success_small_batch(
-    mock_sleep,
+def test_process_all_cards_success(
     mock_remove,
     mock_exists,
     mock_getenv,
     mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
+    mock_embed_all_cards,
     mock_get_last_id,
 ):
-    # Setup mocks
     mock_get_last_id.return_value = 0
     mock_getenv.return_value = "test_api_key"
     mock_exists.return_value = True
+    mock_embed_all_cards.return_value = STATS
 
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.text_to_embed = "test text"
-    mock_card_business_class.return_value = mock_business
-
-    # Test with small range
     process_all_cards(max_card_id=3)
 
-    # Verify CardBusiness was called for each card
-    assert mock_card_business_class.call_count == 3
-    assert mock_business.generate_text_to_embed2.call_count == 3
-    assert mock_business.vectorize.call_count == 3
-    assert mock_save_progress.call_count == 3
+    mock_embed_all_cards.assert_called_once_with(
+        start_after=0,
+        end_at=3,
+        batch_size=64,
+        workers=4,
+        on_checkpoint=save_progress,
+    )
     mock_remove.assert_called_once_with(PROGRESS_FILE)
 
 
 @patch("vectorize.get_last_processed_id")
+@patch("vectorize.embed_all_cards")
 @patch("vectorize.load_dotenv")
 @patch("os.getenv")
-def test_process_all_cards_no_api_key(mock_getenv, mock_load_dotenv, mock_get_last_id):
+def test_process_all_cards_no_api_key(
+    mock_getenv, mock_load_dotenv, mock_embed_all_cards, mock_get_last_id
+):
     mock_get_last_id.return_value = 0
     mock_getenv.return_value = None
 
     process_all_cards()
 
+    mock_embed_all_cards.assert_not_called()
+
 
 @patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
+@patch("vectorize.embed_all_cards")
 @patch("vectorize.load_dotenv")
 @patch("os.getenv")
-@patch("time.sleep")
+@patch("os.path.exists", return_value=False)
 def test_process_all_cards_resume_from_progress(
-    mock_sleep,
+    mock_exists,
     mock_getenv,
     mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
+    mock_embed_all_cards,
     mock_get_last_id,
 ):
-    # Resume from card 100
     mock_get_last_id.return_value = 100
     mock_getenv.return_value = "test_api_key"
+    mock_embed_all_cards.return_value = STATS
 
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.text_to_embed = "test text"
-    mock_card_business_class.return_value = mock_business
-
-    process_all_cards(max_card_id=102)
-
-    # Should only process cards 101 and 102
-    assert mock_card_business_class.call_count == 2
-    mock_card_business_class.assert_any_call(mock_dao, 101)
-    mock_card_business_class.assert_any_call(mock_dao, 102)
-
-
-@patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
-@patch("vectorize.load_dotenv")
-@patch("os.getenv")
-@patch("time.sleep")
-def test_process_all_cards_value_error_continue(
-    mock_sleep,
-    mock_getenv,
-    mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
-    mock_get_last_id,
-):
-    mock_get_last_id.return_value = 0
-    mock_getenv.return_value = "test_api_key"
-
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.text_to_embed = "test text"
-    # Raise ValueError on card 2
-    mock_business.generate_text_to_embed2.side_effect = [
-        None,
-        ValueError("Card not found"),
-        None,
-    ]
-    mock_card_business_class.return_value = mock_business
-
-    process_all_cards(max_card_id=3)
+    process_all_cards(max_card_id=102, batch_size=8, workers=2)
 
-    # Should process all 3 cards despite error on card 2
-    assert mock_card_business_class.call_count == 3
-    assert mock_save_progress.call_count == 3
+    mock_embed_all_cards.assert_called_once_with(
+        start_after=100,
+        end_at=102,
+        batch_size=8,
+        workers=2,
+        on_checkpoint=save_progress,
+    )
 
 
 @patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
+@patch("vectorize.embed_all_cards")
 @patch("vectorize.load_dotenv")
 @patch("os.getenv")
-@patch("time.sleep")
 def test_process_all_cards_unexpected_error_raises(
-    mock_sleep,
-    mock_getenv,
-    mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
-    mock_get_last_id,
+    mock_getenv, mock_load_dotenv, mock_embed_all_cards, mock_get_last_id
 ):
     mock_get_last_id.return_value = 0
     mock_getenv.return_value = "test_api_key"
-
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.generate_text_to_embed2.side_effect = RuntimeError("Database error")
-    mock_card_business_class.return_value = mock_business
+    mock_embed_all_cards.side_effect = RuntimeError("Database error")
 
     with pytest.raises(RuntimeError, match="Database error"):
         process_all_cards(max_card_id=2)
 
 
 @patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
+@patch("vectorize.embed_all_cards")
 @patch("vectorize.load_dotenv")
 @patch("os.getenv")
-@patch("time.sleep")
+@patch("os.remove")
 def test_process_all_cards_keyboard_interrupt(
-    mock_sleep,
-    mock_getenv,
-    mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
-    mock_get_last_id,
+    mock_remove, mock_getenv, mock_load_dotenv, mock_embed_all_cards, mock_get_last_id
 ):
     mock_get_last_id.return_value = 0
     mock_getenv.return_value = "test_api_key"
+    mock_embed_all_cards.side_effect = KeyboardInterrupt()
 
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.generate_text_to_embed2.side_effect = [None, KeyboardInterrupt()]
-    mock_card_business_class.return_value = mock_business
-
-    # Should handle KeyboardInterrupt gracefully
+    # Should handle KeyboardInterrupt gracefully and keep the progress file
     process_all_cards(max_card_id=3)
 
-    # Should have processed card 1 and saved progress
-    assert mock_save_progress.call_count >= 1
-
-
-@patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
-@patch("vectorize.load_dotenv")
-@patch("os.getenv")
-@patch("time.sleep")
-def test_process_all_cards_rate_limiting(
-    mock_sleep,
-    mock_getenv,
-    mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
-    mock_get_last_id,
-):
-    mock_get_last_id.return_value = 0
-    mock_getenv.return_value = "test_api_key"
-
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.text_to_embed = "test text"
-    mock_card_business_class.return_value = mock_business
-
-    process_all_cards(max_card_id=3)
-
-    # Verify sleep was called for rate limiting
-    assert mock_sleep.call_count == 3
-    mock_sleep.assert_called_with(0.5)  # Changed from 0.5 to 0.1
-
-
-@patch("vectorize.get_last_processed_id")
-@patch("vectorize.save_progress")
-@patch("vectorize.CardDao")
-@patch("vectorize.CardBusiness")
-@patch("vectorize.load_dotenv")
-@patch("os.getenv")
-@patch("time.sleep")
-def test_process_all_cards_vectorize_called_with_correct_params(
-    mock_sleep,
-    mock_getenv,
-    mock_load_dotenv,
-    mock_card_business_class,
-    mock_card_dao_class,
-    mock_save_progress,
-    mock_get_last_id,
-):
-    mock_get_last_id.return_value = 0
-    api_key = "test_api_key_123"
-    mock_getenv.return_value = api_key
-
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    mock_business = MagicMock()
-    mock_business.text_to_embed = "test card description"
-    mock_card_business_class.return_value = mock_business
-
-    process_all_cards(max_card_id=1)
-
-    # Verify vectorize was called without parameters (uses self.text_to_embed internally)
-    mock_business.vectorize.assert_called_once_with()
-    # Verify generate_text_to_embed2 was called first
-    mock_business.generate_text_to_embed2.assert_called_once_with()
-
-
-@patch("vectorize.get_last_processed_id")
-@patch("vectorize.CardDao")
-@patch("vectorize.load_dotenv")
-@patch("os.getenv")
-def test_process_all_cards_all_already_processed(
-    mock_getenv, mock_load_dotenv, mock_card_dao_class, mock_get_last_id
-):
-    # All cards already processed
-    mock_get_last_id.return_value = 100
-    mock_getenv.return_value = "test_api_key"
-
-    mock_dao = MagicMock()
-    mock_dao.__enter__.return_value = mock_dao
-    mock_dao.__exit__.return_value = False
-    mock_card_dao_class.return_value = mock_dao
-
-    # max_card_id equals last processed
-    process_all_cards(max_card_id=100)
+    mock_remove.assert_not_called()
@@ -1,13 +1,11 @@
 import sys
 import os
 
-# Add project root to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+# Add src/ to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from src.dao.cardDao import CardDao
-from src.business_object.cardBusiness import CardBusiness
+from utils.embed_everything import embed_all_cards
 from dotenv import load_dotenv
-import time
 
 PROGRESS_FILE = ".embed_progress"
 
@@ -26,8 +24,13 @@ def save_progress(card_id):
         f.write(str(card_id))
 
 
-def process_all_cards(max_card_id=32548):
-    """Process all cards with resume capability."""
+def process_all_cards(max_card_id=None, batch_size=64, workers=4):
+    """
+    Embed all cards with resume capability.
+
+    Cards are embedded in batches by the bulk pipeline of
+    `utils.embed_everything`; progress is saved after every written batch.
+    """
     load_dotenv()
     api_key = os.getenv("LLM_API_KEY")
 
@@ -35,46 +38,24 @@ def process_all_cards(max_card_id=32548):
         print("❌ LLM_API_KEY not found in .env file!")
         return
 
-    start_id = get_last_processed_id() + 1
-    print(f"🔄 Resuming from card ID: {start_id}")
-    print(f"📊 Total cards to process: {max_card_id - start_id + 1}")
+    start_after = get_last_processed_id()
+    print(f"🔄 Resuming after card ID: {start_after}")
 
     try:
-        with CardDao() as dao:
-            for card_id in range(start_id, max_card_id + 1):
-                try:
-                    # Progress indicator
-                    if card_id % 100 == 0:
-                        progress = (
-                            (card_id - start_id + 1) / (max_card_id - start_id + 1)
-                        ) * 100
-                        print(
-                            f"📈 Progress: {progress:.1f}% (Card {card_id}/{max_card_id})"
-                        )
-
-                    # Create business object and generate text to embed
-                    business = CardBusiness(dao, card_id)
-
-                    # Generate the text_to_embed first
-                    business.generate_text_to_embed2()
-
-                    # Then vectorize it (no need to pass text since it uses self.text_to_embed)
-                    business.vectorize()
-
-                    save_progress(card_id)
-
-                    # Rate limiting to avoid API throttling
-                    time.sleep(0.5)
-
-                except ValueError as e:
-                    print(f"⚠️  Error processing card {card_id}: {e}")
-                    save_progress(card_id)  # Save progress even on error
-                    continue
-                except Exception as e:
-                    print(f"❌ Unexpected error on card {card_id}: {e}")
-                    raise
-
-        print("✨ All embeddings generated successfully!")
+        stats = embed_all_cards(
+            start_after=start_after,
+            end_at=max_card_id,
+            batch_size=batch_size,
+            workers=workers,
+            on_checkpoint=save_progress,
+        )
+        print(
+            f"✨ {stats['success']} embeddings generated in "
+            f"{stats['elapsed'] / 60:.1f} minutes!"
+        )
+        if stats["failed_ids"]:
+            print(f"⚠️  {stats['failed']} cards failed: {stats['failed_ids']}")
+            print("   Run with --only-missing from src/utils/embed_everything.py to retry them.")
         # Clean up progress file
         if os.path.exists(PROGRESS_FILE):
             os.remove(PROGRESS_FILE)
@@ -0,0 +1,139 @@
+import argparse
+import time
+import numpy as np
+from psycopg2.extras import execute_values
+from utils.dbConnection import dbConnection
+from utils import embeddingSnapshot
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS card_neighbors (
+        card_id INT PRIMARY KEY REFERENCES cards(id) ON DELETE CASCADE,
+        neighbor_ids INT[] NOT NULL,
+        distances REAL[] NOT NULL
+    )
+"""
+
+
+def compute_neighbors(ids, matrix, k: int = 50, block_size: int = 512):
+    """
+    Find the `k` nearest cards of every card by L2 distance.
+
+    The all-pairs distances are computed one block of rows at a time, as
+    `|a|² + |b|² - 2 a·b` with one matrix product per block, so memory stays
+    at `block_size * len(ids)` floats whatever the corpus size. Each block
+    keeps its `k` best columns with `argpartition`.
+
+    Parameters
+    ----------
+    ids : array-like of int
+        Card IDs, one per matrix row.
+    matrix : array-like
+        The card embeddings.
+    k : int, optional
+        Neighbors kept per card, at most `len(ids) - 1`. Default is 50.
+    block_size : int, optional
+        Rows compared with the whole corpus at once. Default is 512.
+
+    Returns
+    -------
+    tuple
+        `(neighbor_ids, distances)`, two `(len(ids), k)` arrays, nearest
+        first. A card is never its own neighbor.
+
+    Raises
+    ------
+    ValueError
+        If `k` or `block_size` is not positive.
+    """
+    if k <= 0 or block_size <= 0:
+        raise ValueError("k and block_size must be positive")
+    ids = np.asarray(ids, dtype=np.int64)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    count = len(ids)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.empty((count, 0), np.int64), np.empty((count, 0), np.float32)
+
+    norms = np.einsum("ij,ij->i", matrix, matrix)
+    neighbors = np.empty((count, k), dtype=np.int64)
+    distances = np.empty((count, k), dtype=np.float32)
+    for start in range(0, count, block_size):
+        stop = min(start + block_size, count)
+        rows = np.arange(stop - start)
+        squared = norms[start:stop, None] + norms[None, :] - 2 * (matrix[start:stop] @ matrix.T)
+        squared[rows, rows + start] = np.inf
+        best = np.argpartition(squared, k - 1, axis=1)[:, :k]
+        best_distances = np.take_along_axis(squared, best, axis=1)
+        order = np.argsort(best_distances, axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(best, order, axis=1)
+        # Rounding can make the squared distance of near duplicates negative
+        distances[start:stop] = np.sqrt(
+            np.maximum(np.take_along_axis(best_distances, order, axis=1), 0)
+        )
+    return ids[neighbors], distances
+
+
+def store_neighbors(ids, neighbor_ids, distances, page_size: int = 1000) -> int:
+    """
+    Replace the content of the `card_neighbors` table.
+
+    The old rows are deleted and the new ones inserted in one transaction,
+    so readers see either list, never a mix or an empty table.
+
+    Returns
+    -------
+    int
+        The number of cards stored.
+    """
+    rows = [
+        (int(card_id), neighbors.tolist(), card_distances.tolist())
+        for card_id, neighbors, card_distances in zip(ids, neighbor_ids, distances)
+    ]
+    with dbConnection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_TABLE)
+                cursor.execute("DELETE FROM card_neighbors")
+                execute_values(
+                    cursor,
+                    "INSERT INTO card_neighbors (card_id, neighbor_ids, distances) "
+                    "VALUES %s",
+                    rows,
+                    template="(%s, %s::int[], %s::real[])",
+                    page_size=page_size,
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Precompute the nearest neighbors of every card for /cards/{id}/similar."
+    )
+    parser.add_argument("-k", type=int, default=50, help="neighbors stored per card")
+    parser.add_argument("--block-size", type=int, default=512,
+                        help="rows compared with the whole corpus at once")
+    args = parser.parse_args(argv)
+
+    path = embeddingSnapshot.default_path()
+    if path:
+        snapshot = embeddingSnapshot.read_snapshot(path)
+        ids, matrix = snapshot["ids"], snapshot["matrix"]
+    else:
+        ids, matrix, _, _ = embeddingSnapshot.fetch_embeddings()
+
+    start = time.perf_counter()
+    neighbor_ids, distances = compute_neighbors(ids, matrix, args.k, args.block_size)
+    elapsed = time.perf_counter() - start
+    stored = store_neighbors(ids, neighbor_ids, distances)
+    print(
+        f"{stored} cards x {neighbor_ids.shape[1]} neighbors computed in "
+        f"{elapsed:.1f}s and stored in card_neighbors"
+    )
+
+
+if __name__ == "__main__":
+    main()
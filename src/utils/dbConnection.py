@@ -5,31 +5,303 @@
 # export DB_PASSWORD=pr9yh1516s57jjnmw7ll
 
 import os
+import threading
+import time
+from collections import deque
 import psycopg2
+from psycopg2 import extensions
 from dotenv import load_dotenv
 
 # Load variables from env file
 load_dotenv()
 
 
+class ConnectionPool:
+    """
+    Process-wide pool of PostgreSQL connections.
+
+    Connections are opened lazily up to `maxconn`, handed out by `getconn`
+    and given back with `putconn`. Idle connections above `minconn` are
+    closed once they have been idle for longer than `max_idle`.
+
+    Parameters
+    ----------
+    minconn : int, optional
+        Number of idle connections kept open. Default is `DB_POOL_MIN` or 1.
+    maxconn : int, optional
+        Maximum number of connections open at the same time.
+        Default is `DB_POOL_MAX` or 10.
+    timeout : float, optional
+        Seconds to wait for a free connection before giving up.
+        Default is `DB_POOL_TIMEOUT` or 30.
+    ping_after : float, optional
+        A connection idle for longer than this is checked with `SELECT 1`
+        before being handed out. Default is `DB_POOL_PING_AFTER` or 30.
+    max_idle : float, optional
+        Seconds after which extra idle connections are closed.
+        Default is `DB_POOL_MAX_IDLE` or 300.
+    """
+
+    def __init__(
+        self,
+        minconn=None,
+        maxconn=None,
+        timeout=None,
+        ping_after=None,
+        max_idle=None,
+    ):
+        self.minconn = int(minconn if minconn is not None
+                           else os.environ.get("DB_POOL_MIN", 1))
+        self.maxconn = int(maxconn if maxconn is not None
+                           else os.environ.get("DB_POOL_MAX", 10))
+        if self.minconn < 0 or self.maxconn < 1 or self.minconn > self.maxconn:
+            raise ValueError("Pool sizes must satisfy 0 <= minconn <= maxconn, maxconn >= 1")
+        self.timeout = float(timeout if timeout is not None
+                             else os.environ.get("DB_POOL_TIMEOUT", 30))
+        self.ping_after = float(ping_after if ping_after is not None
+                                else os.environ.get("DB_POOL_PING_AFTER", 30))
+        self.max_idle = float(max_idle if max_idle is not None
+                              else os.environ.get("DB_POOL_MAX_IDLE", 300))
+
+        self._idle = deque()  # (connection, returned_at)
+        self._in_use = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+        }
+
+    @staticmethod
+    def _connect():
+        return psycopg2.connect(
+            host=os.environ["DB_HOST"],
+            port=os.environ.get("DB_PORT", 5432),
+            database=os.environ["DB_NAME"],
+            user=os.environ["DB_USER"],
+            password=os.environ["DB_PASSWORD"],
+        )
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn, idle_since):
+        """Health check run on every checkout of a reused connection, without the lock."""
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - idle_since > self.ping_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _prune_idle(self):
+        """Close idle connections above `minconn` that sat unused too long."""
+        now = time.monotonic()
+        while len(self._idle) > self.minconn:
+            conn, returned_at = self._idle[0]
+            if now - returned_at <= self.max_idle:
+                break
+            self._idle.popleft()
+            self._stats["discarded"] += 1
+            self._close_quietly(conn)
+
+    def getconn(self):
+        """
+        Borrow a connection from the pool.
+
+        Returns
+        -------
+        connection
+            An open psycopg2 connection with no transaction in progress.
+
+        Raises
+        ------
+        psycopg2.OperationalError
+            If no connection becomes available within `timeout` seconds,
+            or if a new connection cannot be opened.
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.OperationalError("Connection pool is closed")
+                self._prune_idle()
+                candidate = None
+                while True:
+                    if self._idle:
+                        # Reserve it: the health check runs outside of the lock
+                        candidate, returned_at = self._idle.pop()
+                        self._in_use.add(candidate)
+                        break
+                    if len(self._in_use) < self.maxconn:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise psycopg2.OperationalError(
+                            f"Connection pool exhausted ({self.maxconn} connections in use)"
+                        )
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    start = time.monotonic()
+                    self._cond.wait(remaining)
+                    self._stats["wait_time"] += time.monotonic() - start
+                if candidate is None:
+                    # Reserve the slot before connecting outside of the lock
+                    placeholder = object()
+                    self._in_use.add(placeholder)
+                    break
+
+            healthy = self._healthy(candidate, returned_at)
+            with self._cond:
+                if healthy:
+                    self._stats["reused"] += 1
+                    self._stats["checkouts"] += 1
+                    return candidate
+                self._in_use.discard(candidate)
+                self._stats["discarded"] += 1
+                self._cond.notify()
+            self._close_quietly(candidate)
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use.discard(placeholder)
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use.discard(placeholder)
+            self._in_use.add(conn)
+            self._stats["created"] += 1
+            self._stats["checkouts"] += 1
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """
+        Give a connection back to the pool.
+
+        Any uncommitted work is rolled back, as it would be on close.
+
+        Parameters
+        ----------
+        conn : connection
+            The connection obtained from `getconn`.
+        discard : bool, optional
+            Close the connection instead of keeping it. Default is False.
+        """
+        with self._cond:
+            if conn not in self._in_use:
+                return
+            self._in_use.discard(conn)
+            if not discard and not self._closed and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            else:
+                discard = True
+            if discard:
+                self._stats["discarded"] += 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection; borrowed ones are closed on return."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+            self._cond.notify_all()
+
+    def metrics(self):
+        """
+        Snapshot of the pool state and counters.
+
+        Returns
+        -------
+        dict
+            Sizes (`minconn`, `maxconn`, `in_use`, `idle`) and cumulative
+            counters (`created`, `reused`, `discarded`, `checkouts`, `waits`,
+            `wait_time`, `timeouts`).
+        """
+        with self._cond:
+            return {
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                **self._stats,
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the pool shared by every DAO of the current process.
+
+    A new pool is created after a fork so that worker processes never share
+    sockets with their parent.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def reset_pool():
+    """Close the shared pool; the next `get_pool` call creates a fresh one."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+
+
 class dbConnection:
     """
     Managing connection to Postgresql database
+
+    The connection is borrowed from the shared pool and given back on exit.
     """
 
     def __init__(self):
         self.conn = None
+        self.pool = None
 
     def __enter__(self):
-        """Ouvre la connexion à la base de données"""
+        """Emprunte une connexion au pool"""
         try:
-            self.conn = psycopg2.connect(
-                host=os.environ["DB_HOST"],
-                port=os.environ.get("DB_PORT", 5432),
-                database=os.environ["DB_NAME"],
-                user=os.environ["DB_USER"],
-                password=os.environ["DB_PASSWORD"],
-            )
+            self.pool = get_pool()
+            self.conn = self.pool.getconn()
 
             return self.conn  # retourne la connexion pour utilisation
 
@@ -38,6 +310,7 @@ class dbConnection:
             raise
 
     def __exit__(self, exc_type, exc_value, traceback):
-        """Ferme la connexion"""
-        if self.conn:
-            self.conn.close()
+        """Rend la connexion au pool"""
+        if self.conn is not None:
+            self.pool.putconn(self.conn)
+            self.conn = None
@@ -1,130 +1,218 @@
 from dao.cardDao import CardDao
 from business_object.cardBusiness import CardBusiness
+from services.embeddingService import EmbeddingService
+from utils import embeddingSnapshot
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import islice
 from dotenv import load_dotenv
+import argparse
 import os
 import time
-from typing import Optional
 
+CHECKPOINT_FILE = ".embed_progress"
 
-def process_single_card(dao: CardDao, card_id: int, max_retries: int = 3) -> bool:
+
+def read_checkpoint(path: str = CHECKPOINT_FILE) -> int:
+    """Return the last card ID written by a previous run, 0 if there is none."""
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return int(f.read().strip())
+    return 0
+
+
+def write_checkpoint(card_id: int, path: str = CHECKPOINT_FILE):
+    """Atomically save the last card ID whose embedding has been written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(card_id))
+    os.replace(tmp_path, path)
+
+
+def iter_batches(cards, batch_size: int):
+    """
+    Group streamed cards into `(ids, texts)` batches.
+
+    Parameters
+    ----------
+    cards : iterable of dict
+        Cards as returned by `CardDao.iter_embedding_sources`.
+    batch_size : int
+        Number of cards per batch.
+
+    Yields
+    ------
+    tuple
+        The card IDs and their `text_to_embed`, in the same order.
+    """
+    cards = iter(cards)
+    while True:
+        chunk = list(islice(cards, batch_size))
+        if not chunk:
+            return
+        yield (
+            [card["id"] for card in chunk],
+            [CardBusiness.build_text_to_embed(card) for card in chunk],
+        )
+
+
+def embed_batch(
+    embedding_service: EmbeddingService, texts: list, max_retries: int = 3
+) -> list:
     """
-    Process a single card with retry logic.
+    Embed a batch of texts with retry logic.
 
     Parameters
     ----------
-    dao : CardDao
-        Database access object
-    card_id : int
-        ID of the card to process
+    embedding_service : EmbeddingService
+        Service used to call the embedding API.
+    texts : list of str
+        The texts to embed.
     max_retries : int
-        Maximum number of retry attempts
+        Maximum number of attempts.
 
     Returns
     -------
-    bool
-        True if successful, False otherwise
+    list
+        One normalized embedding per text.
+
+    Raises
+    ------
+    ValueError
+        If the batch still fails after `max_retries` attempts.
     """
     for attempt in range(1, max_retries + 1):
         try:
-            business = CardBusiness(dao, card_id)
-            business.generate_text_to_embed2()
-            business.vectorize()  # Fixed: no arguments needed
-            print(f"✓ Card {card_id} processed successfully.")
-            return True
-
+            return embedding_service.fetch_many(texts)
         except ValueError as e:
-            print(
-                f"✗ Card {card_id} - ValueError (attempt {attempt}/{max_retries}): {e}"
-            )
-            if attempt < max_retries:
-                time.sleep(2**attempt)  # Exponential backoff: 2s, 4s, 8s
-
-        except Exception as e:
-            print(
-                f"✗ Card {card_id} - Unexpected error (attempt {attempt}/{max_retries}): {type(e).__name__}: {e}"
-            )
-            if attempt < max_retries:
-                time.sleep(2**attempt)
-
-    print(f"✗ Card {card_id} failed after {max_retries} attempts. Skipping.")
-    return False
+            print(f"✗ Batch of {len(texts)} - attempt {attempt}/{max_retries}: {e}")
+            if attempt == max_retries:
+                raise
+            time.sleep(2**attempt)  # Exponential backoff: 2s, 4s, 8s
 
 
-def process_all_cards(
-    start_id: int = 1,
-    max_card_id: int = 32548,
+def embed_all_cards(
+    start_after: int = 0,
+    end_at: int = None,
+    batch_size: int = 64,
+    workers: int = 4,
+    only_missing: bool = False,
     max_retries: int = 3,
-    delay_between_cards: float = 1.0,
-):
+    on_checkpoint=None,
+    dao: CardDao = None,
+    embedding_service: EmbeddingService = None,
+) -> dict:
     """
-    Process all cards with robust error handling and progress tracking.
+    Generate `text_to_embed` and the embedding of every card.
+
+    Cards are streamed from the database in id order, embedded in batches by
+    up to `workers` concurrent API calls and written back one batch per
+    statement. Batches are written in order, so the checkpoint is always the
+    last card whose embedding is stored and a run can be resumed from it.
 
     Parameters
     ----------
-    start_id : int
-        Starting card ID (useful for resuming)
-    max_card_id : int
-        Maximum card ID to process
+    start_after : int
+        Only cards with an ID greater than this are processed (for resuming).
+    end_at : int, optional
+        Last card ID to process. Default is the last card.
+    batch_size : int
+        Number of cards sent to the embedding API in one request.
+    workers : int
+        Maximum number of concurrent embedding requests.
+    only_missing : bool
+        Skip the cards that already have an embedding.
     max_retries : int
-        Maximum retry attempts per card
-    delay_between_cards : float
-        Delay in seconds between processing cards
-    """
-    load_dotenv()
+        Maximum attempts per batch before it is skipped.
+    on_checkpoint : callable, optional
+        Called with the last processed card ID after each batch.
+    dao : CardDao, optional
+        Database access object. Default is a new `CardDao`.
+    embedding_service : EmbeddingService, optional
+        Embedding service. Default is a new uncached `EmbeddingService`.
 
-    # Verify environment is set up
-    api_key = os.getenv("LLM_API_KEY")
-    if not api_key:
-        print("Error: LLM_API_KEY not found in environment variables.")
-        return
-
-    stats = {"success": 0, "failed": 0, "total": max_card_id - start_id + 1}
-
-    failed_cards = []
+    Returns
+    -------
+    dict
+        `success`, `failed`, `batches`, `elapsed` (seconds) and `failed_ids`.
+    """
+    if batch_size <= 0 or workers <= 0:
+        raise ValueError("batch_size and workers must be positive")
+    dao = dao or CardDao()
+    embedding_service = embedding_service or EmbeddingService(
+        max_batch_size=batch_size
+    )
+    stats = {"success": 0, "failed": 0, "batches": 0, "failed_ids": []}
+    start_time = time.time()
 
-    print(f"Starting processing from card {start_id} to {max_card_id}")
-    print(f"Total cards to process: {stats['total']}")
-    print("-" * 60)
+    def write(ids, texts, future):
+        try:
+            embeddings = future.result()
+        except ValueError as e:
+            print(f"✗ Cards {ids[0]}-{ids[-1]} failed: {e}. Skipping.")
+            stats["failed"] += len(ids)
+            stats["failed_ids"].extend(ids)
+        else:
+            dao.bulk_update_embeddings(list(zip(ids, texts, embeddings)))
+            stats["success"] += len(ids)
+        stats["batches"] += 1
+        if on_checkpoint is not None:
+            on_checkpoint(ids[-1])
 
-    start_time = time.time()
+        # Progress update every 10 batches
+        if stats["batches"] % 10 == 0:
+            done = stats["success"] + stats["failed"]
+            elapsed = time.time() - start_time
+            print(
+                f"--- {done} cards (last ID {ids[-1]}) | "
+                f"{done / elapsed:.1f} cards/s | "
+                f"Success: {stats['success']} | Failed: {stats['failed']} ---"
+            )
 
-    with CardDao() as dao:
-        for card_id in range(start_id, max_card_id + 1):
-            success = process_single_card(dao, card_id, max_retries)
-
-            if success:
-                stats["success"] += 1
-            else:
-                stats["failed"] += 1
-                failed_cards.append(card_id)
-
-            # Progress update every 100 cards
-            if card_id % 100 == 0:
-                elapsed = time.time() - start_time
-                progress = ((card_id - start_id + 1) / stats["total"]) * 100
-                avg_time = elapsed / (card_id - start_id + 1)
-                remaining = (max_card_id - card_id) * avg_time
-
-                print(f"\n--- Progress: {progress:.1f}% ({card_id}/{max_card_id}) ---")
-                print(
-                    f"Elapsed: {elapsed / 60:.1f}m | Remaining: ~{remaining / 60:.1f}m"
+    cards = dao.iter_embedding_sources(
+        start_after=start_after, end_at=end_at, only_missing=only_missing
+    )
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for ids, texts in iter_batches(cards, batch_size):
+                in_flight.append(
+                    (
+                        ids,
+                        texts,
+                        executor.submit(embed_batch, embedding_service, texts, max_retries),
+                    )
                 )
-                print(f"Success: {stats['success']} | Failed: {stats['failed']}")
-                print("-" * 60)
+                # Bound memory: never hold more than 2 batches per worker
+                if len(in_flight) >= 2 * workers:
+                    write(*in_flight.popleft())
+            while in_flight:
+                write(*in_flight.popleft())
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
+            close = getattr(cards, "close", None)
+            if close is not None:
+                close()
+
+    stats["elapsed"] = time.time() - start_time
+    return stats
 
-            time.sleep(delay_between_cards)
 
-    # Final summary
-    elapsed = time.time() - start_time
+def print_summary(stats: dict):
+    """Print the final summary of `embed_all_cards`."""
+    total = stats["success"] + stats["failed"]
     print("\n" + "=" * 60)
     print("PROCESSING COMPLETE")
     print("=" * 60)
-    print(f"Total cards processed: {stats['total']}")
+    print(f"Total cards processed: {total}")
     print(f"Successful: {stats['success']}")
     print(f"Failed: {stats['failed']}")
-    print(f"Success rate: {(stats['success'] / stats['total'] * 100):.1f}%")
-    print(f"Total time: {elapsed / 60:.1f} minutes")
+    if total:
+        print(f"Success rate: {(stats['success'] / total * 100):.1f}%")
+    print(f"Total time: {stats['elapsed'] / 60:.1f} minutes")
 
+    failed_cards = stats["failed_ids"]
     if failed_cards:
         print(f"\nFailed card IDs ({len(failed_cards)}):")
         # Print in groups of 10 for readability
@@ -132,6 +220,48 @@ def process_all_cards(
             print(failed_cards[i : i + 10])
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embed every card of the database.")
+    parser.add_argument("--start-after", type=int, default=None,
+                        help="resume after this card ID (default: checkpoint file)")
+    parser.add_argument("--end-at", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--only-missing", action="store_true",
+                        help="only embed cards without an embedding")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--snapshot", default=embeddingSnapshot.default_path(),
+                        help="snapshot file to re-export after the run "
+                        "(default: EMBEDDING_SNAPSHOT_PATH)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if not os.getenv("LLM_API_KEY"):
+        print("Error: LLM_API_KEY not found in environment variables.")
+        return
+
+    start_after = args.start_after
+    if start_after is None:
+        start_after = read_checkpoint(args.checkpoint)
+    print(f"Starting after card {start_after}")
+    print("-" * 60)
+
+    stats = embed_all_cards(
+        start_after=start_after,
+        end_at=args.end_at,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        only_missing=args.only_missing,
+        on_checkpoint=lambda card_id: write_checkpoint(card_id, args.checkpoint),
+    )
+    print_summary(stats)
+    if not stats["failed_ids"] and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    if args.snapshot and stats["success"]:
+        # Workers serving the memory backend pick the new file up on their own
+        header = embeddingSnapshot.export_snapshot(args.snapshot)
+        print(f"Snapshot of {header['count']} embeddings written to {args.snapshot}")
+
+
 if __name__ == "__main__":
-    # You can easily resume from a specific card ID if needed
-    process_all_cards(start_id=118, max_card_id=32548, delay_between_cards=0.2)
+    main()
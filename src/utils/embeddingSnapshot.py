@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import struct
+import time
+import numpy as np
+from pgvector.psycopg2 import register_vector
+from utils.dbConnection import dbConnection
+from services.embeddingService import EmbeddingService
+
+MAGIC = b"MSEMBED\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")  # magic, format version, header length
+
+# Arrays stored after the header, in this order
+SECTIONS = (
+    ("ids", np.int64),
+    ("mana_values", np.float64),
+    ("norms", np.float32),
+    ("matrix", np.float32),
+)
+
+
+def default_path():
+    """Return the snapshot path configured with `EMBEDDING_SNAPSHOT_PATH`."""
+    return os.getenv("EMBEDDING_SNAPSHOT_PATH")
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path, ids, matrix, colors=None, mana_values=None):
+    """
+    Write card embeddings to a snapshot file, replacing it atomically.
+
+    The file is written next to `path` then renamed over it, so readers
+    either see the previous snapshot or the new one, never a partial file.
+    Workers that memory-mapped the previous file keep using it until they
+    reload.
+
+    Parameters
+    ----------
+    path : str
+        Destination file.
+    ids : array-like of int
+        Card IDs, in ascending order.
+    matrix : array-like
+        One embedding per card.
+    colors : list of list of str, optional
+        The `colors` of each card, used by the search filters.
+    mana_values : array-like of float, optional
+        The `mana_value` of each card, NaN for NULL.
+
+    Returns
+    -------
+    dict
+        The header of the written snapshot.
+    """
+    arrays = {
+        "ids": np.asarray(ids, dtype=np.int64),
+        "matrix": np.ascontiguousarray(matrix, dtype=np.float32),
+    }
+    count = len(arrays["ids"])
+    if arrays["matrix"].ndim != 2 or len(arrays["matrix"]) != count:
+        raise ValueError("matrix must have one row per id")
+    arrays["mana_values"] = (
+        np.full(count, np.nan)
+        if mana_values is None
+        else np.asarray(mana_values, dtype=np.float64)
+    )
+    arrays["norms"] = np.einsum("ij,ij->i", arrays["matrix"], arrays["matrix"])
+
+    header = {
+        "count": count,
+        "dimension": int(arrays["matrix"].shape[1]),
+        "model": EmbeddingService.MODEL,
+        "created_at": time.time(),
+        "colors": [list(c) if c else [] for c in (colors or [[]] * count)],
+    }
+    # Section offsets depend on the header length, which depends on the offsets
+    offsets = {name: 0 for name, _ in SECTIONS}
+    while True:
+        header["offsets"] = offsets
+        encoded = json.dumps(header).encode()
+        offset = _align(_PREAMBLE.size + len(encoded))
+        new_offsets = {}
+        for name, dtype in SECTIONS:
+            new_offsets[name] = offset
+            offset = _align(offset + arrays[name].astype(dtype, copy=False).nbytes)
+        if new_offsets == offsets:
+            break
+        offsets = new_offsets
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            f.write(encoded)
+            for name, dtype in SECTIONS:
+                f.seek(offsets[name])
+                f.write(arrays[name].astype(dtype, copy=False).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return header
+
+
+def read_snapshot(path):
+    """
+    Memory-map a snapshot file.
+
+    The arrays are read-only views on the file, so every process mapping
+    the same snapshot shares one copy in the page cache.
+
+    Parameters
+    ----------
+    path : str
+        The snapshot file.
+
+    Returns
+    -------
+    dict
+        `ids`, `matrix`, `norms` and `mana_values` arrays, plus the header
+        fields (`count`, `dimension`, `model`, `created_at`, `colors`).
+
+    Raises
+    ------
+    ValueError
+        If the file is not a snapshot or uses an unsupported format version.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not an embedding snapshot")
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an embedding snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot version {version}, expected {FORMAT_VERSION}"
+            )
+        header = json.loads(f.read(header_length))
+
+    snapshot = dict(header)
+    count, dimension = header["count"], header["dimension"]
+    for name, dtype in SECTIONS:
+        shape = (count, dimension) if name == "matrix" else (count,)
+        if count == 0:
+            snapshot[name] = np.empty(shape, dtype=dtype)
+        else:
+            snapshot[name] = np.memmap(
+                path, dtype=dtype, mode="r", offset=header["offsets"][name], shape=shape
+            )
+    return snapshot
+
+
+def fetch_embeddings(chunk_size: int = 2000):
+    """
+    Read every embedded card from the database, streaming by chunks.
+
+    Parameters
+    ----------
+    chunk_size : int, optional
+        Number of rows fetched from the server at a time. Default is 2000.
+
+    Returns
+    -------
+    tuple
+        `(ids, matrix, colors, mana_values)` ordered by card id, the matrix
+        being float32 with one row per card.
+    """
+    ids, chunks, colors, mana_values = [], [], [], []
+    with dbConnection() as conn:
+        register_vector(conn)
+        with conn.cursor(name="card_embeddings") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(
+                "SELECT id, embedding, colors, mana_value FROM cards "
+                "WHERE embedding IS NOT NULL ORDER BY id"
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ids.extend(row[0] for row in rows)
+                chunks.append(np.stack([row[1] for row in rows]).astype(np.float32))
+                colors.extend(row[2] for row in rows)
+                mana_values.extend(
+                    np.nan if row[3] is None else float(row[3]) for row in rows
+                )
+    matrix = (
+        np.concatenate(chunks)
+        if chunks
+        else np.empty((0, EmbeddingService.DIMENSION), np.float32)
+    )
+    return ids, matrix, colors, mana_values
+
+
+def export_snapshot(path=None, chunk_size: int = 2000):
+    """
+    Export every embedded card of the database to a snapshot file.
+
+    Parameters
+    ----------
+    path : str, optional
+        Destination file. Default is `EMBEDDING_SNAPSHOT_PATH`.
+    chunk_size : int, optional
+        Number of rows fetched from the server at a time. Default is 2000.
+
+    Returns
+    -------
+    dict
+        The header of the written snapshot.
+
+    Raises
+    ------
+    ValueError
+        If no path is given nor configured.
+    """
+    path = path or default_path()
+    if not path:
+        raise ValueError("No snapshot path given and EMBEDDING_SNAPSHOT_PATH is unset")
+
+    return write_snapshot(path, *fetch_embeddings(chunk_size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the card embeddings snapshot.")
+    parser.add_argument("--path", default=None,
+                        help="destination file (default: EMBEDDING_SNAPSHOT_PATH)")
+    args = parser.parse_args(argv)
+
+    header = export_snapshot(args.path)
+    print(
+        f"Snapshot written: {header['count']} cards x {header['dimension']} "
+        f"dimensions to {args.path or default_path()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -99,10 +99,41 @@ with dbConnection() as conn:
             printings TEXT[],
             scryfall_oracle_id UUID,
             text_to_embed TEXT,
-            embedding VECTOR,
+            embedding VECTOR(1024),
             raw JSONB
         )
         """)
+        # (sort column, id) indexes serve the keyset pages of /filter and /cards
+        for column in ("name", "mana_value", "edhrec_rank"):
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS cards_{column}_id_idx "
+                f"ON cards ({column}, id)"
+            )
+        # Name search: trigram indexes for the contains/similar modes,
+        # pattern ops indexes for the prefix mode
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in ("name", "ascii_name"):
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS cards_{column}_trgm_idx "
+                f"ON cards USING gin ({column} gin_trgm_ops)"
+            )
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS cards_{column}_prefix_idx "
+                f"ON cards (lower({column}) text_pattern_ops)"
+            )
+        # Nearest neighbors of each card, filled by utils.cardNeighbors
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS card_neighbors (
+            card_id INT PRIMARY KEY REFERENCES cards(id) ON DELETE CASCADE,
+            neighbor_ids INT[] NOT NULL,
+            distances REAL[] NOT NULL
+        )
+        """)
+        # Full-text index of the lexical leg of the hybrid /search
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS cards_fts_idx ON cards USING gin "
+            "(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(text, '')))"
+        )
 
         execute_values(
             cur,
@@ -0,0 +1,65 @@
+import base64
+import binascii
+import json
+
+
+def encode_page_token(order_by: str, asc: bool, value, id: int) -> str:
+    """
+    Build the opaque continuation token of a keyset-paginated query.
+
+    Parameters
+    ----------
+    order_by : str
+        Column the results are sorted by.
+    asc : bool
+        Sorting direction.
+    value
+        Value of `order_by` in the last returned row.
+    id : int
+        ID of the last returned row, which breaks ties on `order_by`.
+
+    Returns
+    -------
+    str
+        URL-safe token to pass back to get the next page.
+    """
+    payload = {"o": order_by, "a": asc, "v": value, "i": id}
+    encoded = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(encoded).decode().rstrip("=")
+
+
+def decode_page_token(token: str, order_by: str, asc: bool):
+    """
+    Decode a token built by `encode_page_token`.
+
+    Parameters
+    ----------
+    token : str
+        The continuation token.
+    order_by : str
+        Column the next page is sorted by.
+    asc : bool
+        Sorting direction of the next page.
+
+    Returns
+    -------
+    tuple
+        The `(value, id)` of the last row of the previous page.
+
+    Raises
+    ------
+    ValueError
+        If the token is malformed or was built for another sort order.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        stored_order, stored_asc = payload["o"], payload["a"]
+        value, id = payload["v"], payload["i"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid page token") from e
+    if not isinstance(id, int) or isinstance(id, bool):
+        raise ValueError("Invalid page token")
+    if stored_order != order_by or stored_asc != asc:
+        raise ValueError("Page token was issued for another sort order")
+    return value, id
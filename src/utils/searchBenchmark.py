@@ -0,0 +1,175 @@
+import argparse
+import time
+import numpy as np
+from dao.playerDao import PlayerDao
+from services.vectorSearchEngine import VectorSearchEngine, QUANTIZATIONS
+from utils import embeddingSnapshot
+
+
+def recall_at_k(exact, approximate, k: int) -> float:
+    """
+    Share of the exact top-k found by an approximate search.
+
+    Parameters
+    ----------
+    exact, approximate : list of list of int
+        The card IDs returned for each query, best first.
+    k : int
+        Number of results compared per query.
+
+    Returns
+    -------
+    float
+        Mean recall@k over the queries, between 0 and 1.
+    """
+    if not exact:
+        return 0.0
+    found = [
+        len(set(truth[:k]) & set(result[:k])) / max(1, len(truth[:k]))
+        for truth, result in zip(exact, approximate)
+    ]
+    return float(np.mean(found))
+
+
+def _run(search, queries, k):
+    results, start = [], time.perf_counter()
+    for query in queries:
+        results.append([card_id for card_id, *_ in search(query, k)])
+    latency = (time.perf_counter() - start) / max(1, len(queries)) * 1000
+    return results, latency
+
+
+def benchmark(ids, matrix, queries, k: int = 10, rerank_factors=(1, 2, 4, 8)):
+    """
+    Compare quantized in-memory search with the exact search.
+
+    Parameters
+    ----------
+    ids : array-like of int
+        Card IDs of the corpus.
+    matrix : array-like
+        The corpus embeddings.
+    queries : array-like
+        Query embeddings.
+    k : int, optional
+        Number of results per query. Default is 10.
+    rerank_factors : tuple of int, optional
+        Re-ranking factors tried for each quantization.
+
+    Returns
+    -------
+    list of dict
+        One row per configuration with `quantization`, `rerank_factor`,
+        `recall`, `latency_ms` and `memory_bytes` (quantized copy).
+    """
+    exact_engine = VectorSearchEngine()
+    exact_engine.load_arrays(ids, matrix)
+    exact, latency = _run(lambda q, n: exact_engine.search(q, limit=n), queries, k)
+    rows = [
+        {
+            "quantization": "float32",
+            "rerank_factor": None,
+            "recall": 1.0,
+            "latency_ms": latency,
+            "memory_bytes": exact_engine.matrix.nbytes,
+        }
+    ]
+    for quantization in QUANTIZATIONS:
+        for rerank_factor in rerank_factors:
+            engine = VectorSearchEngine(
+                quantization=quantization, rerank_factor=rerank_factor
+            )
+            engine.load_arrays(ids, matrix)
+            results, latency = _run(lambda q, n: engine.search(q, limit=n), queries, k)
+            rows.append(
+                {
+                    "quantization": quantization,
+                    "rerank_factor": rerank_factor,
+                    "recall": recall_at_k(exact, results, k),
+                    "latency_ms": latency,
+                    "memory_bytes": engine.memory_usage()["quantized"],
+                }
+            )
+    return rows
+
+
+def benchmark_pgvector(ids, matrix, queries, k: int = 10, rerank_factor: int = 4):
+    """
+    Compare the pgvector searches (index, float16 two-stage) with exact search.
+
+    Returns
+    -------
+    list of dict
+        One row per configuration with `quantization`, `recall` and `latency_ms`.
+    """
+    exact_engine = VectorSearchEngine()
+    exact_engine.load_arrays(ids, matrix)
+    exact, _ = _run(lambda q, n: exact_engine.search(q, limit=n), queries, k)
+    rows = []
+    for quantization in (None, "float16"):
+        dao = PlayerDao(
+            backend="pgvector",
+            quantization=quantization,
+            rerank_factor=rerank_factor,
+        )
+        results, latency = _run(
+            lambda q, n: [
+                (row["id"],) for row in dao.natural_language_search(list(q), limit=n)
+            ],
+            queries,
+            k,
+        )
+        rows.append(
+            {
+                "quantization": f"pgvector {quantization or 'float32'}",
+                "rerank_factor": rerank_factor if quantization else None,
+                "recall": recall_at_k(exact, results, k),
+                "latency_ms": latency,
+            }
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report recall@k of quantized search against exact search."
+    )
+    parser.add_argument("--queries", type=int, default=200,
+                        help="number of card embeddings used as queries")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=0.05,
+                        help="noise added to the queries so they are not corpus points")
+    parser.add_argument("--pgvector", action="store_true",
+                        help="also benchmark the database search")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    path = embeddingSnapshot.default_path()
+    if path:
+        snapshot = embeddingSnapshot.read_snapshot(path)
+        ids, matrix = snapshot["ids"], np.asarray(snapshot["matrix"])
+    else:
+        ids, matrix, _, _ = embeddingSnapshot.fetch_embeddings()
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = matrix[sample] + rng.normal(0, args.noise, (len(sample), matrix.shape[1]))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    queries = queries.astype(np.float32)
+
+    rows = benchmark(ids, matrix, queries, args.k)
+    if args.pgvector:
+        rows += benchmark_pgvector(ids, matrix, queries, args.k)
+
+    print(f"{len(ids)} cards, {len(queries)} queries, k={args.k}")
+    print(f"{'storage':<18}{'rerank':>8}{'recall@k':>10}{'ms/query':>10}{'MB':>8}")
+    for row in rows:
+        memory = row.get("memory_bytes")
+        print(
+            f"{row['quantization']:<18}{row['rerank_factor'] or '-':>8}"
+            f"{row['recall']:>10.3f}{row['latency_ms']:>10.2f}"
+            f"{memory / 2**20 if memory is not None else float('nan'):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import argparse
+import math
+import psycopg2
+from utils.dbConnection import dbConnection
+from services.embeddingService import EmbeddingService
+
+INDEX_NAME = "cards_embedding_idx"
+METHODS = ("hnsw", "ivfflat")
+
+# Searches order by `embedding <-> query` (L2 distance), so the index is built
+# with the matching operator class; embeddings are normalized, so the ranking
+# is the same as with cosine distance.
+OPCLASS = "vector_l2_ops"
+HALF_OPCLASS = "halfvec_l2_ops"
+
+
+def default_lists(rows: int) -> int:
+    """
+    Number of IVFFlat lists recommended by pgvector for a table size.
+
+    rows / 1000 up to a million rows, sqrt(rows) above.
+    """
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def index_statement(
+    method: str = "hnsw",
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 100,
+    concurrently: bool = False,
+    quantization: str = None,
+) -> str:
+    """
+    Build the CREATE INDEX statement of the cards.embedding index.
+
+    Parameters
+    ----------
+    method : str
+        "hnsw" or "ivfflat".
+    m : int
+        HNSW: maximum number of connections per layer.
+    ef_construction : int
+        HNSW: size of the candidate list used to build the graph.
+    lists : int
+        IVFFlat: number of inverted lists.
+    concurrently : bool
+        Build without locking writes on the table.
+    quantization : str, optional
+        "float16" indexes `embedding::halfvec`, half the size of the full
+        precision index; used by the two-stage search of `PlayerDao`.
+
+    Returns
+    -------
+    str
+        The SQL statement.
+
+    Raises
+    ------
+    ValueError
+        If the method is unknown or a parameter is out of range.
+    """
+    if method == "hnsw":
+        if not 2 <= m <= 100:
+            raise ValueError("m must be between 2 and 100")
+        if ef_construction < 2 * m:
+            raise ValueError("ef_construction must be at least 2 * m")
+        options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    elif method == "ivfflat":
+        if not 1 <= lists <= 32768:
+            raise ValueError("lists must be between 1 and 32768")
+        options = f"lists = {int(lists)}"
+    else:
+        raise ValueError(f"Unknown index method {method!r}, expected one of {METHODS}")
+
+    if quantization == "float16":
+        column = f"(embedding::halfvec({EmbeddingService.DIMENSION})) {HALF_OPCLASS}"
+    elif quantization is None:
+        column = f"embedding {OPCLASS}"
+    else:
+        raise ValueError("Only float16 indexes are supported by pgvector")
+
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{INDEX_NAME} "
+        f"ON cards USING {method} ({column}) WITH ({options})"
+    )
+
+
+def _execute(statements, autocommit=False, cleanup=()):
+    # cleanup statements run even when a statement fails, e.g. to undo
+    # session settings before the connection goes back to the pool
+    with dbConnection() as conn:
+        previous = conn.autocommit
+        conn.autocommit = autocommit
+        try:
+            with conn.cursor() as cursor:
+                for statement, params in statements:
+                    cursor.execute(statement, params)
+            if not autocommit:
+                conn.commit()
+        finally:
+            try:
+                if cleanup:
+                    conn.rollback()
+                    with conn.cursor() as cursor:
+                        for statement, params in cleanup:
+                            cursor.execute(statement, params)
+                conn.autocommit = previous
+            except psycopg2.Error as e:
+                # The pool discards closed connections
+                print(f"Connection cleanup failed, closing it: {e}")
+                conn.close()
+
+
+def set_dimension(dimension: int = EmbeddingService.DIMENSION):
+    """
+    Give the cards.embedding column a fixed dimension.
+
+    Indexes can only be built on a typed `vector(n)` column. Existing
+    embeddings must already have `dimension` components.
+    """
+    dimension = int(dimension)
+    _execute(
+        [
+            (f"DROP INDEX IF EXISTS {INDEX_NAME}", None),
+            (
+                f"ALTER TABLE cards ALTER COLUMN embedding TYPE vector({dimension}) "
+                f"USING embedding::vector({dimension})",
+                None,
+            ),
+        ]
+    )
+
+
+def count_embedded() -> int:
+    """Return the number of cards that have an embedding."""
+    with dbConnection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM cards WHERE embedding IS NOT NULL")
+            return cursor.fetchone()[0]
+
+
+def create_index(
+    method: str = "hnsw",
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = None,
+    concurrently: bool = False,
+    maintenance_work_mem: str = None,
+    quantization: str = None,
+):
+    """
+    (Re)build the approximate nearest neighbour index of cards.embedding.
+
+    IVFFlat picks its centroids from the rows present at build time, so it
+    should be built once the embeddings are generated, and rebuilt with
+    `reindex` after a full re-embed. HNSW is kept up to date on writes.
+
+    Parameters
+    ----------
+    method : str
+        "hnsw" (better recall/latency, slower build) or "ivfflat".
+    m, ef_construction : int
+        HNSW build parameters.
+    lists : int, optional
+        IVFFlat lists. Default is `default_lists` of the embedded rows.
+    concurrently : bool
+        Build without blocking writes (slower).
+    maintenance_work_mem : str, optional
+        Memory given to the build, e.g. "1GB".
+    quantization : str, optional
+        "float16" to index half-precision vectors, see `index_statement`.
+    """
+    if method == "ivfflat" and lists is None:
+        lists = default_lists(count_embedded())
+    statement = index_statement(
+        method, m, ef_construction, lists or 100, concurrently, quantization
+    )
+
+    statements, cleanup = [], []
+    if maintenance_work_mem:
+        # Transaction-local unless the build runs in autocommit mode, where
+        # the session setting is reset even if the build fails: the
+        # connection goes back to the pool
+        statements.append(
+            (
+                "SELECT set_config('maintenance_work_mem', %s, %s)",
+                (maintenance_work_mem, not concurrently),
+            )
+        )
+        if concurrently:
+            cleanup.append(("RESET maintenance_work_mem", None))
+    statements += [
+        (f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {INDEX_NAME}", None),
+        (statement, None),
+        ("ANALYZE cards", None),
+    ]
+    _execute(statements, autocommit=concurrently, cleanup=cleanup)
+
+
+def drop_index():
+    """Drop the cards.embedding index; searches fall back to exact scans."""
+    _execute([(f"DROP INDEX IF EXISTS {INDEX_NAME}", None)])
+
+
+def reindex(concurrently: bool = False):
+    """Rebuild the index with its current parameters."""
+    _execute(
+        [(f"REINDEX INDEX {'CONCURRENTLY ' if concurrently else ''}{INDEX_NAME}", None)],
+        autocommit=concurrently,
+    )
+
+
+def index_info():
+    """
+    Describe the cards.embedding index.
+
+    Returns
+    -------
+    dict or None
+        `definition` and `size` (bytes) of the index, None if there is none.
+    """
+    with dbConnection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef, pg_relation_size(%s::regclass) FROM pg_indexes "
+                "WHERE tablename = 'cards' AND indexname = %s",
+                (INDEX_NAME, INDEX_NAME),
+            )
+            row = cursor.fetchone()
+    if row is None:
+        return None
+    return {"definition": row[0], "size": row[1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the cards.embedding index.")
+    parser.add_argument("command", choices=["migrate", "create", "drop", "reindex", "info"],
+                        help="migrate = fix the column dimension, then create")
+    parser.add_argument("--method", choices=METHODS, default="hnsw")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=None)
+    parser.add_argument("--dimension", type=int, default=EmbeddingService.DIMENSION)
+    parser.add_argument("--concurrently", action="store_true")
+    parser.add_argument("--maintenance-work-mem", default=None)
+    parser.add_argument("--quantization", choices=["float16"], default=None,
+                        help="index half-precision vectors (SEARCH_QUANTIZATION=float16)")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        set_dimension(args.dimension)
+    if args.command in ("migrate", "create"):
+        create_index(
+            args.method,
+            args.m,
+            args.ef_construction,
+            args.lists,
+            args.concurrently,
+            args.maintenance_work_mem,
+            args.quantization,
+        )
+    elif args.command == "drop":
+        drop_index()
+    elif args.command == "reindex":
+        reindex(args.concurrently)
+    print(index_info() or "No index on cards.embedding.")
+
+
+if __name__ == "__main__":
+    main()